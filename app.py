@@ -1,17 +1,134 @@
 import gradio as gr
-import numpy as np
 from loguru import logger
+from src import metrics
 from src.service_context import ServiceContext
+from src.microphone import MicrophoneSession
+from src.long_form import SegmentTranscript, transcribe_audio_stream, transcribe_wav_file
+from src.transcript_cache import audio_key
+from src.utils.audio_frontend import prepare_audio
+from src.asr.asr_interface import ASRInterface
 from src.config_manager.utils import Config, read_yaml, validate_config
 import asyncio
+import time
+from dataclasses import asdict
 
 config: Config = validate_config(read_yaml("config.yaml"))
+if config.system_config.metrics_enabled:
+    # 在创建 ServiceContext 之前开启，模型加载和预热的指标才会被记录
+    metrics.enable()
 
 default_context_cache = ServiceContext()
-default_context_cache.load_from_config(config)
+if config.system_config.background_loading:
+    # 先启动界面，模型在后台加载并预热
+    default_context_cache.load_in_background(config)
+else:
+    default_context_cache.load_and_warm_up(config)
+
+
+def check_ready():
+    if not default_context_cache.is_ready:
+        health = default_context_cache.health()
+        if health["state"] == "failed":
+            raise RuntimeError(f"模型加载失败：{health['error']}")
+        raise RuntimeError("模型正在加载或预热中，请稍后再试")
+
+def format_vad_output(transcripts) -> str:
+    timestamps = [
+        {'text': t.text, 'start': round(t.start, 3), 'end': round(t.end, 3)}
+        for t in transcripts
+    ]
+    transcription = ' '.join([t['text'] for t in timestamps])
+    return f"转录结果: {transcription}\n时间戳: {timestamps}"
+
+
+class VADJob:
+    """后台运行的一次 VAD 切分转录；相同音频的并发请求读取同一个任务的进度"""
+
+    def __init__(self):
+        self.transcripts: list[SegmentTranscript] = []
+        self.task: asyncio.Task | None = None
+        self._updated = asyncio.Event()
+
+    def append(self, transcript: SegmentTranscript):
+        self.transcripts.append(transcript)
+        self.notify()
+
+    def notify(self):
+        # 每次更新换一个新的 Event，所有等待者都会被唤醒
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def follow(self):
+        """每有新的语音段转录完成就输出一次当前结果，任务结束后返回"""
+        seen = 0
+        while True:
+            updated = self._updated
+            if len(self.transcripts) > seen:
+                seen = len(self.transcripts)
+                yield self.transcripts[:seen]
+            elif self.task.done():
+                return
+            else:
+                await updated.wait()
+
+
+# 正在进行的转录任务，按缓存键索引；客户端断开后任务仍会运行完并写入缓存
+_vad_jobs: dict[str, VADJob] = {}
+
+
+def start_vad_job(audio_array, sample_rate, cache, cache_key) -> VADJob:
+    job = VADJob()
+
+    async def compute():
+        # VAD 在后台线程中按窗口批量切分语音，切出的语音段按长度分桶立即并发转录，结果按时间顺序逐段输出
+        long_form = config.asr_config.long_form
+        started = time.perf_counter()
+        async for t in transcribe_audio_stream(
+            default_context_cache.vad_engine,
+            default_context_cache.asr_engine,
+            audio_array,
+            sample_rate=sample_rate,
+            window_seconds=long_form.stream_window_seconds,
+            bucket_seconds=long_form.bucket_seconds,
+            max_batch_size=long_form.max_batch_size,
+            max_concurrency=long_form.max_concurrency,
+            cache=cache,
+            vad_key=default_context_cache.vad_key,
+        ):
+            if not job.transcripts:
+                metrics.STAGE_SECONDS.labels("asr_vad", "first_segment").observe(
+                    time.perf_counter() - started
+                )
+            job.append(t)
+        metrics.STAGE_SECONDS.labels("asr_vad", "total").observe(time.perf_counter() - started)
+        logger.info(f"Transcription results: {[asdict(t) for t in job.transcripts]}")
+        return [asdict(t) for t in job.transcripts]
+
+    async def run():
+        if cache is None:
+            return await compute()
+        # 相同的音频直接使用缓存的转录结果，相同音频的并发请求只转录一次
+        value, _ = await cache.get_or_compute(cache_key, compute)
+        return value
+
+    def finished(task):
+        job.notify()
+        if cache_key is not None:
+            _vad_jobs.pop(cache_key, None)
+        if not task.cancelled():
+            task.exception()  # 没有客户端在等待时也标记异常已读取
+
+    job.task = asyncio.create_task(run())
+    job.task.add_done_callback(finished)
+    if cache_key is not None:
+        _vad_jobs[cache_key] = job
+    return job
+
 
 async def process_audio_vad(audio):
+    """VAD 与 ASR 流水线并行，每转录完一段就输出一次当前结果"""
     try:
+        check_ready()
         if audio is None:
             raise ValueError("未提供音频文件")
 
@@ -20,57 +137,46 @@ async def process_audio_vad(audio):
         if len(audio_array) == 0:
             raise ValueError("无效的音频数据：音频为空")
 
-        # 归一化音频数据到 -1 到 1
-        audio_array = audio_array.astype(np.float32)
-        if np.max(np.abs(audio_array)) > 0:
-            audio_array = audio_array / 32768.0  # 将16位整数转换为-1到1之间的浮点数
         logger.info(f"音频采样率: {sample_rate}, 音频数据形状: {audio_array.shape}, 音频数据类型: {audio_array.dtype}")
+        # 归一化到 -1 到 1，多声道混为单声道，并重采样到模型所需的 16kHz
+        with metrics.STAGE_SECONDS.labels("asr_vad", "normalise").time():
+            audio_array = prepare_audio(audio_array, sample_rate, ASRInterface.SAMPLE_RATE)
+            sample_rate = ASRInterface.SAMPLE_RATE
+
+        cache = default_context_cache.transcript_cache
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.key(
+                "transcript",
+                audio_key(audio_array, sample_rate),
+                default_context_cache.vad_key,
+                default_context_cache.asr_key,
+            )
+        # 转录在后台任务中进行，这里只读取进度，客户端断开不会中断转录
+        job = _vad_jobs.get(cache_key) if cache_key is not None else None
+        if job is None:
+            job = start_vad_job(audio_array, sample_rate, cache, cache_key)
+
+        streamed = False
+        async for transcripts in job.follow():
+            streamed = True
+            yield format_vad_output(transcripts)
+        transcripts = [SegmentTranscript(**t) for t in job.task.result()]
 
-        # 使用 VAD 检测语音活动
-        vad_results = list(default_context_cache.vad_engine.detect_speech(audio_array))
-        if len(vad_results) == 0:
+        if len(transcripts) == 0:
             logger.warning("VAD未检测到语音片段")
-            return "未检测到有效的语音片段"
-
-        transcriptions = []
-        for segment in vad_results:
-            logger.info(f"VAD ----segment: {segment}")
-            if isinstance(segment, tuple) and len(segment) == 3:
-                logger.info(f"VAD ----: {start} {end}")
-                start, end, audio_bytes = segment  # 解析 (start, end, audio_bytes)
-                logger.info(start, end, len(audio_bytes))
-
-                if audio_bytes == b"<|PAUSE|>":
-                    logger.info("检测到暂停信号")
-                    continue
-                elif audio_bytes == b"<|RESUME|>":
-                    logger.info("检测到恢复信号")
-                    continue
-                elif len(audio_bytes) > 1024:
-                    # 进行 ASR 语音转录
-                    segment_audio = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
-                    text = await default_context_cache.asr_engine.async_transcribe_np(segment_audio)
-
-                    transcriptions.append({
-                        'text': text,
-                        'start': start,
-                        'end': end
-                    })
-
-        logger.info(f"Transcription results: {transcriptions}")
-        output = {
-            "transcription": ' '.join([t['text'] for t in transcriptions]),
-            "timestamps": [{'text': t['text'], 'start': t['start'], 'end': t['end']} for t in transcriptions]
-        }
-        return f"转录结果: {output['transcription']}\n时间戳: {output['timestamps']}"
+            yield "未检测到有效的语音片段"
+        elif not streamed:
+            yield format_vad_output(transcripts)
 
     except Exception as e:
         logger.error(f"Audio processing failed: {str(e)}")
-        return f"处理失败：{str(e)}"
+        yield f"处理失败：{str(e)}"
 
 
 async def process_audio(audio):
     try:
+        check_ready()
         if audio is None:
             raise ValueError("未提供音频文件")
 
@@ -79,14 +185,23 @@ async def process_audio(audio):
         if len(audio_array) == 0:
             raise ValueError("无效的音频数据：音频为空")
 
-        # 归一化音频数据到 -1 到 1
-        audio_array = audio_array.astype(np.float32)
-        if np.max(np.abs(audio_array)) > 0:
-            audio_array = audio_array / 32768.0  # 将16位整数转换为-1到1之间的浮点数
         logger.info(f"音频采样率: {sample_rate}, 音频数据形状: {audio_array.shape}, 音频数据类型: {audio_array.dtype}")
+        # 归一化到 -1 到 1，多声道混为单声道，并重采样到模型所需的 16kHz
+        with metrics.STAGE_SECONDS.labels("asr", "normalise").time():
+            audio_array = prepare_audio(audio_array, sample_rate, ASRInterface.SAMPLE_RATE)
+            sample_rate = ASRInterface.SAMPLE_RATE
 
-        # 直接进行ASR语音识别
-        text = await default_context_cache.asr_engine.async_transcribe_np(audio_array)
+        # 直接进行ASR语音识别，相同的音频直接使用缓存结果
+        asr_engine = default_context_cache.asr_engine
+        cache = default_context_cache.transcript_cache
+        with metrics.STAGE_SECONDS.labels("asr", "asr").time():
+            if cache is None:
+                text = await asr_engine.async_transcribe_np(audio_array)
+            else:
+                text, _ = await cache.get_or_compute(
+                    cache.key("text", audio_key(audio_array, sample_rate), default_context_cache.asr_key),
+                    lambda: asr_engine.async_transcribe_np(audio_array),
+                )
 
         return f"转录结果: {text}"
 
@@ -95,6 +210,67 @@ async def process_audio(audio):
         return f"处理失败：{str(e)}"
 
 
+async def process_audio_file(path):
+    """按窗口流式读取 WAV 文件，内存占用与文件长度无关，转录结果逐段输出"""
+    try:
+        check_ready()
+        if not path:
+            raise ValueError("未提供音频文件")
+
+        long_form = config.asr_config.long_form
+        lines = []
+        async for t in transcribe_wav_file(
+            default_context_cache.vad_engine,
+            default_context_cache.asr_engine,
+            path,
+            window_seconds=long_form.stream_window_seconds,
+            bucket_seconds=long_form.bucket_seconds,
+            max_batch_size=long_form.max_batch_size,
+            max_concurrency=long_form.max_concurrency,
+        ):
+            lines.append(f"[{t.start:.2f} - {t.end:.2f}] {t.text}")
+            yield "\n".join(lines)
+        if not lines:
+            yield "未检测到有效的语音片段"
+
+    except Exception as e:
+        logger.error(f"Audio file processing failed: {str(e)}")
+        yield f"处理失败：{str(e)}"
+
+
+async def stream_microphone(chunk, session):
+    """麦克风流式输入：每段音频送入该用户的 VAD 会话，说完一句就转录并更新文本"""
+    try:
+        check_ready()
+        if session is None:
+            session = MicrophoneSession(default_context_cache, config.system_config.microphone)
+        if chunk is None:
+            return session.text, session
+        sample_rate, audio_array = chunk  # Gradio 传入的是 (sample_rate, numpy_array)
+        return await session.feed(sample_rate, audio_array), session
+
+    except Exception as e:
+        logger.error(f"Microphone streaming failed: {str(e)}")
+        return f"处理失败：{str(e)}", session
+
+
+async def finish_microphone(session):
+    """停止录音：转录最后一句并输出完整结果"""
+    if session is None:
+        return ""
+    try:
+        return await session.finish()
+    except Exception as e:
+        logger.error(f"Microphone streaming failed: {str(e)}")
+        return f"处理失败：{str(e)}"
+
+
+def close_microphone_session(session):
+    """页面关闭或会话超时后释放 VAD 缓冲区"""
+    if session is not None:
+        session.close()
+
+
 def create_ui():
     """Create the Gradio interface"""
     with gr.Blocks(title="音频处理系统") as interface:
@@ -121,9 +297,93 @@ def create_ui():
             inputs=[audio_input],
             outputs=[output_text]
         )
+
+        gr.Markdown("## 长音频（VAD 切分，逐段输出）")
+        with gr.Row():
+            vad_audio_input = gr.Audio(
+                label="上传音频文件",
+                sources=["upload"]
+            )
+
+        with gr.Row():
+            vad_btn = gr.Button("VAD 切分转录", variant="primary")
+
+        with gr.Row():
+            vad_output = gr.Textbox(
+                label="转录结果",
+                placeholder="语音段转录完成后将逐段显示在这里...",
+                lines=10
+            )
+
+        vad_btn.click(
+            fn=process_audio_vad,
+            inputs=[vad_audio_input],
+            outputs=[vad_output]
+        )
+
+        gr.Markdown("## 长音频文件（WAV，流式转录）")
+        with gr.Row():
+            file_input = gr.File(
+                label="上传 WAV 文件",
+                file_types=[".wav"],
+                type="filepath"
+            )
+
+        with gr.Row():
+            file_btn = gr.Button("流式转录", variant="primary")
+
+        with gr.Row():
+            file_output = gr.Textbox(
+                label="转录结果",
+                placeholder="转录结果将逐段显示在这里...",
+                lines=10
+            )
+
+        file_btn.click(
+            fn=process_audio_file,
+            inputs=[file_input],
+            outputs=[file_output]
+        )
+
+        gr.Markdown("## 实时麦克风转录")
+        microphone = config.system_config.microphone
+        with gr.Row():
+            mic_input = gr.Audio(
+                label="麦克风",
+                sources=["microphone"],
+                streaming=True
+            )
+
+        with gr.Row():
+            mic_output = gr.Textbox(
+                label="实时转录结果",
+                placeholder="开始录音后，每说完一句话转录结果就会显示在这里...",
+                lines=10
+            )
+
+        # 每个用户一个会话；关闭页面或超时后由 delete_callback 释放
+        mic_state = gr.State(
+            None,
+            time_to_live=microphone.session_ttl_seconds,
+            delete_callback=close_microphone_session
+        )
+        mic_input.stream(
+            fn=stream_microphone,
+            inputs=[mic_input, mic_state],
+            outputs=[mic_output, mic_state],
+            stream_every=microphone.stream_every_seconds,
+            concurrency_limit=None
+        )
+        mic_input.stop_recording(
+            fn=finish_microphone,
+            inputs=[mic_state],
+            outputs=[mic_output]
+        )
     
     return interface
 
 if __name__ == "__main__":
+    if config.system_config.metrics_enabled:
+        metrics.start_http_server(config.system_config.host, config.system_config.metrics_port)
     interface = create_ui()
     interface.launch(debug=True, server_name="0.0.0.0", server_port=29999, share=False)
@@ -13,6 +13,12 @@ class ASRFactory:
                 download_root=kwargs.get("download_root"),
                 language=kwargs.get("language"),
                 device=kwargs.get("device"),
+                compute_type=kwargs.get("compute_type", "float32"),
+                beam_size=kwargs.get("beam_size", 5),
+                cpu_threads=kwargs.get("cpu_threads", 0),
+                num_workers=kwargs.get("num_workers", 1),
+                use_batched_pipeline=kwargs.get("use_batched_pipeline", False),
+                batch_size=kwargs.get("batch_size", 8),
             )
         elif system_name == "whisper_cpp":
             from .whisper_cpp_asr import VoiceRecognition as WhisperCPPASR
@@ -40,5 +46,9 @@ class ASRFactory:
             from .sherpa_onnx_asr import VoiceRecognition as SherpaOnnxASR
 
             return SherpaOnnxASR(**kwargs)
+        elif system_name == "stub":
+            from .stub_asr import VoiceRecognition as StubASR
+
+            return StubASR(**kwargs)
         else:
             raise ValueError(f"Unknown ASR system: {system_name}")
@@ -1,17 +1,44 @@
 import abc
 import numpy as np
 import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from .. import metrics
+from .batch_scheduler import BatchScheduler
+
+
+@dataclass
+class StreamingResult:
+    """A hypothesis produced while audio is still arriving."""
+
+    text: str
+    is_final: bool  # True once the endpoint of the utterance has been detected
+    segment: int  # index of the utterance within the stream
 
 
 class ASRInterface(metaclass=abc.ABCMeta):
     SAMPLE_RATE = 16000
     NUM_CHANNELS = 1
     SAMPLE_WIDTH = 2
+    # Largest number of utterances the backend can decode in one call.
+    # Backends that override transcribe_batch_np with a real batched decode raise this.
+    MAX_BATCH_SIZE = 1
+
+    _batch_scheduler: BatchScheduler | None = None
+
+    @property
+    def backend_name(self) -> str:
+        """Name of the backend used in logs and metric labels."""
+        return type(self).__module__.rsplit(".", 1)[-1]
 
     async def async_transcribe_np(self, audio: np.ndarray) -> str:
         """Asynchronously transcribe speech audio in numpy array format.
 
         By default, this runs the synchronous transcribe_np in a coroutine.
+        If batching is enabled, the request is handed to the batch scheduler
+        and decoded together with other concurrent requests.
         Subclasses can override this method to provide true async implementation.
 
         Args:
@@ -20,8 +47,112 @@ class ASRInterface(metaclass=abc.ABCMeta):
         Returns:
             str: The transcription result.
         """
+        if self._batch_scheduler is not None:
+            return await self._batch_scheduler.submit(audio)
+        if metrics.is_enabled():
+            texts = await asyncio.to_thread(
+                self.timed_transcribe_batch_np, [audio], time.perf_counter()
+            )
+            return texts[0]
         return await asyncio.to_thread(self.transcribe_np, audio)
 
+    def transcribe_batch_np(self, audios: list[np.ndarray]) -> list[str]:
+        """Transcribe several utterances and return one transcription per input.
+
+        The default implementation decodes them one after another.
+
+        Args:
+            audios: The numpy arrays of the audio data to transcribe.
+        """
+        return [self.transcribe_np(audio) for audio in audios]
+
+    def timed_transcribe_batch_np(
+        self, audios: list[np.ndarray], enqueued_at: float | None = None
+    ) -> list[str]:
+        """Run transcribe_batch_np and record its decode time in the metrics.
+
+        Args:
+            audios: The numpy arrays of the audio data to transcribe.
+            enqueued_at: time.perf_counter() when the request was queued, used
+                to record how long it waited before the decode started.
+        """
+        if not metrics.is_enabled():
+            return self.transcribe_batch_np(audios)
+        started = time.perf_counter()
+        texts = (
+            [self.transcribe_np(audios[0])]
+            if len(audios) == 1
+            else self.transcribe_batch_np(audios)
+        )
+        metrics.observe_asr(
+            self.backend_name,
+            sum(len(audio) for audio in audios) / self.SAMPLE_RATE,
+            time.perf_counter() - started,
+            [started - enqueued_at] * len(audios) if enqueued_at is not None else None,
+        )
+        return texts
+
+    def enable_batching(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: int = 1,
+    ) -> BatchScheduler | None:
+        """Route async_transcribe_np through a micro-batching scheduler.
+
+        The batch size is capped by the backend's MAX_BATCH_SIZE; backends
+        that cannot batch keep the plain per-request path.
+
+        Args:
+            max_batch_size: Upper bound on utterances per batched call.
+            max_wait_ms: How long the oldest request may wait for others to join.
+            max_concurrent_batches: Batches allowed to decode at the same time.
+
+        Returns:
+            BatchScheduler | None: The scheduler, or None if batching is not possible.
+        """
+        batch_size = min(max_batch_size, self.MAX_BATCH_SIZE)
+        if batch_size <= 1:
+            self._batch_scheduler = None
+            return None
+        self._batch_scheduler = BatchScheduler(
+            self.transcribe_batch_np,
+            max_batch_size=batch_size,
+            max_wait_ms=max_wait_ms,
+            max_concurrent_batches=max_concurrent_batches,
+            name=self.backend_name,
+            sample_rate=self.SAMPLE_RATE,
+        )
+        return self._batch_scheduler
+
+    def batch_stats(self) -> dict | None:
+        """Return batching and queue-wait counters, or None if batching is off."""
+        if self._batch_scheduler is None:
+            return None
+        return self._batch_scheduler.stats.as_dict()
+
+    async def transcribe_stream(
+        self, chunks: AsyncIterator[np.ndarray]
+    ) -> AsyncIterator[StreamingResult]:
+        """Transcribe audio that arrives in chunks, yielding results as they become available.
+
+        By default, the chunks are collected and transcribed once the stream ends,
+        yielding a single final result. Backends with a streaming recognizer
+        override this to yield partial hypotheses.
+
+        Args:
+            chunks: An async iterator of numpy arrays of audio data.
+
+        Yields:
+            StreamingResult: Partial and final transcriptions.
+        """
+        collected = [chunk async for chunk in chunks]
+        if not collected:
+            return
+        text = await self.async_transcribe_np(np.concatenate(collected))
+        if text:
+            yield StreamingResult(text=text, is_final=True, segment=0)
+
     @abc.abstractmethod
     def transcribe_np(self, audio: np.ndarray) -> str:
         """Transcribe speech audio in numpy array format and return the transcription.
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+import numpy as np
+from loguru import logger
+
+from .. import metrics
+from ..utils.micro_batch import BatchRequest, MicroBatchScheduler
+
+
+@dataclass
+class BatchStats:
+    """Counters describing how the scheduler has been batching requests."""
+
+    requests: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    max_batch_size: int = 0
+    queue_wait_total: float = 0.0  # seconds
+    queue_wait_max: float = 0.0  # seconds
+    decode_time_total: float = 0.0  # seconds
+    batch_size_counts: dict = field(default_factory=dict)
+
+    def record_batch(self, waits: List[float], decode_time: float) -> None:
+        size = len(waits)
+        self.requests += size
+        self.batches += 1
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.queue_wait_total += sum(waits)
+        self.queue_wait_max = max(self.queue_wait_max, max(waits))
+        self.decode_time_total += decode_time
+        self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "mean_queue_wait_ms": (
+                1000 * self.queue_wait_total / self.requests if self.requests else 0.0
+            ),
+            "max_queue_wait_ms": 1000 * self.queue_wait_max,
+            "mean_decode_ms": (
+                1000 * self.decode_time_total / self.batches if self.batches else 0.0
+            ),
+            "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+        }
+
+
+class BatchScheduler(MicroBatchScheduler):
+    """Gathers concurrent transcription requests into batched backend calls.
+
+    Requests submitted within ``max_wait_ms`` of the oldest pending request are
+    decoded together (up to ``max_batch_size``) through ``batch_fn``, which runs
+    in a worker thread. Each caller gets back its own result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[np.ndarray]], List[str]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: int = 1,
+        name: str = "asr",
+        sample_rate: int = 16000,
+    ) -> None:
+        super().__init__(max_batch_size, max_wait_ms, max_concurrent_batches)
+        self.batch_fn = batch_fn
+        self.name = name
+        self.sample_rate = sample_rate
+        self.stats = BatchStats()
+
+    async def submit(self, audio: np.ndarray) -> str:
+        """Queue one utterance and wait for its transcription."""
+        return await self._submit(audio)
+
+    def run_batch(self, items: List[np.ndarray]) -> List[str]:
+        return self.batch_fn(items)
+
+    def on_batch_failed(self, batch: List[BatchRequest], error: Exception) -> None:
+        self.stats.failed_batches += 1
+        logger.error(f"Batched {self.name} decode failed: {error}")
+
+    def on_batch_done(self, batch: List[BatchRequest], started: float, finished: float) -> None:
+        waits = [started - request.enqueued_at for request in batch]
+        decode_time = finished - started
+        self.stats.record_batch(waits, decode_time)
+        metrics.observe_asr(
+            self.name,
+            sum(len(request.item) for request in batch) / self.sample_rate,
+            decode_time,
+            waits,
+        )
+        logger.debug(
+            f"{self.name} batch of {len(batch)} decoded in {decode_time * 1000:.1f} ms "
+            f"(max queue wait {max(waits) * 1000:.1f} ms)"
+        )
@@ -0,0 +1,335 @@
+"""Measure the real-time factor and latency of an ASR backend.
+
+Runs the backend selected in the config (or ``--asr-model``) over reference
+audio of several durations through ``transcribe_np``, ``async_transcribe_np``
+and ``transcribe_batch_np``, and prints a JSON report. Each ``--variant``
+runs the backend again with some settings overridden, so modes such as
+compute types or the batched pipeline can be compared side by side. With
+``--compare`` the report is checked against an earlier one and the exit
+code is 1 if any metric regressed by more than ``--tolerance``.
+
+Usage:
+    python -m src.asr.benchmark --asr-model stub --output baseline.json
+    python -m src.asr.benchmark --durations 2 10 30 --repeat 20
+    python -m src.asr.benchmark --compare baseline.json --tolerance 0.1
+    python -m src.asr.benchmark --asr-model faster_whisper \
+        --variant float32:compute_type=float32 \
+        --variant int8:compute_type=int8,beam_size=1 \
+        --variant int8_batched:compute_type=int8,beam_size=1,use_batched_pipeline=true
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import yaml
+from loguru import logger
+
+from ..utils.reference_audio import load_wav, synthetic_speech
+from .asr_factory import ASRFactory
+from .asr_interface import ASRInterface
+
+# metrics compared by --compare; higher is worse for all of them
+COMPARED_METRICS = ("rtf", "p50_ms", "p95_ms", "p99_ms")
+COMPARED_TOP_LEVEL = ("load_seconds", "peak_rss_mb")
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process, or None where unavailable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def latency_stats(latencies: list[float], audio_seconds: float) -> dict:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "runs": len(latencies),
+        "rtf": round(float(np.mean(latencies)) / audio_seconds, 5),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def bench_sync(engine: ASRInterface, audio: np.ndarray, warmup: int, repeat: int) -> list[float]:
+    for _ in range(warmup):
+        engine.transcribe_np(audio)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.transcribe_np(audio)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_batch(
+    engine: ASRInterface, audio: np.ndarray, warmup: int, repeat: int, batch_size: int
+) -> list[float]:
+    """Latencies of transcribe_batch_np on ``batch_size`` copies of the clip."""
+    batch = [audio] * batch_size
+    for _ in range(warmup):
+        engine.transcribe_batch_np(batch)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.transcribe_batch_np(batch)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def bench_async(
+    engine: ASRInterface, audio: np.ndarray, warmup: int, repeat: int, concurrency: int
+) -> tuple[list[float], float]:
+    """Run ``repeat`` rounds of ``concurrency`` simultaneous requests.
+
+    Returns:
+        The latency of every request, and the total wall time of the timed rounds.
+    """
+
+    async def timed() -> float:
+        start = time.perf_counter()
+        await engine.async_transcribe_np(audio)
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        await asyncio.gather(*(timed() for _ in range(concurrency)))
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        latencies.extend(await asyncio.gather(*(timed() for _ in range(concurrency))))
+    return latencies, time.perf_counter() - start
+
+
+def reference_clips(durations: list[float], wav: str | None) -> dict[float, np.ndarray]:
+    """Cut one clip per duration from a WAV file, or synthesise them."""
+    if wav:
+        audio, sample_rate = load_wav(wav)
+        if sample_rate != ASRInterface.SAMPLE_RATE:
+            raise ValueError(f"Reference audio must be {ASRInterface.SAMPLE_RATE} Hz")
+        if len(audio) < max(durations) * sample_rate:
+            raise ValueError(f"Reference audio is shorter than {max(durations)}s")
+    else:
+        audio = synthetic_speech(max(durations), ASRInterface.SAMPLE_RATE)
+    return {d: audio[: int(d * ASRInterface.SAMPLE_RATE)] for d in durations}
+
+
+def run_benchmark(
+    asr_model: str,
+    asr_kwargs: dict,
+    durations: list[float],
+    warmup: int = 2,
+    repeat: int = 10,
+    concurrency: int = 4,
+    batch_size: int = 8,
+    wav: str | None = None,
+) -> dict:
+    """Load the backend, time it on every clip and return the report."""
+    clips = reference_clips(durations, wav)
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    engine = ASRFactory.get_asr_system(asr_model, **asr_kwargs)
+    load_seconds = time.perf_counter() - start
+    logger.info(f"Loaded {asr_model} in {load_seconds:.2f}s")
+
+    results = {"sync": {}, "async": {}, "batch": {}}
+    for duration, audio in clips.items():
+        key = f"{duration:g}s"
+        latencies = bench_sync(engine, audio, warmup, repeat)
+        results["sync"][key] = latency_stats(latencies, duration)
+
+        latencies, wall = asyncio.run(bench_async(engine, audio, warmup, repeat, concurrency))
+        stats = latency_stats(latencies, duration)
+        stats["throughput_rtf"] = round(wall / (duration * len(latencies)), 5)
+        results["async"][key] = stats
+
+        # rtf of a batch is relative to all the audio in it
+        latencies = bench_batch(engine, audio, warmup, repeat, batch_size)
+        results["batch"][key] = latency_stats(latencies, duration * batch_size)
+        logger.info(
+            f"{key}: sync RTF {results['sync'][key]['rtf']}, "
+            f"async RTF {stats['rtf']} (throughput {stats['throughput_rtf']}), "
+            f"batch RTF {results['batch'][key]['rtf']}"
+        )
+
+    close = getattr(engine, "close", None)
+    if callable(close):
+        close()
+
+    rss_after = peak_rss_mb()
+    return {
+        "asr_model": asr_model,
+        "asr_kwargs": asr_kwargs,
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "reference_audio": wav or "synthetic",
+        "warmup": warmup,
+        "repeat": repeat,
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "load_seconds": round(load_seconds, 3),
+        "peak_rss_mb": round(rss_after, 1) if rss_after is not None else None,
+        "rss_before_load_mb": round(rss_before, 1) if rss_before is not None else None,
+        "results": results,
+    }
+
+
+def compare_reports(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """List the metrics that are more than ``tolerance`` worse than the baseline."""
+    if "variants" in current:
+        regressions = []
+        for name, report in current["variants"].items():
+            old = baseline.get("variants", {}).get(name)
+            if old is not None:
+                for r in compare_reports(report, old, tolerance):
+                    regressions.append({**r, "metric": f"{name}.{r['metric']}"})
+        return regressions
+
+    pairs = [((name,), current.get(name), baseline.get(name)) for name in COMPARED_TOP_LEVEL]
+    for mode, by_duration in current["results"].items():
+        for key, stats in by_duration.items():
+            old = baseline.get("results", {}).get(mode, {}).get(key)
+            if old is None:
+                continue
+            pairs += [((mode, key, m), stats.get(m), old.get(m)) for m in COMPARED_METRICS]
+
+    regressions = []
+    for path, new, old in pairs:
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        if change > tolerance:
+            regressions.append(
+                {"metric": ".".join(path), "baseline": old, "current": new, "change": round(change, 3)}
+            )
+    return regressions
+
+
+def summarise_variants(variants: dict) -> dict:
+    """RTF of every variant per mode and clip duration, for a quick comparison."""
+    return {
+        name: {
+            mode: {key: stats["rtf"] for key, stats in by_duration.items()}
+            for mode, by_duration in report["results"].items()
+        }
+        for name, report in variants.items()
+    }
+
+
+def parse_variant(text: str) -> tuple[str, dict]:
+    """Parse ``name:key=value,key=value``; values are read as YAML scalars."""
+    name, _, assignments = text.partition(":")
+    overrides = {}
+    for assignment in filter(None, assignments.split(",")):
+        key, _, value = assignment.partition("=")
+        overrides[key.strip()] = yaml.safe_load(value)
+    return name, overrides
+
+
+def _asr_kwargs(config_path: str, asr_model: str) -> dict:
+    """Backend settings from the config file, or the stub defaults without one."""
+    if os.path.exists(config_path):
+        from ..config_manager.utils import read_yaml, validate_config
+
+        asr_config = validate_config(read_yaml(config_path)).asr_config
+        backend_config = getattr(asr_config, asr_model, None)
+        if backend_config is not None:
+            return backend_config.model_dump()
+    if asr_model == "stub":
+        from ..config_manager.asr import StubASRConfig
+
+        return StubASRConfig().model_dump()
+    raise ValueError(f"No settings for {asr_model} in {config_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--asr-model", help="backend to run instead of asr_config.asr_model")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 5, 15, 30])
+    parser.add_argument("--file", help="16 kHz WAV file to cut reference clips from")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="simultaneous async requests")
+    parser.add_argument("--batch-size", type=int, default=8, help="clips per transcribe_batch_np call")
+    parser.add_argument(
+        "--variant",
+        action="append",
+        default=[],
+        help="name:key=value,... backend settings to override; repeat to compare modes",
+    )
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    asr_model = args.asr_model
+    if asr_model is None:
+        from ..config_manager.utils import read_yaml, validate_config
+
+        asr_model = validate_config(read_yaml(args.config)).asr_config.asr_model
+
+    asr_kwargs = _asr_kwargs(args.config, asr_model)
+    options = dict(
+        warmup=args.warmup,
+        repeat=args.repeat,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        wav=args.file,
+    )
+    if args.variant:
+        variants = {}
+        for name, overrides in map(parse_variant, args.variant):
+            logger.info(f"Running variant {name}: {overrides}")
+            variants[name] = run_benchmark(
+                asr_model, {**asr_kwargs, **overrides}, args.durations, **options
+            )
+        report = {
+            "asr_model": asr_model,
+            "summary_rtf": summarise_variants(variants),
+            "variants": variants,
+        }
+    else:
+        report = run_benchmark(asr_model, asr_kwargs, args.durations, **options)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        report["comparison"] = {
+            "baseline": args.compare,
+            "tolerance": args.tolerance,
+            "regressions": regressions,
+        }
+        for r in regressions:
+            logger.warning(
+                f"Regression in {r['metric']}: {r['baseline']} -> {r['current']} "
+                f"(+{r['change']:.0%})"
+            )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
+from bisect import bisect_right
+
 import numpy as np
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 from .asr_interface import ASRInterface
 
+# Whisper decodes at most 30 s per window; longer clips are not batched
+MAX_CLIP_SECONDS = 30
+# Silence between clips packed into one batched call
+CLIP_GAP_SECONDS = 0.5
+
 
 class VoiceRecognition(ASRInterface):
-    BEAM_SEARCH = True
     # SAMPLE_RATE # Defined in asr_interface.py
 
     def __init__(
@@ -13,24 +19,46 @@ class VoiceRecognition(ASRInterface):
         download_root: str = None,
         language: str = None,
         device: str = "auto",
+        compute_type: str = "float32",
+        beam_size: int = 5,
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        use_batched_pipeline: bool = False,
+        batch_size: int = 8,
     ) -> None:
         self.MODEL_PATH = model_path
         self.LANG = language
+        self.beam_size = beam_size
+        self.batch_size = batch_size
 
         self.model = WhisperModel(
             model_path,
             download_root=download_root,
             device=device,
-            compute_type="float32",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
         )
+        self.pipeline = BatchedInferencePipeline(self.model) if use_batched_pipeline else None
+        if self.pipeline is not None:
+            self.MAX_BATCH_SIZE = batch_size
 
     def transcribe_np(self, audio: np.ndarray) -> str:
-        segments, info = self.model.transcribe(
-            audio,
-            beam_size=5 if self.BEAM_SEARCH else 1,
-            language= self.LANG if self.LANG else None,
-            condition_on_previous_text=False,
-        )
+        if self.pipeline is not None and len(audio) > MAX_CLIP_SECONDS * self.SAMPLE_RATE:
+            # long input: the pipeline splits it on speech and decodes the chunks in batches
+            segments, info = self.pipeline.transcribe(
+                audio,
+                language=self.LANG if self.LANG else None,
+                beam_size=self.beam_size,
+                batch_size=self.batch_size,
+            )
+        else:
+            segments, info = self.model.transcribe(
+                audio,
+                beam_size=self.beam_size,
+                language=self.LANG if self.LANG else None,
+                condition_on_previous_text=False,
+            )
 
         text = [segment.text for segment in segments]
 
@@ -38,3 +66,52 @@ class VoiceRecognition(ASRInterface):
             return ""
         else:
             return "".join(text)
+
+    def transcribe_batch_np(self, audios: list[np.ndarray]) -> list[str]:
+        """Decode several clips together through the batched inference pipeline.
+
+        The clips are laid out one after another with a short silence in
+        between and passed as clip timestamps, so each one is decoded as its
+        own window of the batch. Clips longer than one Whisper window are
+        decoded on their own.
+        """
+        if self.pipeline is None:
+            return super().transcribe_batch_np(audios)
+
+        texts = [""] * len(audios)
+        short = [
+            i for i, audio in enumerate(audios)
+            if 0 < len(audio) <= MAX_CLIP_SECONDS * self.SAMPLE_RATE
+        ]
+        for i, audio in enumerate(audios):
+            if len(audio) > MAX_CLIP_SECONDS * self.SAMPLE_RATE:
+                texts[i] = self.transcribe_np(audio)
+        if not short:
+            return texts
+
+        gap = np.zeros(int(CLIP_GAP_SECONDS * self.SAMPLE_RATE), dtype=np.float32)
+        parts, clips, offsets, position = [], [], [], 0
+        for i in short:
+            audio = np.asarray(audios[i], dtype=np.float32)
+            offsets.append(position / self.SAMPLE_RATE)
+            clips.append(
+                {
+                    "start": position / self.SAMPLE_RATE,
+                    "end": (position + len(audio)) / self.SAMPLE_RATE,
+                }
+            )
+            parts += [audio, gap]
+            position += len(audio) + len(gap)
+
+        segments, info = self.pipeline.transcribe(
+            np.concatenate(parts),
+            language=self.LANG if self.LANG else None,
+            beam_size=self.beam_size,
+            batch_size=self.batch_size,
+            clip_timestamps=clips,
+        )
+        for segment in segments:
+            # segment times are absolute; find the clip the segment starts in
+            clip = max(0, bisect_right(offsets, segment.start + 1e-3) - 1)
+            texts[short[clip]] += segment.text
+        return texts
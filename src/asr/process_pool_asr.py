@@ -0,0 +1,273 @@
+import asyncio
+import atexit
+import itertools
+import multiprocessing as mp
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from loguru import logger
+
+from .. import metrics
+from .asr_interface import ASRInterface
+
+
+def _worker_main(conn, asr_model: str, asr_kwargs: dict) -> None:
+    """Entry point of a worker process: load one backend and serve jobs."""
+    from .asr_factory import ASRFactory
+
+    try:
+        engine = ASRFactory.get_asr_system(asr_model, **asr_kwargs)
+    except Exception as e:
+        conn.send(("init_error", None, repr(e)))
+        return
+    conn.send(("ready", None, None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        job_id, shm_name, num_samples = message
+        try:
+            # workers share the parent's resource tracker, which unlinks the block
+            shm = SharedMemory(name=shm_name)
+            try:
+                audio = np.ndarray((num_samples,), dtype=np.float32, buffer=shm.buf)
+                started = time.perf_counter()
+                text = engine.transcribe_np(audio)
+                decode_seconds = time.perf_counter() - started
+                del audio
+            finally:
+                shm.close()
+            conn.send(("result", job_id, (text, decode_seconds)))
+        except Exception as e:
+            conn.send(("error", job_id, repr(e)))
+
+
+@dataclass
+class _Job:
+    job_id: int
+    shm: SharedMemory
+    num_samples: int
+    future: Future = field(default_factory=Future)
+    attempts: int = 0
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class _Worker:
+    def __init__(self, pool: "ASRProcessPool", index: int) -> None:
+        self.pool = pool
+        self.index = index
+        self.pending: dict[int, _Job] = {}
+        self.ready = threading.Event()
+        self.failed = False
+        self._send_lock = threading.Lock()
+        self.start()
+
+    def start(self) -> None:
+        parent_conn, child_conn = self.pool._context.Pipe()
+        self.conn = parent_conn
+        self.process = self.pool._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.pool.asr_model, self.pool.asr_kwargs),
+            name=f"asr-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready.clear()
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            args=(self.conn, self.process),
+            name=f"asr-worker-{self.index}-reader",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def send(self, job: _Job) -> None:
+        with self._send_lock:
+            self.pending[job.job_id] = job
+            job.attempts += 1
+            self.conn.send((job.job_id, job.shm.name, job.num_samples))
+
+    def _read_loop(self, conn, process) -> None:
+        while True:
+            try:
+                kind, job_id, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if kind == "ready":
+                logger.info(f"ASR worker {self.index} ready (pid {process.pid})")
+                self.ready.set()
+            elif kind == "init_error":
+                logger.critical(f"ASR worker {self.index} failed to load the model: {payload}")
+                self.failed = True
+                self.ready.set()
+            else:
+                job = self.pending.pop(job_id, None)
+                if job is None:
+                    continue
+                self.pool._release(job)
+                if job.future.done():  # cancelled by the caller
+                    continue
+                if kind == "result":
+                    text, decode_seconds = payload
+                    metrics.observe_asr(
+                        self.pool.backend_name,
+                        job.num_samples / self.pool.SAMPLE_RATE,
+                        decode_seconds,
+                        [time.perf_counter() - job.submitted_at - decode_seconds],
+                    )
+                    job.future.set_result(text)
+                else:
+                    job.future.set_exception(RuntimeError(f"ASR worker error: {payload}"))
+
+        process.join(timeout=1)
+        if not self.pool._closed:
+            self.pool._on_worker_exit(self, process.exitcode)
+
+
+class ASRProcessPool(ASRInterface):
+    """Runs a backend in several worker processes behind the ASRInterface.
+
+    Each worker loads its own instance of the backend. Audio is handed over
+    through shared memory blocks, so only a block name and length go through
+    the pipe. Jobs are sent to the worker with the fewest outstanding jobs;
+    a worker that dies is restarted and its outstanding jobs are resubmitted.
+    """
+
+    def __init__(
+        self,
+        asr_model: str,
+        asr_kwargs: dict,
+        num_workers: int = 2,
+        restart_on_crash: bool = True,
+        max_job_retries: int = 1,
+        start_method: str = "spawn",
+    ) -> None:
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.asr_model = asr_model
+        self.asr_kwargs = asr_kwargs
+        self.restart_on_crash = restart_on_crash
+        self.max_job_retries = max_job_retries
+
+        self._context = mp.get_context(start_method)
+        # Workers must share this process's resource tracker, so that attaching
+        # to a block in a worker does not make a second tracker unlink it
+        resource_tracker.ensure_running()
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        logger.info(f"Starting {num_workers} {asr_model} worker processes")
+        self.workers = [_Worker(self, i) for i in range(num_workers)]
+        atexit.register(self.close)
+
+    @property
+    def backend_name(self) -> str:
+        return self.asr_model
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until every worker has loaded its model."""
+        return all(worker.ready.wait(timeout) for worker in self.workers)
+
+    def submit(self, audio: np.ndarray) -> Future:
+        """Copy the audio into shared memory and queue it on the least loaded worker."""
+        if self._closed:
+            raise RuntimeError("ASR process pool is closed")
+        audio = np.asarray(audio, dtype=np.float32)
+        shm = SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        job = _Job(next(self._job_ids), shm, len(audio))
+        self._dispatch(job)
+        return job.future
+
+    def _dispatch(self, job: _Job) -> None:
+        with self._lock:
+            candidates = [w for w in self.workers if not w.failed]
+            if not candidates:
+                self._release(job)
+                job.future.set_exception(RuntimeError("No ASR worker is available"))
+                return
+            worker = min(candidates, key=lambda w: len(w.pending))
+            try:
+                worker.send(job)
+            except (BrokenPipeError, OSError):
+                # the reader thread will notice the exit and resubmit the job
+                pass
+
+    def _release(self, job: _Job) -> None:
+        job.shm.close()
+        try:
+            job.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _on_worker_exit(self, worker: _Worker, exitcode: int | None) -> None:
+        with self._lock:
+            orphaned = list(worker.pending.values())
+            worker.pending.clear()
+
+            if worker.failed or not self.restart_on_crash:
+                worker.failed = True
+                logger.error(
+                    f"ASR worker {worker.index} exited (code {exitcode}) and will not be restarted"
+                )
+            else:
+                logger.warning(f"ASR worker {worker.index} exited (code {exitcode}); restarting")
+                worker.start()
+
+        for job in orphaned:
+            if job.attempts <= self.max_job_retries:
+                self._dispatch(job)
+            else:
+                self._release(job)
+                if not job.future.done():
+                    job.future.set_exception(
+                        RuntimeError(f"ASR worker crashed while transcribing (job {job.job_id})")
+                    )
+
+    def transcribe_np(self, audio: np.ndarray) -> str:
+        return self.submit(audio).result()
+
+    def transcribe_batch_np(self, audios: list[np.ndarray]) -> list[str]:
+        futures = [self.submit(audio) for audio in audios]
+        return [future.result() for future in futures]
+
+    def timed_transcribe_batch_np(
+        self, audios: list[np.ndarray], enqueued_at: float | None = None
+    ) -> list[str]:
+        # the workers report their own decode times
+        return self.transcribe_batch_np(audios)
+
+    async def async_transcribe_np(self, audio: np.ndarray) -> str:
+        return await asyncio.wrap_future(self.submit(audio))
+
+    def close(self) -> None:
+        """Stop all workers."""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            for job in worker.pending.values():
+                self._release(job)
+                if not job.future.done():
+                    job.future.set_exception(RuntimeError("ASR process pool closed"))
+            worker.pending.clear()
@@ -1,13 +1,18 @@
 import os
+import asyncio
+from typing import AsyncIterator
 import numpy as np
 import sherpa_onnx
 from loguru import logger
-from .asr_interface import ASRInterface
+from .asr_interface import ASRInterface, StreamingResult
 from .utils import download_and_extract, check_and_extract_local_file
 import onnxruntime
 
 
 class VoiceRecognition(ASRInterface):
+    # decode_streams takes a list of streams, so several utterances share one call
+    MAX_BATCH_SIZE = 32
+
     def __init__(
         self,
         model_type: str = "paraformer",  # or "transducer", "nemo_ctc", "wenet_ctc", "whisper", "tdnn_ctc", "sense_voice"
@@ -37,6 +42,7 @@ class VoiceRecognition(ASRInterface):
         feature_dim: int = 80,  # Feature dimension
         use_itn: bool = True,  # Use ITN for SenseVoice models
         provider: str = "cpu",  # Provider for inference (cpu or cuda)
+        online: dict = None,  # Streaming recognizer settings, see SherpaOnnxOnlineConfig
     ) -> None:
         self.model_type = model_type
         self.encoder = encoder
@@ -82,6 +88,11 @@ class VoiceRecognition(ASRInterface):
 
         self.recognizer = self._create_recognizer()
 
+        self.online = online
+        self.online_recognizer = (
+            self._create_online_recognizer(online) if online else None
+        )
+
     def _create_recognizer(self):
         if self.model_type == "transducer":
             recognizer = sherpa_onnx.OfflineRecognizer.from_transducer(
@@ -198,8 +209,135 @@ class VoiceRecognition(ASRInterface):
 
         return recognizer
 
+    def _create_online_recognizer(self, online: dict):
+        common = dict(
+            tokens=online["tokens"],
+            num_threads=online.get("num_threads", 2),
+            sample_rate=self.SAMPLE_RATE,
+            feature_dim=self.feature_dim,
+            enable_endpoint_detection=online.get("enable_endpoint_detection", True),
+            rule1_min_trailing_silence=online.get("rule1_min_trailing_silence", 2.4),
+            rule2_min_trailing_silence=online.get("rule2_min_trailing_silence", 1.2),
+            rule3_min_utterance_length=online.get("rule3_min_utterance_length", 20.0),
+            decoding_method=online.get("decoding_method", "greedy_search"),
+            provider=self.provider,
+            debug=self.debug,
+        )
+        model_type = online["model_type"]
+        logger.info(f"Sherpa-Onnx-ASR: Creating online {model_type} recognizer")
+
+        if model_type == "transducer":
+            return sherpa_onnx.OnlineRecognizer.from_transducer(
+                encoder=online["encoder"],
+                decoder=online["decoder"],
+                joiner=online["joiner"],
+                **common,
+            )
+        elif model_type == "paraformer":
+            return sherpa_onnx.OnlineRecognizer.from_paraformer(
+                encoder=online["encoder"],
+                decoder=online["decoder"],
+                **common,
+            )
+        elif model_type == "zipformer2_ctc":
+            return sherpa_onnx.OnlineRecognizer.from_zipformer2_ctc(
+                model=online["zipformer2_ctc"],
+                **common,
+            )
+        else:
+            raise ValueError(f"Invalid online model type: {model_type}")
+
+    def create_online_session(self) -> "OnlineSession":
+        """Create a streaming session with its own recognizer stream."""
+        if self.online_recognizer is None:
+            raise RuntimeError(
+                "Online mode is not configured. Add an `online` block to sherpa_onnx_asr."
+            )
+        return OnlineSession(self.online_recognizer, self.SAMPLE_RATE)
+
+    async def transcribe_stream(
+        self, chunks: AsyncIterator[np.ndarray]
+    ) -> AsyncIterator[StreamingResult]:
+        if self.online_recognizer is None:
+            async for result in super().transcribe_stream(chunks):
+                yield result
+            return
+
+        session = self.create_online_session()
+        async for chunk in chunks:
+            for result in await asyncio.to_thread(session.accept_waveform, chunk):
+                yield result
+        for result in await asyncio.to_thread(session.finish):
+            yield result
+
     def transcribe_np(self, audio: np.ndarray) -> str:
-        stream = self.recognizer.create_stream()
-        stream.accept_waveform(self.SAMPLE_RATE, audio)
-        self.recognizer.decode_streams([stream])
-        return stream.result.text
+        return self.transcribe_batch_np([audio])[0]
+
+    def transcribe_batch_np(self, audios: list[np.ndarray]) -> list[str]:
+        streams = []
+        for audio in audios:
+            stream = self.recognizer.create_stream()
+            stream.accept_waveform(self.SAMPLE_RATE, audio)
+            streams.append(stream)
+        self.recognizer.decode_streams(streams)
+        return [stream.result.text for stream in streams]
+
+
+class OnlineSession:
+    """Incremental decoding state for one audio stream of the online recognizer.
+
+    Audio is pushed with accept_waveform; partial hypotheses are returned as
+    they change, and a final result is returned whenever the recognizer's
+    endpoint detection closes an utterance.
+    """
+
+    # Silence appended on finish so the last frames get flushed through the model
+    TAIL_PADDING_SECONDS = 0.66
+
+    def __init__(self, recognizer, sample_rate: int = 16000) -> None:
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.stream = recognizer.create_stream()
+        self.segment = 0
+        self._last_text = ""
+        self._finished = False
+
+    def accept_waveform(self, audio: np.ndarray) -> list[StreamingResult]:
+        """Feed a chunk of float32 audio and return any new results."""
+        if self._finished:
+            raise RuntimeError("Cannot accept audio after the session has finished")
+        self.stream.accept_waveform(self.sample_rate, audio)
+        return self._decode()
+
+    def finish(self) -> list[StreamingResult]:
+        """Flush the remaining audio and return the final result, if any."""
+        if self._finished:
+            return []
+        tail = np.zeros(int(self.TAIL_PADDING_SECONDS * self.sample_rate), dtype=np.float32)
+        self.stream.accept_waveform(self.sample_rate, tail)
+        self.stream.input_finished()
+        self._finished = True
+
+        results = self._decode()
+        if self._last_text:
+            results.append(StreamingResult(self._last_text, True, self.segment))
+            self.segment += 1
+            self._last_text = ""
+        return results
+
+    def _decode(self) -> list[StreamingResult]:
+        results = []
+        while self.recognizer.is_ready(self.stream):
+            self.recognizer.decode_stream(self.stream)
+        text = self.recognizer.get_result(self.stream).strip()
+
+        if self.recognizer.is_endpoint(self.stream):
+            if text:
+                results.append(StreamingResult(text, True, self.segment))
+                self.segment += 1
+            self.recognizer.reset(self.stream)
+            self._last_text = ""
+        elif text != self._last_text:
+            results.append(StreamingResult(text, False, self.segment))
+            self._last_text = text
+        return results
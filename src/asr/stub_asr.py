@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+
+from .asr_interface import ASRInterface
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+
+
+class VoiceRecognition(ASRInterface):
+    """Deterministic stand-in backend that needs no model files.
+
+    Decoding takes ``latency_ms + rtf * audio_seconds`` and returns one word
+    per started second of audio, chosen from the number of samples, so the
+    same input always gives the same text. Used by the benchmark suite and
+    for exercising the pipeline without any model present.
+    """
+
+    MAX_BATCH_SIZE = 32
+
+    def __init__(
+        self,
+        rtf: float = 0.05,
+        latency_ms: float = 5.0,
+        load_seconds: float = 0.0,
+        **kwargs,
+    ) -> None:
+        self.rtf = rtf
+        self.latency_s = latency_ms / 1000
+        time.sleep(load_seconds)
+
+    def _text(self, audio: np.ndarray) -> str:
+        num_words = max(1, -(-len(audio) // self.SAMPLE_RATE))
+        return " ".join(WORDS[(len(audio) + i) % len(WORDS)] for i in range(num_words))
+
+    def transcribe_np(self, audio: np.ndarray) -> str:
+        time.sleep(self.latency_s + self.rtf * len(audio) / self.SAMPLE_RATE)
+        return self._text(audio)
+
+    def transcribe_batch_np(self, audios: list[np.ndarray]) -> list[str]:
+        # a batched decode costs as much as its longest (padded) input
+        longest = max((len(audio) for audio in audios), default=0)
+        time.sleep(self.latency_s + self.rtf * longest / self.SAMPLE_RATE)
+        return [self._text(audio) for audio in audios]
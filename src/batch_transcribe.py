@@ -0,0 +1,349 @@
+"""Batch transcription of many files with worker processes and resumable output.
+
+Files come from a directory (searched recursively) or a manifest listing one
+path per line (or JSON lines with a ``path`` field). They are spread over
+worker processes that each load their own engines through ServiceContext.
+The parent hands each worker two files at a time, so a prefetch thread can
+read and resample the next file while the current one is being transcribed.
+
+Results are appended to a JSONL file as each file finishes, one line per
+file, flushed to disk straight away. The output doubles as the checkpoint:
+when a killed or crashed run is started again with the same output, files
+that already have a line are skipped. Files that failed are retried only
+with ``--retry-failed``; the latest line for a file is the one that counts.
+
+A worker that crashes is restarted. The files it held are handed out
+again, and a file that was being transcribed in two crashes is written as
+failed. The exit code is non-zero when files are left pending.
+
+Usage:
+    python -m src.batch_transcribe archive/ --output results.jsonl --workers 4
+    python -m src.batch_transcribe manifest.txt --output results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from pathlib import Path
+
+from loguru import logger
+
+from .asr.asr_interface import ASRInterface
+from .long_form import transcribe_long_audio
+from .utils.audio_frontend import prepare_audio
+from .utils.wav_file import WavFile
+
+# tells a worker there are no more files
+_STOP = None
+# files handed to a worker at a time: the one being transcribed and the next
+_IN_FLIGHT = 2
+# a file being transcribed when a worker crashed this many times is written as failed
+_MAX_ATTEMPTS = 2
+# restarts in a row of a worker that crashes before it is ready, e.g. while loading
+_MAX_LOAD_RESTARTS = 3
+
+
+def list_inputs(source: str, pattern: str = "*.wav") -> list[str]:
+    """Files to transcribe: ``pattern`` matches under a directory, or the
+    entries of a manifest file."""
+    path = Path(source)
+    if path.is_dir():
+        return sorted(str(p) for p in path.rglob(pattern) if p.is_file())
+
+    files = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line)["path"] if line.startswith("{") else line
+            # relative entries are relative to the manifest
+            files.append(str((path.parent / entry) if not os.path.isabs(entry) else entry))
+    return files
+
+
+def read_checkpoint(output: str) -> dict[str, bool]:
+    """Files already in the output, mapped to whether they succeeded.
+
+    A line cut short by a crash is ignored, so its file is done again.
+    """
+    finished: dict[str, bool] = {}
+    if not os.path.exists(output):
+        return finished
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            finished[record["path"]] = "error" not in record
+    return finished
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _load(path: str) -> tuple[str, object]:
+    """Read a file into 16 kHz mono, or return the error."""
+    try:
+        with WavFile(path) as wav:
+            audio = prepare_audio(wav.read(0, wav.num_frames), wav.sample_rate, ASRInterface.SAMPLE_RATE)
+        return path, audio
+    except Exception as e:
+        return path, e
+
+
+def _worker(config_path: str, tasks, results, worker_id: int) -> None:
+    """Worker process: load the engines, then transcribe files until told to stop."""
+    from .config_manager.utils import read_yaml, validate_config
+    from .service_context import ServiceContext
+
+    config = validate_config(read_yaml(config_path))
+    context = ServiceContext(config)
+    long_form = config.asr_config.long_form
+
+    # holds the next file, read while the current one is transcribed
+    prefetched: queue.Queue = queue.Queue(maxsize=1)
+
+    def prefetch():
+        while True:
+            path = tasks.get()
+            if path is _STOP:
+                prefetched.put(_STOP)
+                return
+            prefetched.put(_load(path))
+
+    threading.Thread(target=prefetch, name="prefetch", daemon=True).start()
+    results.put({"type": "ready", "worker": worker_id})
+
+    while True:
+        item = prefetched.get()
+        if item is _STOP:
+            break
+        path, audio = item
+        # if this worker dies now, the parent counts the crash against this file
+        results.put({"type": "start", "worker": worker_id, "path": path})
+        record = {"path": path, "worker": worker_id}
+        try:
+            if isinstance(audio, Exception):
+                raise audio
+            start = time.perf_counter()
+            transcripts, report = asyncio.run(
+                transcribe_long_audio(
+                    context.vad_engine,
+                    context.asr_engine,
+                    audio,
+                    bucket_seconds=long_form.bucket_seconds,
+                    max_batch_size=long_form.max_batch_size,
+                    max_concurrency=long_form.max_concurrency,
+                )
+            )
+            record.update(
+                audio_seconds=round(report.audio_seconds, 3),
+                wall_seconds=round(time.perf_counter() - start, 3),
+                rtf=round(report.rtf, 5),
+                text=" ".join(t.text for t in transcripts),
+                segments=[asdict(t) for t in transcripts],
+            )
+        except Exception as e:
+            logger.error(f"Failed to transcribe {path}: {e}")
+            record["error"] = f"{type(e).__name__}: {e}"
+        results.put({"type": "result", "record": record})
+
+    context.close()
+
+
+class BatchTranscriber:
+    """Runs the worker processes and writes their results to the output file."""
+
+    def __init__(self, config_path: str, output: str, workers: int = 1, start_method: str = "spawn"):
+        self.config_path = config_path
+        self.output = output
+        self.num_workers = workers
+        self._context = mp.get_context(start_method)
+
+    def run(self, files: list[str], retry_failed: bool = False) -> dict:
+        """Transcribe every file that is not finished yet.
+
+        Returns:
+            Summary of this run, including the throughput in audio hours per
+            wall hour.
+        """
+        finished = read_checkpoint(self.output)
+        todo = [f for f in files if f not in finished or (retry_failed and not finished[f])]
+        logger.info(
+            f"{len(files)} files, {len(files) - len(todo)} already done, {len(todo)} to transcribe"
+        )
+        summary = {"files": len(todo), "done": 0, "failed": 0, "audio_seconds": 0.0}
+        if not todo:
+            return self._finish(summary, 0.0)
+
+        results = self._context.Queue()
+        waiting = deque(todo)
+        workers = min(self.num_workers, len(todo))
+        processes = [None] * workers
+        tasks = [None] * workers
+        held: list[list[str]] = [[] for _ in range(workers)]  # handed out, not yet written
+        started: list[str | None] = [None] * workers  # file last reported as being transcribed
+        ready = [False] * workers
+        attempts: dict[str, int] = {}
+        load_restarts = [0] * workers
+
+        def launch(i: int) -> None:
+            # a fresh queue, as a crash can leave the old one unusable
+            tasks[i] = self._context.Queue()
+            processes[i] = self._start(tasks[i], results, i)
+            ready[i] = False
+            started[i] = None
+
+        def dispatch() -> None:
+            for i, p in enumerate(processes):
+                while p is not None and waiting and len(held[i]) < _IN_FLIGHT:
+                    held[i].append(waiting.popleft())
+                    tasks[i].put(held[i][-1])
+
+        for i in range(workers):
+            launch(i)
+        dispatch()
+        start = None
+        with open(self.output, "a", encoding="utf-8") as out:
+            if out.tell() > 0 and not _ends_with_newline(self.output):
+                out.write("\n")  # end a line cut short by a crash
+            while summary["done"] + summary["failed"] < len(todo):
+                try:
+                    message = results.get(timeout=1.0)
+                except queue.Empty:
+                    message = None
+
+                if message is None:
+                    for i, p in enumerate(processes):
+                        if p is None or p.is_alive():
+                            continue
+                        logger.warning(f"Worker {i} exited with code {p.exitcode}")
+                        processes[i] = None
+                        # the file being transcribed, or the first one if it had not said;
+                        # a worker that was not ready yet crashed while loading, not on a file
+                        suspect = started[i] if started[i] in held[i] else None
+                        if suspect is None and held[i] and ready[i]:
+                            suspect = held[i][0]
+                        again = []
+                        for path in held[i]:
+                            if path == suspect:
+                                attempts[path] = attempts.get(path, 0) + 1
+                            if attempts.get(path, 0) < _MAX_ATTEMPTS:
+                                logger.warning(f"Handing out {path} again")
+                                again.append(path)
+                                continue
+                            record = {"path": path, "worker": i}
+                            record["error"] = f"WorkerCrashed: worker exited with code {p.exitcode}"
+                            self._write(out, record, summary, todo, start)
+                        waiting.extendleft(reversed(again))
+                        held[i] = []
+                        load_restarts[i] = 0 if ready[i] else load_restarts[i] + 1
+                        if load_restarts[i] > _MAX_LOAD_RESTARTS:
+                            logger.error(f"Worker {i} keeps crashing while loading, not restarting")
+                            continue
+                        logger.info(f"Restarting worker {i}")
+                        launch(i)
+                    if all(p is None for p in processes):
+                        break
+                    dispatch()
+                    continue
+
+                if message["type"] == "ready":
+                    ready[message["worker"]] = True
+                    # throughput is measured from the first loaded worker, not model loading
+                    start = start or time.perf_counter()
+                    continue
+
+                if message["type"] == "start":
+                    started[message["worker"]] = message["path"]
+                    continue
+
+                record = message["record"]
+                held[record["worker"]].remove(record["path"])
+                self._write(out, record, summary, todo, start)
+                dispatch()
+
+        for i, p in enumerate(processes):
+            if p is not None:
+                tasks[i].put(_STOP)
+                p.join()
+        return self._finish(summary, time.perf_counter() - start if start else 0.0)
+
+    def _write(self, out, record: dict, summary: dict, todo: list[str], start: float | None) -> None:
+        """Append a record to the output, flushed to disk, and count it."""
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        os.fsync(out.fileno())
+        if "error" in record:
+            summary["failed"] += 1
+        else:
+            summary["done"] += 1
+            summary["audio_seconds"] += record["audio_seconds"]
+        elapsed = time.perf_counter() - (start or time.perf_counter())
+        logger.info(
+            f"[{summary['done'] + summary['failed']}/{len(todo)}] {record['path']} "
+            f"({self._throughput(summary['audio_seconds'], elapsed):.1f} audio h/wall h)"
+        )
+
+    def _start(self, tasks, results, worker_id: int):
+        process = self._context.Process(
+            target=_worker,
+            args=(self.config_path, tasks, results, worker_id),
+            name=f"batch-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    @staticmethod
+    def _throughput(audio_seconds: float, wall_seconds: float) -> float:
+        return audio_seconds / wall_seconds if wall_seconds > 0 else 0.0
+
+    def _finish(self, summary: dict, wall_seconds: float) -> dict:
+        summary.update(
+            audio_hours=round(summary["audio_seconds"] / 3600, 4),
+            wall_hours=round(wall_seconds / 3600, 4),
+            audio_hours_per_wall_hour=round(self._throughput(summary["audio_seconds"], wall_seconds), 2),
+            pending=summary["files"] - summary["done"] - summary["failed"],
+        )
+        summary["audio_seconds"] = round(summary["audio_seconds"], 3)
+        logger.info(
+            f"Transcribed {summary['audio_hours']:.2f} audio hours in {summary['wall_hours']:.2f} "
+            f"wall hours ({summary['audio_hours_per_wall_hour']:.1f} audio h/wall h), "
+            f"{summary['failed']} failed, {summary['pending']} pending"
+        )
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="directory of audio files, or a manifest file")
+    parser.add_argument("--output", required=True, help="JSONL results file, also the checkpoint")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 4))
+    parser.add_argument("--pattern", default="*.wav", help="file pattern when source is a directory")
+    parser.add_argument("--retry-failed", action="store_true", help="transcribe failed files again")
+    args = parser.parse_args()
+
+    files = list_inputs(args.source, args.pattern)
+    summary = BatchTranscriber(args.config, args.output, args.workers).run(files, args.retry_failed)
+    print(json.dumps(summary, indent=2))
+    if summary["pending"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,26 @@
 from .main import Config
-from .system import SystemConfig
+from .system import (
+    SystemConfig,
+    StreamingServerConfig,
+    MicrophoneConfig,
+    WarmupConfig,
+    EngineRegistryConfig,
+    TranscriptCacheConfig,
+)
 from .vad import VADConfig
 
 from .asr import (
     ASRConfig,
+    ASRBatchingConfig,
+    ASRWorkerPoolConfig,
+    LongFormConfig,
     FasterWhisperConfig,
     WhisperCPPConfig,
     WhisperConfig,
     FunASRConfig,
     SherpaOnnxASRConfig,
+    SherpaOnnxOnlineConfig,
+    StubASRConfig,
 )
 
 # Import utility functions
@@ -23,6 +35,8 @@ from .utils import (
 from .vad import (
     VADConfig,
     SileroVADConfig,
+    SileroVADOnnxConfig,
+    VADBatchingConfig,
 )
 
 __all__ = [
@@ -30,16 +44,28 @@ __all__ = [
     "Config",
     "VADConfig",
     "SystemConfig",
+    "StreamingServerConfig",
+    "MicrophoneConfig",
+    "WarmupConfig",
+    "EngineRegistryConfig",
+    "TranscriptCacheConfig",
     # ASR related classes
     "ASRConfig",
+    "ASRBatchingConfig",
+    "ASRWorkerPoolConfig",
+    "LongFormConfig",
     "FasterWhisperConfig",
     "WhisperCPPConfig",
     "WhisperConfig",
     "FunASRConfig",
     "SherpaOnnxASRConfig",
+    "SherpaOnnxOnlineConfig",
+    "StubASRConfig",
 
      "VADConfig",
     "SileroVADConfig",
+    "SileroVADOnnxConfig",
+    "VADBatchingConfig",
     # Utility functions
     "read_yaml",
     "validate_config",
@@ -9,6 +9,23 @@ class FasterWhisperConfig(BaseModel):
     download_root: str = Field(..., alias="download_root")
     language: Optional[str] = Field(None, alias="language")
     device: Literal["auto", "cpu", "cuda"] = Field("auto", alias="device")
+    compute_type: Literal[
+        "default",
+        "auto",
+        "int8",
+        "int8_float32",
+        "int8_float16",
+        "int8_bfloat16",
+        "int16",
+        "float16",
+        "bfloat16",
+        "float32",
+    ] = Field("float32", alias="compute_type")
+    beam_size: int = Field(5, alias="beam_size")
+    cpu_threads: int = Field(0, alias="cpu_threads")
+    num_workers: int = Field(1, alias="num_workers")
+    use_batched_pipeline: bool = Field(False, alias="use_batched_pipeline")
+    batch_size: int = Field(8, alias="batch_size")
 
 
 class WhisperCPPConfig(BaseModel):
@@ -43,6 +60,51 @@ class FunASRConfig(BaseModel):
     language: Literal["auto", "zh", "en"] = Field("auto", alias="language")
 
 
+class SherpaOnnxOnlineConfig(BaseModel):
+    """Configuration for the streaming (online) recognizer of Sherpa Onnx ASR."""
+
+    model_type: Literal[
+        "transducer",
+        "paraformer",
+        "zipformer2_ctc",
+    ] = Field(..., alias="model_type")
+    encoder: Optional[str] = Field(None, alias="encoder")
+    decoder: Optional[str] = Field(None, alias="decoder")
+    joiner: Optional[str] = Field(None, alias="joiner")
+    zipformer2_ctc: Optional[str] = Field(None, alias="zipformer2_ctc")
+    tokens: str = Field(..., alias="tokens")
+    num_threads: int = Field(2, alias="num_threads")
+    decoding_method: Literal["greedy_search", "modified_beam_search"] = Field(
+        "greedy_search", alias="decoding_method"
+    )
+    enable_endpoint_detection: bool = Field(True, alias="enable_endpoint_detection")
+    rule1_min_trailing_silence: float = Field(2.4, alias="rule1_min_trailing_silence")
+    rule2_min_trailing_silence: float = Field(1.2, alias="rule2_min_trailing_silence")
+    rule3_min_utterance_length: float = Field(20.0, alias="rule3_min_utterance_length")
+
+    @model_validator(mode="after")
+    def check_model_paths(cls, values: "SherpaOnnxOnlineConfig", info: ValidationInfo):
+        model_type = values.model_type
+
+        if model_type == "transducer":
+            if not all([values.encoder, values.decoder, values.joiner, values.tokens]):
+                raise ValueError(
+                    "encoder, decoder, joiner, and tokens must be provided for online transducer model type"
+                )
+        elif model_type == "paraformer":
+            if not all([values.encoder, values.decoder, values.tokens]):
+                raise ValueError(
+                    "encoder, decoder, and tokens must be provided for online paraformer model type"
+                )
+        elif model_type == "zipformer2_ctc":
+            if not all([values.zipformer2_ctc, values.tokens]):
+                raise ValueError(
+                    "zipformer2_ctc and tokens must be provided for online zipformer2_ctc model type"
+                )
+
+        return values
+
+
 class SherpaOnnxASRConfig(BaseModel):
     """Configuration for Sherpa Onnx ASR."""
 
@@ -69,8 +131,7 @@ class SherpaOnnxASRConfig(BaseModel):
     num_threads: int = Field(4, alias="num_threads")
     use_itn: bool = Field(True, alias="use_itn")
     provider: Literal["cpu", "cuda", "coreml"] = Field("cpu", alias="provider")
-
-
+    online: Optional[SherpaOnnxOnlineConfig] = Field(None, alias="online")
 
     @model_validator(mode="after")
     def check_model_paths(cls, values: "SherpaOnnxASRConfig", info: ValidationInfo):
@@ -115,6 +176,68 @@ class SherpaOnnxASRConfig(BaseModel):
         return values
 
 
+class StubASRConfig(BaseModel):
+    """Configuration for the deterministic stub ASR used in benchmarks and CI."""
+
+    rtf: float = Field(0.05, alias="rtf")
+    latency_ms: float = Field(5.0, alias="latency_ms")
+    load_seconds: float = Field(0.0, alias="load_seconds")
+
+
+class ASRBatchingConfig(BaseModel):
+    """Configuration for micro-batching concurrent ASR requests."""
+
+    enabled: bool = Field(False, alias="enabled")
+    max_batch_size: int = Field(8, alias="max_batch_size")
+    max_wait_ms: float = Field(10.0, alias="max_wait_ms")
+    max_concurrent_batches: int = Field(1, alias="max_concurrent_batches")
+
+    @model_validator(mode="after")
+    def check_limits(cls, values: "ASRBatchingConfig"):
+        if values.max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if values.max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        if values.max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches must be at least 1")
+        return values
+
+
+class ASRWorkerPoolConfig(BaseModel):
+    """Configuration for running the ASR backend in worker processes."""
+
+    num_workers: int = Field(0, alias="num_workers")  # 0 = in-process
+    restart_on_crash: bool = Field(True, alias="restart_on_crash")
+    max_job_retries: int = Field(1, alias="max_job_retries")
+
+    @model_validator(mode="after")
+    def check_limits(cls, values: "ASRWorkerPoolConfig"):
+        if values.num_workers < 0:
+            raise ValueError("num_workers must not be negative")
+        if values.max_job_retries < 0:
+            raise ValueError("max_job_retries must not be negative")
+        return values
+
+
+class LongFormConfig(BaseModel):
+    """Configuration for transcribing long recordings segment by segment."""
+
+    bucket_seconds: float = Field(2.0, alias="bucket_seconds")
+    max_batch_size: int = Field(8, alias="max_batch_size")
+    max_concurrency: int = Field(4, alias="max_concurrency")
+    stream_window_seconds: float = Field(30.0, alias="stream_window_seconds")
+
+    @model_validator(mode="after")
+    def check_limits(cls, values: "LongFormConfig"):
+        if values.stream_window_seconds <= 0:
+            raise ValueError("stream_window_seconds must be positive")
+        if values.max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if values.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        return values
+
+
 class ASRConfig(BaseModel):
     """Configuration for Automatic Speech Recognition."""
 
@@ -124,6 +247,7 @@ class ASRConfig(BaseModel):
         "whisper",
         "fun_asr",
         "sherpa_onnx_asr",
+        "stub",
     ] = Field(..., alias="asr_model")
     faster_whisper: Optional[FasterWhisperConfig] = Field(None, alias="faster_whisper")
     whisper_cpp: Optional[WhisperCPPConfig] = Field(None, alias="whisper_cpp")
@@ -132,6 +256,14 @@ class ASRConfig(BaseModel):
     sherpa_onnx_asr: Optional[SherpaOnnxASRConfig] = Field(
         None, alias="sherpa_onnx_asr"
     )
+    stub: StubASRConfig = Field(default_factory=StubASRConfig, alias="stub")
+    batching: ASRBatchingConfig = Field(
+        default_factory=ASRBatchingConfig, alias="batching"
+    )
+    worker_pool: ASRWorkerPoolConfig = Field(
+        default_factory=ASRWorkerPoolConfig, alias="worker_pool"
+    )
+    long_form: LongFormConfig = Field(default_factory=LongFormConfig, alias="long_form")
 
 
     @model_validator(mode="after")
@@ -2,15 +2,85 @@ from pydantic import ValidationInfo, Field, model_validator, BaseModel
 from typing import Literal, Optional, Dict, ClassVar
 
 
+class StreamingServerConfig(BaseModel):
+    """Configuration for the WebSocket streaming transcription server."""
+
+    port: int = Field(8765, alias="port")
+    max_connections: int = Field(500, alias="max_connections")
+    segment_queue_size: int = Field(4, alias="segment_queue_size")
+    max_frame_bytes: int = Field(1 << 20, alias="max_frame_bytes")
+
+    @model_validator(mode="after")
+    def check_limits(cls, values: "StreamingServerConfig"):
+        if values.port < 0 or values.port > 65535:
+            raise ValueError("Port must be between 0 and 65535")
+        if values.max_connections < 1 or values.segment_queue_size < 1:
+            raise ValueError("max_connections and segment_queue_size must be at least 1")
+        return values
+
+
+class MicrophoneConfig(BaseModel):
+    """Configuration for the live microphone tab of the Gradio UI."""
+
+    stream_every_seconds: float = Field(0.25, alias="stream_every_seconds")
+    latency_target_seconds: float = Field(1.0, alias="latency_target_seconds")
+    session_ttl_seconds: float = Field(600, alias="session_ttl_seconds")
+
+    @model_validator(mode="after")
+    def check_limits(cls, values: "MicrophoneConfig"):
+        if values.stream_every_seconds <= 0 or values.session_ttl_seconds <= 0:
+            raise ValueError("stream_every_seconds and session_ttl_seconds must be positive")
+        if values.latency_target_seconds <= values.stream_every_seconds:
+            raise ValueError("latency_target_seconds must be longer than stream_every_seconds")
+        return values
+
+
+class WarmupConfig(BaseModel):
+    """Configuration for the warm-up inferences run after the engines load."""
+
+    enabled: bool = Field(True, alias="enabled")
+    runs: int = Field(2, alias="runs")
+    audio_seconds: float = Field(3.0, alias="audio_seconds")
+
+
+class EngineRegistryConfig(BaseModel):
+    """Configuration for the process-wide registry of shared engines."""
+
+    memory_budget_mb: float = Field(0, alias="memory_budget_mb")
+    idle_ttl_seconds: float = Field(600, alias="idle_ttl_seconds")
+
+
+class TranscriptCacheConfig(BaseModel):
+    """Configuration for the cache of VAD boundaries and transcripts."""
+
+    enabled: bool = Field(True, alias="enabled")
+    max_entries: int = Field(1024, alias="max_entries")
+    disk_path: Optional[str] = Field(None, alias="disk_path")
+
+
 class SystemConfig(BaseModel):
     """System configuration settings."""
 
     host: str = Field(..., alias="host")
     port: int = Field(..., alias="port")
+    metrics_enabled: bool = Field(False, alias="metrics_enabled")
+    metrics_port: int = Field(9464, alias="metrics_port")
+    background_loading: bool = Field(False, alias="background_loading")
+    warmup: WarmupConfig = Field(default_factory=WarmupConfig, alias="warmup")
+    engine_registry: EngineRegistryConfig = Field(
+        default_factory=EngineRegistryConfig, alias="engine_registry"
+    )
+    transcript_cache: TranscriptCacheConfig = Field(
+        default_factory=TranscriptCacheConfig, alias="transcript_cache"
+    )
+    streaming: StreamingServerConfig = Field(
+        default_factory=StreamingServerConfig, alias="streaming"
+    )
+    microphone: MicrophoneConfig = Field(default_factory=MicrophoneConfig, alias="microphone")
 
     @model_validator(mode="after")
     def check_port(cls, values):
-        port = values.port
-        if port < 0 or port > 65535:
-            raise ValueError("Port must be between 0 and 65535")
+        for port in (values.port, values.metrics_port):
+            if port < 0 or port > 65535:
+                raise ValueError("Port must be between 0 and 65535")
         return values
@@ -11,14 +11,44 @@ class SileroVADConfig(BaseModel):
     required_hits: int = Field(..., alias="required_hits")  # 3 * (0.032) = 0.1s
     required_misses: int = Field(..., alias="required_misses")  # 24 * (0.032) = 0.8s
     smoothing_window: int = Field(..., alias="smoothing_window")  # 5
+    offline_batch_windows: int = Field(1024, alias="offline_batch_windows")  # 1024 * (0.032) = 33s
+    session_pool_size: int = Field(64, alias="session_pool_size")  # 64
+    ring_buffer_seconds: float = Field(10.0, alias="ring_buffer_seconds")  # 10s, grows as needed
+    pregate: bool = Field(False, alias="pregate")  # skip the model on clearly silent windows
+    pregate_db_margin: float = Field(10.0, alias="pregate_db_margin")  # 10 dB below db_threshold
+    pregate_max_zcr: float = Field(0.25, alias="pregate_max_zcr")  # zero crossings per sample
+    pregate_hangover: int = Field(8, alias="pregate_hangover")  # 8 * (0.032) = 0.25s
 
 
+class SileroVADOnnxConfig(SileroVADConfig):
+    """Configuration for Silero VAD on ONNX Runtime, without torch."""
+
+    model_path: Optional[str] = Field(None, alias="model_path")  # silero_vad.onnx of the silero-vad package
+
+
+class VADBatchingConfig(BaseModel):
+    """Configuration for batching the VAD model calls of concurrent live streams."""
+
+    enabled: bool = Field(False, alias="enabled")
+    max_batch_size: int = Field(256, alias="max_batch_size")
+    max_wait_ms: float = Field(10.0, alias="max_wait_ms")
+
+    @model_validator(mode="after")
+    def check_limits(cls, values: "VADBatchingConfig"):
+        if values.max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if values.max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        return values
+
 
 class VADConfig(BaseModel):
     """Configuration for Automatic Speech Recognition."""
 
-    vad_model: Literal["silero_vad",] = Field(..., alias="vad_model")
+    vad_model: Literal["silero_vad", "silero_vad_onnx"] = Field(..., alias="vad_model")
     silero_vad: Optional[SileroVADConfig] = Field(None, alias="silero_vad")
+    silero_vad_onnx: Optional[SileroVADOnnxConfig] = Field(None, alias="silero_vad_onnx")
+    batching: VADBatchingConfig = Field(default_factory=VADBatchingConfig, alias="batching")
 
 
     @model_validator(mode="after")
@@ -0,0 +1,250 @@
+"""Process-wide registry of loaded ASR and VAD engines.
+
+Engines are keyed by a canonical hash of the settings they were built from,
+so service contexts asking for the same settings share one instance.
+Engines are reference counted: an engine nobody holds stays loaded (so a
+context switching back to it does not pay for a reload) until it has been
+idle longer than ``idle_ttl_seconds`` or the engines held exceed
+``memory_budget_mb``, in which case the least recently used idle engines
+are evicted first. Engines in use are never evicted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from loguru import logger
+
+from . import metrics
+
+
+def config_key(kind: str, settings: dict) -> str:
+    """Canonical hash of an engine kind and the settings it is built from."""
+    canonical = json.dumps({"kind": kind, "settings": settings}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _rss_bytes(pid: int | str = "self") -> int:
+    """Resident set size of a process (Linux only, 0 elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _worker_rss_bytes(engine: Any) -> int:
+    """Memory of the worker processes of an engine such as ASRProcessPool."""
+    return sum(
+        _rss_bytes(worker.process.pid)
+        for worker in getattr(engine, "workers", [])
+        if worker.process.pid is not None
+    )
+
+
+@dataclass
+class _Entry:
+    key: str
+    kind: str
+    engine: Any
+    memory_bytes: int
+    refcount: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class EngineRegistry:
+    """Shares engines between service contexts and evicts idle ones.
+
+    Use acquire() to get an engine (loading it on first use) and release()
+    once it is no longer needed.
+    """
+
+    def __init__(self, memory_budget_mb: float = 0, idle_ttl_seconds: float = 0):
+        self.memory_budget_mb = memory_budget_mb  # 0: no budget
+        self.idle_ttl_seconds = idle_ttl_seconds  # 0: idle engines are kept
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()  # least recently used first
+        self._by_engine: dict[int, _Entry] = {}
+        self._loading: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._sweeper: threading.Thread | None = None
+
+    def configure(self, memory_budget_mb: float, idle_ttl_seconds: float) -> None:
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self.idle_ttl_seconds = idle_ttl_seconds
+        self.sweep()
+
+    def acquire(self, kind: str, settings: dict, loader: Callable[[], Any]) -> Any:
+        """Return the engine built from ``settings``, loading it if needed.
+
+        Concurrent requests for an engine that is still loading wait for
+        that load instead of starting another one.
+
+        Args:
+            kind: Engine kind, e.g. "asr" or "vad".
+            settings: Everything the engine is built from; hashed into the key.
+            loader: Builds the engine when it is not loaded yet.
+
+        Returns:
+            The shared engine. Pass it to release() when done with it.
+        """
+        key = config_key(kind, settings)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._hold(entry)
+                metrics.ENGINE_REGISTRY_EVENTS.labels(kind, "hit").inc()
+                return entry.engine
+            pending = self._loading.get(key)
+            if pending is None:
+                pending = self._loading[key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            engine = pending.result()
+            with self._lock:
+                self._hold(self._by_engine[id(engine)])
+            metrics.ENGINE_REGISTRY_EVENTS.labels(kind, "hit").inc()
+            return engine
+
+        try:
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            engine = loader()
+            if hasattr(engine, "wait_ready"):
+                engine.wait_ready()
+            memory_bytes = max(0, _rss_bytes() - rss_before) + _worker_rss_bytes(engine)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            entry = _Entry(key, kind, engine, memory_bytes)
+            self._entries[key] = entry
+            self._by_engine[id(engine)] = entry
+            self._hold(entry)
+            del self._loading[key]
+        pending.set_result(engine)
+        metrics.ENGINE_REGISTRY_EVENTS.labels(kind, "load").inc()
+        logger.info(
+            f"Loaded {kind} engine {key} in {time.perf_counter() - start:.1f}s "
+            f"(~{memory_bytes / 2**20:.0f} MB)"
+        )
+        self._start_sweeper()
+        self.sweep()
+        return engine
+
+    def release(self, engine: Any) -> None:
+        """Drop one reference to an engine returned by acquire()."""
+        if engine is None:
+            return
+        with self._lock:
+            entry = self._by_engine.get(id(engine))
+            if entry is None or entry.refcount == 0:
+                return
+            entry.refcount -= 1
+            entry.last_used = time.monotonic()
+        self.sweep()
+
+    def sweep(self) -> None:
+        """Evict idle engines past the TTL, then least recently used idle
+        engines until the budget is met."""
+        evicted = []
+        with self._lock:
+            now = time.monotonic()
+            for entry in list(self._entries.values()):
+                if (
+                    entry.refcount == 0
+                    and self.idle_ttl_seconds > 0
+                    and now - entry.last_used > self.idle_ttl_seconds
+                ):
+                    evicted.append(self._remove(entry))
+
+            budget = self.memory_budget_mb * 2**20
+            if budget > 0:
+                for entry in list(self._entries.values()):
+                    if self._resident_bytes() <= budget:
+                        break
+                    if entry.refcount == 0:
+                        evicted.append(self._remove(entry))
+                if self._resident_bytes() > budget:
+                    logger.warning(
+                        f"Engines in use take {self._resident_bytes() / 2**20:.0f} MB, "
+                        f"over the {self.memory_budget_mb} MB budget"
+                    )
+            self._update_gauges()
+
+        for entry in evicted:
+            logger.info(f"Evicting idle {entry.kind} engine {entry.key}")
+            metrics.ENGINE_REGISTRY_EVENTS.labels(entry.kind, "evict").inc()
+            close = getattr(entry.engine, "close", None)
+            if callable(close):
+                close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resident_mb": round(self._resident_bytes() / 2**20, 1),
+                "memory_budget_mb": self.memory_budget_mb,
+                "engines": [
+                    {
+                        "key": e.key,
+                        "kind": e.kind,
+                        "engine": type(e.engine).__name__,
+                        "refcount": e.refcount,
+                        "memory_mb": round(e.memory_bytes / 2**20, 1),
+                        "idle_seconds": (
+                            round(time.monotonic() - e.last_used, 1) if e.refcount == 0 else 0
+                        ),
+                    }
+                    for e in self._entries.values()
+                ],
+            }
+
+    # ==== Called with self._lock held
+
+    def _hold(self, entry: _Entry) -> None:
+        entry.refcount += 1
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(entry.key)
+
+    def _remove(self, entry: _Entry) -> _Entry:
+        del self._entries[entry.key]
+        del self._by_engine[id(entry.engine)]
+        return entry
+
+    def _resident_bytes(self) -> int:
+        return sum(e.memory_bytes for e in self._entries.values())
+
+    def _update_gauges(self) -> None:
+        for kind in ("asr", "vad"):
+            metrics.ENGINE_REGISTRY_RESIDENT.labels(kind).set(
+                sum(1 for e in self._entries.values() if e.kind == kind)
+            )
+        metrics.ENGINE_REGISTRY_BYTES.set(self._resident_bytes())
+
+    def _start_sweeper(self) -> None:
+        def run():
+            while True:
+                time.sleep(max(1.0, min(self.idle_ttl_seconds, 60.0) / 2))
+                self.sweep()
+
+        with self._lock:
+            if self._sweeper is not None or self.idle_ttl_seconds <= 0:
+                return
+            self._sweeper = threading.Thread(target=run, name="engine-registry-sweeper", daemon=True)
+            self._sweeper.start()
+
+
+# shared by every ServiceContext in the process
+ENGINE_REGISTRY = EngineRegistry()
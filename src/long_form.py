@@ -0,0 +1,564 @@
+"""Transcription of long recordings: VAD segmentation, length-bucketed
+batching and concurrent ASR dispatch.
+
+transcribe_long_audio() works on a recording already in memory.
+transcribe_audio_stream() gives the same transcripts but overlaps VAD and ASR
+and yields each segment as soon as it is decoded. transcribe_wav_file() does
+the same for a WAV file read from a memory map window by window, so its
+memory use does not grow with the length of the file.
+
+Usage:
+    python -m src.long_form path/to/recording.wav [--config config.yaml] [--stream]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import deque
+from contextlib import aclosing, closing
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Iterator, Sequence
+
+import numpy as np
+from loguru import logger
+
+from .asr.asr_interface import ASRInterface
+from .transcript_cache import TranscriptCache, audio_key
+from .utils.audio_frontend import AudioFrontend, prepare_audio
+from .utils.wav_file import WavFile
+from .vad.vad_interface import SpeechSegment, VADInterface
+
+# Segments shorter than one VAD window carry no usable speech
+MIN_SEGMENT_SAMPLES = 512
+
+
+@dataclass
+class SegmentTranscript:
+    text: str
+    start: float  # seconds
+    end: float  # seconds
+
+
+@dataclass
+class TranscriptionReport:
+    audio_seconds: float
+    wall_seconds: float
+    vad_seconds: float
+    asr_seconds: float
+    cpu_seconds: float
+    rtf: float  # wall time per second of audio
+    core_utilisation: float  # cpu_seconds / (wall_seconds * cpu_count)
+    segments: int
+    buckets: int
+    cached: bool = False  # transcripts came from the cache
+
+
+def bucket_segments(
+    segments: Sequence[SpeechSegment],
+    bucket_seconds: float = 2.0,
+    max_batch_size: int = 8,
+) -> list[list[SpeechSegment]]:
+    """Group segments of similar length so batched decodes pad as little as possible.
+
+    Segments are sorted by duration; a bucket is closed when it is full or
+    the next segment is more than ``bucket_seconds`` longer than its shortest.
+    """
+    buckets: list[list[SpeechSegment]] = []
+    for segment in sorted(segments, key=lambda s: s.duration):
+        if (
+            buckets
+            and len(buckets[-1]) < max_batch_size
+            and segment.duration - buckets[-1][0].duration <= bucket_seconds
+        ):
+            buckets[-1].append(segment)
+        else:
+            buckets.append([segment])
+    return buckets
+
+
+def _worker_cpu_seconds(engines: Sequence[ASRInterface]) -> float:
+    """CPU time of live ASR worker processes (Linux only, 0 elsewhere)."""
+    total = 0.0
+    ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    for engine in engines:
+        for worker in getattr(engine, "workers", []):
+            try:
+                with open(f"/proc/{worker.process.pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                total += (int(fields[11]) + int(fields[12])) / ticks
+            except (OSError, IndexError, ValueError):
+                pass
+    return total
+
+
+def _cpu_seconds(engines: Sequence[ASRInterface]) -> float:
+    times = os.times()
+    return (
+        times.user + times.system + times.children_user + times.children_system
+        + _worker_cpu_seconds(engines)
+    )
+
+
+def _speech(events) -> list[SpeechSegment]:
+    return [
+        e for e in events if isinstance(e, SpeechSegment) and len(e.audio) > MIN_SEGMENT_SAMPLES
+    ]
+
+
+async def _detect_segments(
+    vad_engine: VADInterface,
+    audio: np.ndarray,
+    sample_rate: int,
+    cache: TranscriptCache | None,
+    audio_id: str,
+    vad_key: str,
+) -> list[SpeechSegment]:
+    """Speech segments of a whole recording from the batched offline VAD,
+    with the boundaries cached at the "vad" level when a cache is given."""
+
+    async def detect() -> list[list[int]]:
+        segments = await asyncio.to_thread(lambda: _speech(vad_engine.detect_speech_offline(audio)))
+        return [[s.start, s.end] for s in segments]
+
+    if cache is None:
+        boundaries = await detect()
+    else:
+        boundaries, _ = await cache.get_or_compute(cache.key("vad", audio_id, vad_key), detect)
+    return [SpeechSegment(start, end, sample_rate, audio[start:end]) for start, end in boundaries]
+
+
+async def _decode(
+    bucket: list[SpeechSegment], engine: ASRInterface, semaphore: asyncio.Semaphore
+) -> list[tuple[SpeechSegment, str]]:
+    enqueued_at = time.perf_counter()
+    async with semaphore:
+        texts = await asyncio.to_thread(
+            engine.timed_transcribe_batch_np, [s.audio for s in bucket], enqueued_at
+        )
+    return list(zip(bucket, texts))
+
+
+def _decode_buckets(
+    segments: list[SpeechSegment],
+    engine_cycle: Iterator[ASRInterface],
+    semaphore: asyncio.Semaphore,
+    bucket_seconds: float,
+    max_batch_size: int,
+) -> list[asyncio.Task]:
+    """Start one decode task per length bucket. Each task returns
+    ``(segment, text)`` pairs."""
+    return [
+        asyncio.create_task(_decode(bucket, next(engine_cycle), semaphore))
+        for bucket in bucket_segments(segments, bucket_seconds, max_batch_size)
+    ]
+
+
+async def transcribe_long_audio(
+    vad_engine: VADInterface,
+    asr_engines: ASRInterface | Sequence[ASRInterface],
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    bucket_seconds: float = 2.0,
+    max_batch_size: int = 8,
+    max_concurrency: int = 4,
+    cache: TranscriptCache | None = None,
+    vad_key: str = "",
+    asr_key: str = "",
+) -> tuple[list[SegmentTranscript], TranscriptionReport]:
+    """Transcribe a long recording with concurrent, length-bucketed ASR batches.
+
+    Args:
+        vad_engine: Engine used to cut the recording into speech segments.
+        asr_engines: One ASR engine, or several instances to spread buckets over.
+        audio: Float32 mono audio in [-1, 1] at ``sample_rate``.
+        sample_rate: Sample rate of ``audio``.
+        bucket_seconds: Maximum length spread within one bucket.
+        max_batch_size: Maximum segments per bucket.
+        max_concurrency: Buckets decoded at the same time.
+        cache: Optional cache for the segment boundaries and the transcripts.
+        vad_key: Cache key of the VAD settings.
+        asr_key: Cache key of the ASR settings.
+
+    Returns:
+        The segment transcripts in time order, and a timing report.
+    """
+    if isinstance(asr_engines, ASRInterface):
+        asr_engines = [asr_engines]
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds(asr_engines)
+    audio_id = audio_key(audio, sample_rate) if cache is not None else ""
+    timings = {"vad": 0.0, "asr": 0.0, "buckets": 0}
+
+    async def transcribe() -> list[dict]:
+        vad_start = time.perf_counter()
+        segments = await _detect_segments(vad_engine, audio, sample_rate, cache, audio_id, vad_key)
+        timings["vad"] = time.perf_counter() - vad_start
+
+        asr_start = time.perf_counter()
+        decodes = _decode_buckets(
+            segments,
+            itertools.cycle(asr_engines),
+            asyncio.Semaphore(max_concurrency),
+            bucket_seconds,
+            max_batch_size,
+        )
+        results = await asyncio.gather(*decodes)
+        timings.update(asr=time.perf_counter() - asr_start, buckets=len(decodes))
+        return sorted(
+            (
+                asdict(SegmentTranscript(text=text, start=segment.start_time, end=segment.end_time))
+                for bucket in results
+                for segment, text in bucket
+            ),
+            key=lambda t: t["start"],
+        )
+
+    if cache is None:
+        results, cached = await transcribe(), False
+    else:
+        results, cached = await cache.get_or_compute(
+            cache.key("transcript", audio_id, vad_key, asr_key), transcribe
+        )
+    transcripts = [SegmentTranscript(**t) for t in results]
+
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = _cpu_seconds(asr_engines) - cpu_start
+    audio_seconds = len(audio) / sample_rate
+    report = TranscriptionReport(
+        audio_seconds=audio_seconds,
+        wall_seconds=wall_seconds,
+        vad_seconds=timings["vad"],
+        asr_seconds=timings["asr"],
+        cpu_seconds=cpu_seconds,
+        rtf=wall_seconds / audio_seconds if audio_seconds else 0.0,
+        core_utilisation=cpu_seconds / (wall_seconds * (os.cpu_count() or 1)),
+        segments=len(transcripts),
+        buckets=timings["buckets"],
+        cached=cached,
+    )
+    logger.info(
+        f"Transcribed {audio_seconds:.1f}s of audio in {wall_seconds:.2f}s "
+        f"(RTF {report.rtf:.4f}, {report.segments} segments in {report.buckets} buckets, "
+        f"core utilisation {report.core_utilisation:.0%}{', cached' if cached else ''})"
+    )
+    return transcripts, report
+
+
+def _take_bucket(
+    waiting: list[SpeechSegment], bucket_seconds: float, max_batch_size: int
+) -> list[SpeechSegment]:
+    """Remove the earliest waiting segment from ``waiting`` together with up
+    to ``max_batch_size - 1`` others whose lengths stay within
+    ``bucket_seconds`` of each other, and return them in time order."""
+    first = waiting[0]
+    bucket, shortest, longest = [first], first.duration, first.duration
+    for segment in sorted(waiting[1:], key=lambda s: abs(s.duration - first.duration)):
+        if len(bucket) == max_batch_size:
+            break
+        if max(longest, segment.duration) - min(shortest, segment.duration) <= bucket_seconds:
+            bucket.append(segment)
+            shortest, longest = min(shortest, segment.duration), max(longest, segment.duration)
+    taken = {id(s) for s in bucket}
+    waiting[:] = [s for s in waiting if id(s) not in taken]
+    return sorted(bucket, key=lambda s: s.start)
+
+
+async def _transcribe_steps(
+    asr_engines: Sequence[ASRInterface],
+    steps: Iterator[list[SpeechSegment]],
+    bucket_seconds: float,
+    max_batch_size: int,
+    max_concurrency: int,
+) -> AsyncIterator[SegmentTranscript]:
+    """VAD producer and ASR consumer stages shared by the streaming entry points.
+
+    A producer task advances ``steps`` in a worker thread, so neither reading
+    nor VAD runs on the event loop; each step gives the speech segments
+    found in the next stretch of audio, in time order, and goes into a
+    queue. Whenever fewer than ``max_concurrency`` decodes are running, the
+    earliest segment waiting is decoded together with waiting segments of
+    similar length: while the decoders keep up every segment is decoded as
+    soon as it is found, and when they fall behind the batches fill up.
+    Each segment is yielded once it and all segments before it are decoded,
+    so transcripts come out in time order. At most ``2 * max_concurrency``
+    steps are waiting to be decoded or yielded; past that the producer
+    pauses until the caller catches up.
+    """
+    engine_cycle = itertools.cycle(asr_engines)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    slots = asyncio.Semaphore(2 * max_concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        feeding = None
+        try:
+            while True:
+                await slots.acquire()
+                feeding = asyncio.ensure_future(asyncio.to_thread(next, steps, None))
+                # shielded so that cancelling the producer leaves the thread's future alone
+                segments = await asyncio.shield(feeding)
+                if segments is None:
+                    break
+                if segments:
+                    queue.put_nowait(segments)
+                else:
+                    slots.release()
+        finally:
+            if feeding is not None and not feeding.done():
+                # the worker thread is still advancing the steps
+                await asyncio.wait([feeding])
+            steps.close()
+            queue.put_nowait(None)
+
+    producer = asyncio.create_task(produce())
+    waiting: list[SpeechSegment] = []  # found, not yet decoding
+    unyielded: deque[SpeechSegment] = deque()  # found, not yet yielded
+    step_sizes: deque[int] = deque()  # segments of each step still to be yielded
+    texts: dict[int, str] = {}
+    decodes: set[asyncio.Task] = set()
+    getter = None
+    producing = True
+    try:
+        while producing or unyielded:
+            while waiting and len(decodes) < max_concurrency:
+                bucket = _take_bucket(waiting, bucket_seconds, max_batch_size)
+                decodes.add(asyncio.create_task(_decode(bucket, next(engine_cycle), semaphore)))
+
+            while unyielded and unyielded[0].start in texts:
+                segment = unyielded.popleft()
+                text = texts.pop(segment.start)
+                yield SegmentTranscript(text, segment.start_time, segment.end_time)
+                step_sizes[0] -= 1
+                if not step_sizes[0]:
+                    step_sizes.popleft()
+                    slots.release()
+            if not (producing or unyielded):
+                break
+
+            if producing and getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                decodes | ({getter} if getter is not None else set()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done & decodes:
+                decodes.discard(task)
+                texts.update((segment.start, text) for segment, text in task.result())
+            if getter in done:
+                segments, getter = getter.result(), None
+                if segments is None:
+                    producing = False
+                else:
+                    waiting.extend(segments)
+                    unyielded.extend(segments)
+                    step_sizes.append(len(segments))
+        await producer  # re-raises a VAD error
+    finally:
+        if getter is not None:
+            getter.cancel()
+        for task in decodes:
+            task.cancel()
+        producer.cancel()
+        await asyncio.wait([producer])
+
+
+def _session_steps(
+    vad_engine: VADInterface, frames: Iterator[np.ndarray]
+) -> Iterator[list[SpeechSegment]]:
+    """Speech segments found in each frame fed through one streaming VAD session."""
+    session = vad_engine.open_session()
+    try:
+        for frame in frames:
+            # copied out of the session's ring buffer, which later frames overwrite
+            yield [
+                SpeechSegment(s.start, s.end, s.sample_rate, s.audio.copy())
+                for s in _speech(session.feed(frame))
+            ]
+        yield _speech(session.flush())
+    finally:
+        session.close()
+
+
+async def transcribe_audio_stream(
+    vad_engine: VADInterface,
+    asr_engines: ASRInterface | Sequence[ASRInterface],
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    window_seconds: float = 30.0,
+    bucket_seconds: float = 2.0,
+    max_batch_size: int = 8,
+    max_concurrency: int = 4,
+    cache: TranscriptCache | None = None,
+    vad_key: str = "",
+) -> AsyncIterator[SegmentTranscript]:
+    """transcribe_long_audio() with VAD and ASR overlapped, yielding each
+    segment as soon as it is decoded.
+
+    The batched offline VAD runs in a worker thread ``window_seconds`` of
+    audio at a time, carrying its state across windows, so it finds the
+    same segments as transcribe_long_audio(). Segments are decoded while the
+    VAD goes on with the next windows, each batch holding the earliest
+    segment not yet decoded and others of similar length, so the first text
+    arrives once the first segment is decoded rather than after the VAD has
+    seen the whole recording.
+    Segment boundaries found earlier are taken from the cache instead, and
+    boundaries found in full are stored in it.
+
+    Args:
+        vad_engine: Engine used to cut the recording into speech segments.
+        asr_engines: One ASR engine, or several instances to spread batches over.
+        audio: Float32 mono audio in [-1, 1] at ``sample_rate``.
+        sample_rate: Sample rate of ``audio``.
+        window_seconds: Audio passed through the VAD per step.
+        bucket_seconds: Maximum length spread within one batch.
+        max_batch_size: Maximum segments per batch.
+        max_concurrency: Batches decoded at the same time.
+        cache: Optional cache for the segment boundaries.
+        vad_key: Cache key of the VAD settings.
+
+    Yields:
+        The segment transcripts in time order.
+    """
+    if isinstance(asr_engines, ASRInterface):
+        asr_engines = [asr_engines]
+    cache_key = boundaries = None
+    if cache is not None:
+        cache_key = cache.key("vad", audio_key(audio, sample_rate), vad_key)
+        boundaries = cache.get(cache_key)
+    found: list[list[int]] = []
+
+    def steps() -> Iterator[list[SpeechSegment]]:
+        if boundaries is not None:
+            window = max(1, int(window_seconds * sample_rate))
+            segments = [
+                SpeechSegment(start, end, sample_rate, audio[start:end])
+                for start, end in boundaries
+            ]
+            for _, step in itertools.groupby(segments, key=lambda s: s.start // window):
+                yield list(step)
+            return
+        with closing(vad_engine.detect_speech_offline_blocks(audio, window_seconds)) as blocks:
+            for events in blocks:
+                segments = _speech(events)
+                found.extend([s.start, s.end] for s in segments)
+                yield segments
+
+    async with aclosing(
+        _transcribe_steps(asr_engines, steps(), bucket_seconds, max_batch_size, max_concurrency)
+    ) as transcripts:
+        async for transcript in transcripts:
+            yield transcript
+    if cache is not None and boundaries is None:
+        cache.put(cache_key, found)
+
+
+async def transcribe_wav_file(
+    vad_engine: VADInterface,
+    asr_engines: ASRInterface | Sequence[ASRInterface],
+    path: str,
+    window_seconds: float = 30.0,
+    bucket_seconds: float = 2.0,
+    max_batch_size: int = 8,
+    max_concurrency: int = 4,
+) -> AsyncIterator[SegmentTranscript]:
+    """Transcribe a WAV file of any length with bounded memory.
+
+    The file is memory-mapped and read ``window_seconds`` at a time; each
+    window is converted to 16 kHz mono and fed to one streaming VAD session.
+    The speech segments found in a window are decoded, in batches of
+    similar length, while the next windows are read, and at most
+    ``2 * max_concurrency`` windows' segments are in flight, so memory stays
+    bounded by the window size however long the file is.
+
+    Args:
+        vad_engine: Engine providing streaming sessions.
+        asr_engines: One ASR engine, or several instances to spread buckets over.
+        path: WAV file in any format WavFile reads.
+        window_seconds: Audio read and passed through the VAD per step.
+        bucket_seconds: Maximum length spread within one batch.
+        max_batch_size: Maximum segments per batch.
+        max_concurrency: Batches decoded at the same time.
+
+    Yields:
+        The segment transcripts in time order, as soon as they are final.
+    """
+    if isinstance(asr_engines, ASRInterface):
+        asr_engines = [asr_engines]
+
+    with WavFile(path) as wav:
+        frontend = AudioFrontend(wav.sample_rate, ASRInterface.SAMPLE_RATE)
+
+        def frames() -> Iterator[np.ndarray]:
+            for window in wav.windows(max(1, int(window_seconds * wav.sample_rate))):
+                yield frontend.process(window)
+            yield frontend.flush()
+
+        async with aclosing(
+            _transcribe_steps(
+                asr_engines,
+                _session_steps(vad_engine, frames()),
+                bucket_seconds,
+                max_batch_size,
+                max_concurrency,
+            )
+        ) as transcripts:
+            async for transcript in transcripts:
+                yield transcript
+
+
+def main():
+    from .config_manager.utils import read_yaml, validate_config
+    from .service_context import ServiceContext
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="PCM WAV file")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument(
+        "--stream", action="store_true", help="read the file window by window with bounded memory"
+    )
+    args = parser.parse_args()
+
+    config = validate_config(read_yaml(args.config))
+    context = ServiceContext(config)
+    long_form = config.asr_config.long_form
+
+    if args.stream:
+
+        async def stream():
+            async for t in transcribe_wav_file(
+                context.vad_engine,
+                context.asr_engine,
+                args.file,
+                window_seconds=long_form.stream_window_seconds,
+                bucket_seconds=long_form.bucket_seconds,
+                max_batch_size=long_form.max_batch_size,
+                max_concurrency=long_form.max_concurrency,
+            ):
+                print(f"[{t.start:8.2f} - {t.end:8.2f}] {t.text}", flush=True)
+
+        asyncio.run(stream())
+        return
+
+    with WavFile(args.file) as wav:
+        audio = prepare_audio(wav.read(0, wav.num_frames), wav.sample_rate, ASRInterface.SAMPLE_RATE)
+
+    transcripts, report = asyncio.run(
+        transcribe_long_audio(
+            context.vad_engine,
+            context.asr_engine,
+            audio,
+            bucket_seconds=long_form.bucket_seconds,
+            max_batch_size=long_form.max_batch_size,
+            max_concurrency=long_form.max_concurrency,
+        )
+    )
+    for t in transcripts:
+        print(f"[{t.start:8.2f} - {t.end:8.2f}] {t.text}")
+    print(json.dumps(asdict(report), indent=2))
+
+
+if __name__ == "__main__":
+    main()
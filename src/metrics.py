@@ -0,0 +1,327 @@
+"""In-process metrics exposed in the Prometheus text format.
+
+Counters and histograms keep one shard of values per thread, so recording
+a value never takes a lock: a thread only ever writes to its own shard, and
+a scrape adds the shards up. Recording is a no-op while metrics are
+disabled (the default), so the instrumentation can stay in the hot paths.
+
+Usage:
+    from src import metrics
+
+    metrics.enable()
+    metrics.start_http_server("0.0.0.0", 9464)  # serves /metrics
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loguru import logger
+
+# Latency buckets in seconds, from 1 ms to 1 min
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+_enabled = False
+REGISTRY: list["_Metric"] = []
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _Shards:
+    """Per-thread arrays of floats that are summed when read."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._shards: list[list[float]] = []
+        self._lock = threading.Lock()  # taken once per thread, and by readers
+
+    def local(self) -> list[float]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0.0] * self.size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0.0] * self.size
+
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if _enabled:
+            self._shards.local()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # one count per bucket, one for +Inf, then the sum of observed values
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        if _enabled:
+            shard = self._shards.local()
+            shard[bisect_left(self.buckets, value)] += 1
+            shard[-1] += value
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time spent in the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> tuple[list[float], float]:
+        """Cumulative bucket counts (including +Inf) and the sum."""
+        totals = self._shards.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child for one combination of label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if _enabled:
+            self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value())}"]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        # a single assignment, so no shards are needed
+        if _enabled:
+            self._value = value
+
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        if _enabled:
+            self.labels().set(value)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_number(child.value())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        if _enabled:
+            self.labels().observe(value)
+
+    def _render_child(self, values, child):
+        cumulative, total = child.snapshot()
+        lines = []
+        for bound, count in zip(self.buckets + (float("inf"),), cumulative):
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            labels = self._label_text(values, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {_number(count)}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {_number(cumulative[-1])}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==== Metrics recorded by the service
+
+STAGE_SECONDS = Histogram(
+    "asr_service_stage_seconds",
+    "Time spent in each stage of a request.",
+    ("endpoint", "stage"),
+)
+VAD_WINDOWS = Counter("vad_windows_total", "VAD windows run through the state machine.")
+VAD_PROB_CALLS = Counter(
+    "vad_prob_calls_total", "Speech probability model calls.", ("mode",)
+)
+VAD_SEGMENTS = Counter("vad_segments_total", "Speech segments emitted by the VAD.")
+VAD_GATED_WINDOWS = Counter(
+    "vad_gated_windows_total", "VAD windows the energy/ZCR pre-gate kept from the model."
+)
+VAD_TICK_SECONDS = Histogram(
+    "vad_tick_seconds", "Latency of a batched VAD tick, from its oldest window's arrival to the results."
+)
+VAD_TICK_WINDOWS = Counter("vad_tick_windows_total", "Windows run in batched VAD ticks.")
+MICROPHONE_TEXT_LATENCY = Histogram(
+    "microphone_text_latency_seconds",
+    "Time from the VAD closing a live microphone utterance to its text being shown.",
+)
+MICROPHONE_SESSIONS = Gauge("microphone_sessions", "Open live microphone sessions in the UI.")
+ASR_QUEUE_WAIT = Histogram(
+    "asr_queue_wait_seconds", "Time a request waited before its decode started.", ("backend",)
+)
+ASR_DECODE_SECONDS = Histogram(
+    "asr_decode_seconds", "Duration of one backend decode call.", ("backend",)
+)
+ASR_AUDIO_SECONDS = Counter(
+    "asr_audio_seconds_total", "Seconds of audio transcribed.", ("backend",)
+)
+ASR_RTF = Histogram(
+    "asr_rtf", "Real-time factor of one decode call.", ("backend",), buckets=RTF_BUCKETS
+)
+
+ENGINE_REGISTRY_EVENTS = Counter(
+    "engine_registry_events_total",
+    "Engine registry hits, loads and evictions.",
+    ("kind", "event"),
+)
+ENGINE_REGISTRY_RESIDENT = Gauge(
+    "engine_registry_resident_engines", "Engines held by the registry.", ("kind",)
+)
+ENGINE_REGISTRY_BYTES = Gauge(
+    "engine_registry_resident_bytes", "Estimated memory of the engines held by the registry."
+)
+
+
+def observe_asr(
+    backend: str,
+    audio_seconds: float,
+    decode_seconds: float,
+    queue_waits: list[float] | None = None,
+) -> None:
+    """Record one decode call that transcribed ``audio_seconds`` of audio."""
+    if not _enabled:
+        return
+    ASR_DECODE_SECONDS.labels(backend).observe(decode_seconds)
+    ASR_AUDIO_SECONDS.labels(backend).inc(audio_seconds)
+    if audio_seconds > 0:
+        ASR_RTF.labels(backend).observe(decode_seconds / audio_seconds)
+    for wait in queue_waits or ():
+        ASR_QUEUE_WAIT.labels(backend).observe(wait)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(host: str, port: int) -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
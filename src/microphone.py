@@ -0,0 +1,179 @@
+"""Live microphone transcription for the Gradio UI.
+
+The browser streams short microphone chunks. Each user gets a
+MicrophoneSession holding a streaming VAD session. Every speech segment
+the VAD closes is sent to ASR straight away in its own task, and the text
+is added to the transcript as soon as it is ready.
+
+The UI only updates when a handler returns, normally once per chunk. To
+keep the time from the end of an utterance to its text within the latency
+target, feed() waits for decodes still in flight until the oldest one is
+due, but never longer than one chunk interval, so the audio keeps flowing.
+
+Sessions belong to browser tabs that may disappear without notice. close()
+releases the VAD session and cancels outstanding decodes. It may be called
+from any thread, which is what the UI's state cleanup needs.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from loguru import logger
+
+from . import metrics
+from .asr.asr_interface import ASRInterface
+from .config_manager.system import MicrophoneConfig
+from .long_form import MIN_SEGMENT_SAMPLES
+from .service_context import ServiceContext
+from .utils.audio_frontend import AudioFrontend
+from .vad.vad_interface import SpeechSegment
+
+_TEXT_LATENCY = metrics.MICROPHONE_TEXT_LATENCY.labels()
+
+
+@dataclass
+class _PendingSegment:
+    start: float  # seconds
+    end: float  # seconds
+    closed_at: float  # perf_counter() when the VAD closed the segment
+    task: asyncio.Task
+
+
+class MicrophoneSession:
+    """VAD and ASR state of one user's live microphone stream.
+
+    Args:
+        context: Service context providing the VAD and ASR engines.
+        config: Chunk interval, latency target and session lifetime.
+    """
+
+    open_sessions = 0
+
+    def __init__(self, context: ServiceContext, config: MicrophoneConfig):
+        self.context = context
+        self.config = config
+        self.lines: list[str] = []
+        self.pending: list[_PendingSegment] = []
+        self.frontend: AudioFrontend | None = None
+        self.vad_session = None  # opened on the first chunk of every recording
+        self._feeding = False
+        self._closed = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        MicrophoneSession.open_sessions += 1
+        metrics.MICROPHONE_SESSIONS.set(MicrophoneSession.open_sessions)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    async def feed(self, sample_rate: int, chunk: np.ndarray) -> str:
+        """Feed one microphone chunk and return the transcript so far.
+
+        Args:
+            sample_rate: Sample rate of the chunk.
+            chunk: PCM samples as sent by the browser, int16 or float,
+                mono or ``(samples, channels)``.
+        """
+        if self._closed:
+            return self.text
+        self._loop = asyncio.get_running_loop()
+        if self.vad_session is None:
+            # a new recording starts a new transcript
+            self._cancel_pending()
+            self.lines = []
+            self.frontend = AudioFrontend(sample_rate, ASRInterface.SAMPLE_RATE)
+            self.vad_session = self.context.vad_engine.open_session()
+
+        await self._feed_vad(self.frontend.process(chunk))
+        if self.pending:
+            # wait for the oldest utterance up to its deadline, at most one chunk interval
+            due = self.pending[0].closed_at + self.config.latency_target_seconds
+            timeout = min(due - time.perf_counter(), self.config.stream_every_seconds)
+            if timeout > 0:
+                await asyncio.wait([p.task for p in self.pending], timeout=timeout)
+        self._collect()
+        return self.text
+
+    async def finish(self) -> str:
+        """End the recording: flush the VAD, wait for every decode and
+        return the final transcript. The next chunk starts a new recording."""
+        if self.vad_session is not None and not self._closed:
+            await self._feed_vad(self.frontend.flush(), flush=True)
+            if self.vad_session is not None:
+                self.vad_session.close()
+                self.vad_session = None
+        if self.pending:
+            await asyncio.wait([p.task for p in self.pending])
+        self._collect()
+        return self.text
+
+    def close(self) -> None:
+        """Release the session. Safe to call more than once and from any thread."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._release)
+                return
+            except RuntimeError:  # the loop closed meanwhile
+                pass
+        self._release()
+
+    def _release(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._cancel_pending()
+        # a session still being fed in a worker thread is dropped, not pooled
+        if self.vad_session is not None and not self._feeding:
+            self.vad_session.close()
+            self.vad_session = None
+        MicrophoneSession.open_sessions -= 1
+        metrics.MICROPHONE_SESSIONS.set(MicrophoneSession.open_sessions)
+
+    async def _feed_vad(self, audio: np.ndarray, flush: bool = False) -> None:
+        self._feeding = True
+        try:
+            events = await self.vad_session.feed_async(audio)
+            if flush:
+                events += list(self.vad_session.flush())
+        finally:
+            self._feeding = False
+        if self._closed:
+            # closed while the chunk was in the worker thread
+            self.vad_session.close()
+            self.vad_session = None
+            return
+
+        now = time.perf_counter()
+        for event in events:
+            if isinstance(event, SpeechSegment) and len(event.audio) > MIN_SEGMENT_SAMPLES:
+                # copied out of the session's ring buffer, which later chunks overwrite
+                audio = event.audio.copy()
+                task = asyncio.create_task(self.context.asr_engine.async_transcribe_np(audio))
+                self.pending.append(_PendingSegment(event.start_time, event.end_time, now, task))
+
+    def _collect(self) -> None:
+        """Move finished decodes to the transcript, keeping utterance order."""
+        now = time.perf_counter()
+        while self.pending and self.pending[0].task.done():
+            segment = self.pending.pop(0)
+            try:
+                text = segment.task.result()
+            except Exception as e:
+                logger.error(f"Microphone segment transcription failed: {e}")
+                text = "（识别失败）"
+            latency = now - segment.closed_at
+            _TEXT_LATENCY.observe(latency)
+            if latency > self.config.latency_target_seconds:
+                logger.warning(
+                    f"Microphone text latency {latency:.2f}s exceeded the "
+                    f"{self.config.latency_target_seconds:.2f}s target"
+                )
+            self.lines.append(f"[{segment.start:.2f} - {segment.end:.2f}] {text}")
+
+    def _cancel_pending(self) -> None:
+        for segment in self.pending:
+            segment.task.cancel()
+        self.pending = []
@@ -0,0 +1,278 @@
+"""WebSocket server for streaming transcription.
+
+Each connection gets its own VAD session; speech segments are transcribed
+with the shared ASR engine and the transcripts are pushed back as soon as
+they are final.
+
+Protocol (``ws://<host>:<port>/ws/asr?format=int16&sample_rate=16000&channels=1``):
+    client -> server  binary frames of interleaved PCM, ``int16`` (default) or
+                      ``float32``, at any sample rate; the audio is downmixed
+                      and resampled to 16 kHz on the server
+                      text ``{"type": "end"}`` to finish the stream
+    server -> client  ``{"type": "speech_start"}`` / ``{"type": "speech_end"}``
+                      ``{"type": "transcript", "segment", "text", "start", "end"}``
+                      ``{"type": "done"}`` after the end of the stream
+                      ``{"type": "error", "message"}``
+
+Each connection has a bounded queue between the VAD and the ASR stage. When
+the ASR falls behind and the queue is full, the connection stops reading
+audio, so a slow decode holds the client back (through the WebSocket and TCP
+flow control) instead of buffering audio without limit.
+
+Health checks: ``GET /healthz`` (liveness) and ``GET /readyz`` (200 once the
+models are loaded and warmed up, 503 before).
+
+Usage:
+    python -m src.server [--config config.yaml]
+"""
+
+import argparse
+import asyncio
+import json
+
+import numpy as np
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from . import metrics
+from .config_manager.system import StreamingServerConfig
+from .asr.asr_interface import ASRInterface
+from .service_context import ServiceContext
+from .utils.audio_frontend import AudioFrontend
+from .vad.vad_interface import PAUSE_SIGNAL, RESUME_SIGNAL, SpeechSegment
+
+SAMPLE_FORMATS = {"int16": (np.int16, 1 / 32768.0), "float32": (np.float32, 1.0)}
+
+# put on the segment queue once the stream has ended
+_END = object()
+
+
+class PCMDecoder:
+    """Turns raw interleaved PCM frames into float32 samples, carrying partial
+    samples split across frames over to the next frame."""
+
+    def __init__(self, sample_format: str, channels: int = 1):
+        self.dtype, self.scale = SAMPLE_FORMATS[sample_format]
+        self.channels = channels
+        self.itemsize = np.dtype(self.dtype).itemsize * channels
+        self._remainder = b""
+
+    def decode(self, frame: bytes) -> np.ndarray:
+        """Returns mono samples, or ``(samples, channels)`` for multichannel audio."""
+        if self._remainder:
+            frame = self._remainder + frame
+        usable = len(frame) - len(frame) % self.itemsize
+        self._remainder = frame[usable:]
+        samples = np.frombuffer(frame, dtype=self.dtype, count=usable * self.channels // self.itemsize)
+        if self.scale != 1.0:
+            samples = samples.astype(np.float32) * np.float32(self.scale)
+        return samples.reshape(-1, self.channels) if self.channels > 1 else samples
+
+
+def _owned(events: list) -> list:
+    """Copy segment audio out of the session's ring buffer, which is reused
+    by later frames while the segment waits for ASR."""
+    return [
+        SpeechSegment(e.start, e.end, e.sample_rate, e.audio.copy())
+        if isinstance(e, SpeechSegment)
+        else e
+        for e in events
+    ]
+
+
+class StreamingConnection:
+    """Runs the VAD and ASR stages for one WebSocket connection."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        context: ServiceContext,
+        config: StreamingServerConfig,
+        sample_format: str,
+        sample_rate: int = ASRInterface.SAMPLE_RATE,
+        channels: int = 1,
+    ):
+        self.websocket = websocket
+        self.context = context
+        self.config = config
+        self.decoder = PCMDecoder(sample_format, channels)
+        self.frontend = AudioFrontend(sample_rate, ASRInterface.SAMPLE_RATE)
+        self.segments: asyncio.Queue = asyncio.Queue(maxsize=config.segment_queue_size)
+        self.session = None  # opened on the first audio frame, so idle connections stay cheap
+        self._feeding = False
+
+    async def run(self) -> None:
+        receiver = asyncio.create_task(self._receive())
+        transcriber = asyncio.create_task(self._transcribe())
+        try:
+            done, _ = await asyncio.wait(
+                {receiver, transcriber}, return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                task.result()
+            await transcriber
+        finally:
+            receiver.cancel()
+            transcriber.cancel()
+            # a session still being fed in a worker thread is dropped, not pooled
+            if self.session is not None and not self._feeding:
+                self.session.close()
+
+    async def _receive(self) -> None:
+        """Read audio frames and feed them to the VAD session until the stream ends."""
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+
+            frame = message.get("bytes")
+            if frame is None:
+                if _is_end(message.get("text")):
+                    break
+                continue
+            if len(frame) > self.config.max_frame_bytes:
+                await self.websocket.send_json(
+                    {"type": "error", "message": f"Frame larger than {self.config.max_frame_bytes} bytes"}
+                )
+                continue
+
+            audio = self.frontend.process(self.decoder.decode(frame))
+            if self.session is None:
+                self.session = self.context.vad_engine.open_session()
+            self._feeding = True
+            events = _owned(await self.session.feed_async(audio))
+            self._feeding = False
+            for event in events:
+                # blocks while the ASR stage is behind, which stops reading the socket
+                await self.segments.put(event)
+
+        if self.session is not None:
+            tail = self.frontend.flush()
+            # off the event loop like the frames above, and likewise never pooled mid-call
+            self._feeding = True
+            events = await self.session.feed_async(tail)
+            events += await asyncio.to_thread(lambda: list(self.session.flush()))
+            self._feeding = False
+            for event in _owned(events):
+                await self.segments.put(event)
+        await self.segments.put(_END)
+
+    async def _transcribe(self) -> None:
+        """Transcribe queued segments and send the results, in stream order."""
+        index = 0
+        while True:
+            event = await self.segments.get()
+            if event is _END:
+                await self.websocket.send_json({"type": "done"})
+                return
+            if event == PAUSE_SIGNAL:
+                await self.websocket.send_json({"type": "speech_start"})
+            elif event == RESUME_SIGNAL:
+                await self.websocket.send_json({"type": "speech_end"})
+            elif isinstance(event, SpeechSegment):
+                text = await self.context.asr_engine.async_transcribe_np(event.audio)
+                await self.websocket.send_json(
+                    {
+                        "type": "transcript",
+                        "segment": index,
+                        "text": text,
+                        "start": round(event.start_time, 3),
+                        "end": round(event.end_time, 3),
+                    }
+                )
+                index += 1
+
+
+def _is_end(text: str | None) -> bool:
+    try:
+        return json.loads(text or "").get("type") == "end"
+    except (ValueError, AttributeError):
+        return False
+
+
+def create_app(context: ServiceContext) -> FastAPI:
+    """Build the FastAPI application serving the streaming endpoint."""
+    config = context.system_config.streaming
+    app = FastAPI(title="Streaming ASR")
+    app.state.connections = 0
+
+    @app.get("/healthz")
+    async def liveness():
+        health = context.health()
+        return JSONResponse(health, status_code=200 if health["live"] else 503)
+
+    @app.get("/readyz")
+    async def readiness():
+        health = context.health()
+        health["connections"] = app.state.connections
+        return JSONResponse(health, status_code=200 if health["ready"] else 503)
+
+    @app.websocket("/ws/asr")
+    async def asr_endpoint(
+        websocket: WebSocket, format: str = "int16", sample_rate: int = 16000, channels: int = 1
+    ):
+        if not context.is_ready or app.state.connections >= config.max_connections:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+        await websocket.accept()
+
+        if format not in SAMPLE_FORMATS or not 0 < sample_rate <= 192000 or not 0 < channels <= 8:
+            await websocket.send_json(
+                {
+                    "type": "error",
+                    "message": f"Expected format in {list(SAMPLE_FORMATS)}, "
+                    "0 < sample_rate <= 192000 and 0 < channels <= 8",
+                }
+            )
+            await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+            return
+
+        app.state.connections += 1
+        try:
+            await StreamingConnection(websocket, context, config, format, sample_rate, channels).run()
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.error(f"Streaming connection failed: {e}")
+            try:
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            except RuntimeError:  # already closed
+                pass
+        finally:
+            app.state.connections -= 1
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    from .config_manager.utils import read_yaml, validate_config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default="config.yaml")
+    args = parser.parse_args()
+
+    config = validate_config(read_yaml(args.config))
+    if config.system_config.metrics_enabled:
+        # before loading, so the load and warm-up metrics are recorded
+        metrics.enable()
+    context = ServiceContext()
+    if config.system_config.background_loading:
+        # listen straight away; /readyz reports 503 until the models are warm
+        context.load_in_background(config)
+    else:
+        context.load_and_warm_up(config)
+    system_config = context.system_config
+    if system_config.metrics_enabled:
+        metrics.start_http_server(system_config.host, system_config.metrics_port)
+    logger.info(
+        f"Streaming ASR server at ws://{system_config.host}:{system_config.streaming.port}/ws/asr"
+    )
+    uvicorn.run(create_app(context), host=system_config.host, port=system_config.streaming.port)
+
+
+if __name__ == "__main__":
+    main()
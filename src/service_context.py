@@ -1,5 +1,8 @@
 import os
 import json
+import threading
+import time
+from enum import Enum
 
 from loguru import logger
 
@@ -7,21 +10,38 @@ from .asr.asr_interface import ASRInterface
 from .vad.vad_interface import VADInterface
 
 from .asr.asr_factory import ASRFactory
+from .asr.process_pool_asr import ASRProcessPool
 from .vad.vad_factory import VADFactory
+from .engine_registry import ENGINE_REGISTRY, config_key
+from .transcript_cache import TranscriptCache
 
 from .config_manager import (
     Config,
     SystemConfig,
     ASRConfig,
     VADConfig,
+    WarmupConfig,
     read_yaml,
     validate_config,
 )
+from .utils.reference_audio import synthetic_speech
+
+
+class ServiceState(str, Enum):
+    STARTING = "starting"
+    LOADING = "loading"
+    WARMING_UP = "warming_up"
+    READY = "ready"
+    FAILED = "failed"
 
 
 class ServiceContext:
     """Initializes, stores, and updates the asr, tts, and llm instances and other
-    configurations for a connected client."""
+    configurations for a connected client.
+
+    Engines come from the process-wide engine registry, so contexts with the
+    same engine settings share one instance. Call close() when a context is
+    discarded."""
 
     def __init__(self, config: Config | None = None):
         """Initialize the service context with optional configuration.
@@ -34,9 +54,19 @@ class ServiceContext:
         self.asr_engine: ASRInterface = None
         self.vad_engine: VADInterface | None = None
         self.system_prompt: str = None
-        
+        self.asr_key: str = ""  # hash of the ASR settings, for caches
+        self.vad_key: str = ""  # hash of the VAD settings, for caches
+        self.transcript_cache: TranscriptCache | None = None
+
+        self.state = ServiceState.STARTING
+        self.error: str | None = None
+        self.warmup_ms: dict[str, list[float]] = {}
+        self._ready = threading.Event()
+
         if config:
             self.load_from_config(config)
+            self._ready.set()
+            self.state = ServiceState.READY
 
     def __str__(self):
         return (
@@ -47,6 +77,28 @@ class ServiceContext:
             f"  VAD Engine: {type(self.vad_engine).__name__ if self.vad_engine else 'Not Loaded'}\n"
         )
 
+    # ==== Readiness
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the engines are loaded and warmed up."""
+        return self._ready.wait(timeout)
+
+    def health(self) -> dict:
+        """Liveness and readiness state, for health endpoints and logs."""
+        return {
+            "live": self.state != ServiceState.FAILED,
+            "ready": self.is_ready,
+            "state": self.state.value,
+            "error": self.error,
+            "asr_engine": type(self.asr_engine).__name__ if self.asr_engine else None,
+            "vad_engine": type(self.vad_engine).__name__ if self.vad_engine else None,
+            "warmup_ms": self.warmup_ms,
+        }
+
     # ==== Initializers
 
     def load_cache(
@@ -82,6 +134,18 @@ class ServiceContext:
         if not self.system_config:
             self.system_config = config.system_config
 
+        registry_config = config.system_config.engine_registry
+        ENGINE_REGISTRY.configure(
+            registry_config.memory_budget_mb, registry_config.idle_ttl_seconds
+        )
+
+        cache_config = config.system_config.transcript_cache
+        if cache_config.enabled and self.transcript_cache is None:
+            self.transcript_cache = TranscriptCache(
+                max_entries=cache_config.max_entries,
+                disk_path=cache_config.disk_path or None,
+            )
+
         # init asr from character config
         self.init_asr(config.asr_config)
 
@@ -92,18 +156,152 @@ class ServiceContext:
         self.config = config
         self.system_config = config.system_config or self.system_config
 
+    def load_and_warm_up(self, config: Config) -> None:
+        """Load the engines from the config, warm them up and mark the context ready.
+
+        Args:
+            config: The configuration to load.
+        """
+        self._ready.clear()
+        self.system_config = self.system_config or config.system_config
+        try:
+            self.state = ServiceState.LOADING
+            self.load_from_config(config)
+            warmup = config.system_config.warmup
+            if warmup.enabled:
+                self.state = ServiceState.WARMING_UP
+                self.warm_up(warmup)
+        except Exception as e:
+            self.state = ServiceState.FAILED
+            self.error = repr(e)
+            logger.exception(f"Failed to load the service engines: {e}")
+            raise
+        self.state = ServiceState.READY
+        self._ready.set()
+        logger.info("Service ready")
+
+    def load_in_background(self, config: Config) -> threading.Thread:
+        """Start load_and_warm_up in a background thread and return immediately.
+
+        The system config is available straight away, so a server can start
+        listening and report readiness while the models load.
+
+        Args:
+            config: The configuration to load.
+
+        Returns:
+            threading.Thread: The loading thread.
+        """
+        self.system_config = self.system_config or config.system_config
+        self.state = ServiceState.LOADING
+
+        def run():
+            try:
+                self.load_and_warm_up(config)
+            except Exception:
+                pass  # recorded in self.state and self.error
+
+        thread = threading.Thread(target=run, name="service-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def warm_up(self, warmup: WarmupConfig) -> None:
+        """Run inference on synthetic audio so lazy initialisation (kernel
+        selection, graph optimisation, allocator growth) happens before the
+        first real request.
+
+        Args:
+            warmup: Number of runs and length of the warm-up audio.
+        """
+        audio = synthetic_speech(warmup.audio_seconds)
+        self.warmup_ms = {}
+
+        def timed(name, fn):
+            start = time.perf_counter()
+            fn()
+            self.warmup_ms.setdefault(name, []).append(
+                round((time.perf_counter() - start) * 1000, 1)
+            )
+
+        for _ in range(warmup.runs):
+            if self.vad_engine is not None:
+                timed("vad", lambda: list(self.vad_engine.detect_speech(audio)))
+                timed("vad_offline", lambda: list(self.vad_engine.detect_speech_offline(audio)))
+            if self.asr_engine is not None:
+                if isinstance(self.asr_engine, ASRProcessPool):
+                    self.asr_engine.wait_ready()
+                    # one request per worker, so every process is warmed up
+                    copies = len(self.asr_engine.workers)
+                    timed("asr", lambda: self.asr_engine.transcribe_batch_np([audio] * copies))
+                else:
+                    timed("asr", lambda: self.asr_engine.transcribe_np(audio))
+                    if self.asr_engine.MAX_BATCH_SIZE > 1:
+                        batch = [audio] * min(4, self.asr_engine.MAX_BATCH_SIZE)
+                        timed("asr_batch", lambda: self.asr_engine.transcribe_batch_np(batch))
+        logger.info(f"Warm-up finished: {self.warmup_ms}")
+
     def init_asr(self, asr_config: ASRConfig) -> None:
+        """Initialize or update the ASR engine, sharing it through the engine
+        registry with every context that uses the same settings.
+
+        Args:
+            asr_config: Configuration for the ASR engine
+        """
         if not self.asr_engine or (self.asr_config != asr_config):
             logger.info(f"Initializing ASR: {asr_config.asr_model}")
-            self.asr_engine = ASRFactory.get_asr_system(
-                asr_config.asr_model,
-                **getattr(asr_config, asr_config.asr_model).model_dump(),
+            settings = {
+                "asr_model": asr_config.asr_model,
+                "kwargs": getattr(asr_config, asr_config.asr_model).model_dump(),
+                "worker_pool": asr_config.worker_pool.model_dump(),
+                "batching": asr_config.batching.model_dump(),
+            }
+            engine = ENGINE_REGISTRY.acquire(
+                "asr", settings, lambda: self._create_asr_engine(asr_config)
             )
+            ENGINE_REGISTRY.release(self.asr_engine)
+            self.asr_engine = engine
+            self.asr_key = config_key("asr", settings)
             # saving config should be done after successful initialization
             self.asr_config = asr_config
         else:
             logger.info("ASR already initialized with the same config.")
 
+    @staticmethod
+    def _create_asr_engine(asr_config: ASRConfig) -> ASRInterface:
+        asr_kwargs = getattr(asr_config, asr_config.asr_model).model_dump()
+        worker_pool = asr_config.worker_pool
+        if worker_pool.num_workers > 0:
+            asr_engine = ASRProcessPool(
+                asr_config.asr_model,
+                asr_kwargs,
+                num_workers=worker_pool.num_workers,
+                restart_on_crash=worker_pool.restart_on_crash,
+                max_job_retries=worker_pool.max_job_retries,
+            )
+        else:
+            asr_engine = ASRFactory.get_asr_system(
+                asr_config.asr_model,
+                **asr_kwargs,
+            )
+        batching = asr_config.batching
+        if batching.enabled:
+            scheduler = asr_engine.enable_batching(
+                max_batch_size=batching.max_batch_size,
+                max_wait_ms=batching.max_wait_ms,
+                max_concurrent_batches=batching.max_concurrent_batches,
+            )
+            if scheduler is None:
+                logger.info(
+                    f"ASR batching requested but {asr_config.asr_model} cannot batch; "
+                    "using per-request decoding."
+                )
+            else:
+                logger.info(
+                    f"ASR batching enabled: max_batch_size={scheduler.max_batch_size}, "
+                    f"max_wait_ms={batching.max_wait_ms}"
+                )
+        return asr_engine
+
     def init_vad(self, vad_config: VADConfig) -> None:
         """Initialize or update the VAD engine with the given configuration.
 
@@ -112,14 +310,44 @@ class ServiceContext:
         """
         if not self.vad_engine or (self.vad_config != vad_config):
             logger.info(f"Initializing VAD: {vad_config.vad_model}")
-            self.vad_engine = VADFactory.get_vad_engine(
-                vad_config.vad_model,
-                **getattr(vad_config, vad_config.vad_model.lower()).model_dump(),
+            vad_kwargs = getattr(vad_config, vad_config.vad_model.lower()).model_dump()
+            settings = {
+                "vad_model": vad_config.vad_model,
+                "kwargs": vad_kwargs,
+                "batching": vad_config.batching.model_dump(),
+            }
+            engine = ENGINE_REGISTRY.acquire(
+                "vad", settings, lambda: self._create_vad_engine(vad_config)
             )
+            ENGINE_REGISTRY.release(self.vad_engine)
+            self.vad_engine = engine
+            self.vad_key = config_key("vad", settings)
             self.vad_config = vad_config
         else:
             logger.info("VAD already initialized with the same config.")
 
+    @staticmethod
+    def _create_vad_engine(vad_config: VADConfig) -> VADInterface:
+        vad_kwargs = getattr(vad_config, vad_config.vad_model.lower()).model_dump()
+        vad_engine = VADFactory.get_vad_engine(vad_config.vad_model, **vad_kwargs)
+        batching = vad_config.batching
+        if batching.enabled:
+            vad_engine.enable_batching(
+                max_batch_size=batching.max_batch_size, max_wait_ms=batching.max_wait_ms
+            )
+            logger.info(
+                f"VAD batching enabled: max_batch_size={batching.max_batch_size}, "
+                f"max_wait_ms={batching.max_wait_ms}"
+            )
+        return vad_engine
+
+    def close(self) -> None:
+        """Release this context's engines back to the engine registry."""
+        ENGINE_REGISTRY.release(self.asr_engine)
+        ENGINE_REGISTRY.release(self.vad_engine)
+        self.asr_engine = None
+        self.vad_engine = None
+
     def initialize_services(self) -> None:
         """Initialize all services using the current configuration."""
         if not self.config:
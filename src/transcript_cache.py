@@ -0,0 +1,141 @@
+"""Content-addressed cache for VAD segment boundaries and transcripts.
+
+Entries are keyed by a hash of the normalised audio together with the cache
+keys of the engines that produced them, so:
+
+* ``vad`` entries (segment boundaries) depend on the audio and the VAD
+  settings only, and survive switching the ASR model;
+* ``transcript`` entries depend on the audio, the VAD and the ASR settings.
+
+Values are kept in an in-memory LRU and, optionally, in a SQLite file that
+survives restarts. Identical requests in flight at the same time are
+coalesced: the first computes, the others wait for its result.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+import numpy as np
+from loguru import logger
+
+from . import metrics
+
+CACHE_EVENTS = metrics.Counter(
+    "transcript_cache_events_total",
+    "Transcript cache lookups by level and outcome.",
+    ("level", "event"),
+)
+
+
+def audio_key(audio: np.ndarray, sample_rate: int) -> str:
+    """Hash of normalised float32 PCM, read in place without copying."""
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    digest = hashlib.blake2b(memoryview(audio).cast("B"), digest_size=16)
+    digest.update(str(sample_rate).encode())
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """Two-level LRU cache with an optional SQLite store and in-flight coalescing."""
+
+    def __init__(self, max_entries: int = 1024, disk_path: str | None = None):
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._db: sqlite3.Connection | None = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Transcript cache persisted to {disk_path}")
+
+    @staticmethod
+    def key(level: str, *parts: str) -> str:
+        return ":".join((level, *parts))
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """Return the cached value for ``key``, computing and storing it on a miss.
+
+        Args:
+            key: Cache key from key().
+            compute: Coroutine function producing a JSON-serialisable value.
+
+        Returns:
+            The value, and whether it came from the cache (or from an identical
+            request that was already in flight).
+        """
+        level = key.split(":", 1)[0]
+        value = self.get(key)
+        if value is not None:
+            CACHE_EVENTS.labels(level, "hit").inc()
+            return value, True
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            CACHE_EVENTS.labels(level, "coalesced").inc()
+            return await asyncio.shield(pending), True
+
+        CACHE_EVENTS.labels(level, "miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
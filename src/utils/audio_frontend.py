@@ -0,0 +1,192 @@
+"""Audio front-end: integer-to-float conversion, channel downmix and resampling.
+
+Every ASR and VAD backend works on 16 kHz mono float32. ``prepare_audio``
+turns whatever an upload or a client sends into that, and ``AudioFrontend``
+does the same for a stream that arrives in chunks.
+
+Resampling uses a polyphase windowed-sinc filter. For a rate change of
+``up / down`` (the ratio reduced by the gcd) output sample ``n`` sits at input
+position ``n * down / up``; its value is the dot product of the ``taps``
+input samples around that position with one of ``up`` filter phases. All
+outputs of a block are gathered and filtered in one vectorised step, and
+the filter bank for each rate pair is designed once and cached. The filter
+is centred on the output position, so there is no group delay, and a
+streaming resampler produces the same samples as a one-shot one, apart from
+float rounding.
+"""
+
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+
+# zero crossings of the sinc on each side of the centre, at the lower of the two rates
+ZERO_CROSSINGS = 16
+# cutoff as a fraction of the lower Nyquist frequency, leaves room for the transition band
+ROLLOFF = 0.94
+KAISER_BETA = 8.6
+# outputs filtered per vectorised step, bounds the size of the gathered windows
+BLOCK_OUTPUTS = 16384
+
+
+@lru_cache(maxsize=32)
+def polyphase_filter(orig_sr: int, target_sr: int) -> tuple[int, int, int, np.ndarray]:
+    """Design the filter bank for one rate pair.
+
+    Returns:
+        ``(up, down, half, bank)``: the reduced rate ratio, the half length of
+        the prototype filter in upsampled samples, and a read-only
+        ``(up, taps)`` float32 array whose row ``p`` holds the taps of phase
+        ``p`` in input order (oldest sample first).
+    """
+    g = gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    # prototype filter at the upsampled rate orig_sr * up
+    scale = max(up, down)
+    half = ZERO_CROSSINGS * scale
+    taps = (2 * half) // up + 2
+
+    # tap k of phase p applies to input sample base - k, at distance p - half + k * up
+    p = np.arange(up)[:, None]
+    k = np.arange(taps)[None, :]
+    u = p - half + k * up
+    window = np.kaiser(2 * half + 1, KAISER_BETA)[np.clip(u + half, 0, 2 * half)]
+    cutoff = ROLLOFF / scale  # relative to the upsampled Nyquist frequency
+    h = cutoff * np.sinc(cutoff * u) * window * up
+    h[np.abs(u) > half] = 0.0
+
+    bank = np.ascontiguousarray(h[:, ::-1], dtype=np.float32)
+    bank.setflags(write=False)
+    return up, down, half, bank
+
+
+def to_float32(audio: np.ndarray) -> np.ndarray:
+    """Scale integer PCM to [-1, 1); float input is passed through as float32."""
+    audio = np.asarray(audio)
+    if np.issubdtype(audio.dtype, np.integer):
+        info = np.iinfo(audio.dtype)
+        centre = (info.max + info.min + 1) // 2  # 0 for signed types
+        return (audio.astype(np.float32) - centre) / np.float32(info.max - centre + 1)
+    return audio.astype(np.float32, copy=False)
+
+
+def downmix(audio: np.ndarray) -> np.ndarray:
+    """Average the channels of ``(samples, channels)`` audio; mono is returned as is."""
+    if audio.ndim == 1:
+        return audio
+    if audio.ndim != 2:
+        raise ValueError(f"Expected mono or (samples, channels) audio, got shape {audio.shape}")
+    if audio.shape[1] == 1:
+        return audio[:, 0]
+    return audio.mean(axis=1, dtype=np.float32)
+
+
+class Resampler:
+    """Streaming polyphase resampler for one rate pair.
+
+    Feed chunks of any length to process() and call flush() at the end of the
+    stream; the concatenated output equals resample() of the whole input.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        if orig_sr <= 0 or target_sr <= 0:
+            raise ValueError("Sample rates must be positive")
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.up, self.down, self.half, self.bank = polyphase_filter(orig_sr, target_sr)
+        self.taps = self.bank.shape[1]
+        self.reset()
+
+    def reset(self) -> None:
+        # input from absolute index self._offset on; samples before 0 are zeros
+        self._buffer = np.zeros(self.taps, dtype=np.float32)
+        self._offset = -self.taps
+        self._received = 0
+        self._produced = 0
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """Resample the next chunk; returns every output whose input is complete."""
+        if self.up == self.down:
+            return np.asarray(audio, dtype=np.float32)
+        self._append(np.asarray(audio, dtype=np.float32))
+        # output n needs input up to (n * down + half) // up
+        ready = -(-(self._received * self.up - self.half) // self.down)
+        return self._emit(ready)
+
+    def flush(self) -> np.ndarray:
+        """Resample what is left, treating the input after the end as silence,
+        and reset for a new stream."""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        received = self._received
+        self._append(np.zeros(self.half // self.up + 2, dtype=np.float32))
+        self._received = received
+        out = self._emit(total)
+        self.reset()
+        return out
+
+    def _append(self, audio: np.ndarray) -> None:
+        self._buffer = np.concatenate([self._buffer, audio])
+        self._received += len(audio)
+
+    def _emit(self, ready: int) -> np.ndarray:
+        n = np.arange(self._produced, max(self._produced, ready), dtype=np.int64)
+        if len(n) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        out = np.empty(len(n), dtype=np.float32)
+        windows = np.lib.stride_tricks.sliding_window_view(self._buffer, self.taps)
+        for i in range(0, len(n), BLOCK_OUTPUTS):
+            block = n[i : i + BLOCK_OUTPUTS]
+            position = block * self.down + self.half
+            first = position // self.up - (self.taps - 1) - self._offset
+            out[i : i + len(block)] = np.einsum(
+                "ij,ij->i", windows[first], self.bank[position % self.up]
+            )
+        self._produced += len(n)
+
+        # drop the input no later output needs
+        keep_from = (self._produced * self.down + self.half) // self.up - (self.taps - 1)
+        drop = max(0, keep_from - self._offset)
+        self._buffer = self._buffer[drop:]
+        self._offset += drop
+        return out
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Resample complete mono float32 audio from ``orig_sr`` to ``target_sr``."""
+    audio = np.asarray(audio, dtype=np.float32)
+    if orig_sr == target_sr:
+        return audio
+    resampler = Resampler(orig_sr, target_sr)
+    return np.concatenate([resampler.process(audio), resampler.flush()])
+
+
+def prepare_audio(audio: np.ndarray, sample_rate: int, target_sr: int = 16000) -> np.ndarray:
+    """Convert complete audio to mono float32 at ``target_sr``.
+
+    Args:
+        audio: Integer or float PCM, mono or ``(samples, channels)``.
+        sample_rate: Sample rate of ``audio``.
+        target_sr: Sample rate the backends expect.
+
+    Returns:
+        Mono float32 audio at ``target_sr``.
+    """
+    return resample(downmix(to_float32(audio)), sample_rate, target_sr)
+
+
+class AudioFrontend:
+    """prepare_audio() for a stream: converts, downmixes and resamples chunk by chunk."""
+
+    def __init__(self, sample_rate: int, target_sr: int = 16000):
+        self.sample_rate = sample_rate
+        self.target_sr = target_sr
+        self.resampler = Resampler(sample_rate, target_sr)
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        return self.resampler.process(downmix(to_float32(audio)))
+
+    def flush(self) -> np.ndarray:
+        return self.resampler.flush()
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, List
+
+from loguru import logger
+
+
+@dataclass
+class BatchRequest:
+    item: Any
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class MicroBatchScheduler:
+    """Gathers concurrent requests into batched calls run in a worker thread.
+
+    A batch is started once the oldest pending request has waited
+    ``max_wait_ms`` or ``max_batch_size`` requests are pending; at most
+    ``max_concurrent_batches`` batches run at once, and requests submitted
+    meanwhile form the next one. Subclasses implement run_batch(), which
+    turns the items of a batch into one result per item, and may override
+    on_batch_done() and on_batch_failed() for stats and logging.
+    """
+
+    name = "batch"
+
+    def __init__(
+        self, max_batch_size: int, max_wait_ms: float, max_concurrent_batches: int = 1
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: List[BatchRequest] = []
+
+    def run_batch(self, items: list) -> list:
+        """Process one batch in a worker thread, returning a result per item."""
+        raise NotImplementedError
+
+    def on_batch_done(self, batch: List[BatchRequest], started: float, finished: float) -> None:
+        """Called on the event loop after a batch succeeded."""
+
+    def on_batch_failed(self, batch: List[BatchRequest], error: Exception) -> None:
+        """Called on the event loop after a batch raised."""
+        logger.error(f"Batched {self.name} call failed: {error}")
+
+    def _bind_loop(self) -> None:
+        """(Re)create the loop-bound primitives on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._pending = []
+        self._has_work = asyncio.Event()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = loop.create_task(self._run())
+
+    async def _submit(self, item) -> Any:
+        """Queue one item and wait for its result."""
+        self._bind_loop()
+        future = self._loop.create_future()
+        self._pending.append(BatchRequest(item, future, time.perf_counter()))
+        self._has_work.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_work.wait()
+
+            remaining = self.max_wait_s - (time.perf_counter() - self._pending[0].enqueued_at)
+            if remaining > 0 and len(self._pending) < self.max_batch_size:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            if not self._pending:
+                self._has_work.clear()
+
+            batch = [request for request in batch if not request.future.done()]
+            if not batch:
+                continue
+
+            await self._slots.acquire()
+            self._loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[BatchRequest]) -> None:
+        try:
+            started = time.perf_counter()
+            try:
+                results = await asyncio.to_thread(
+                    self.run_batch, [request.item for request in batch]
+                )
+            except Exception as e:
+                self.on_batch_failed(batch, e)
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                return
+
+            self.on_batch_done(batch, started, time.perf_counter())
+            for request, result in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            self._slots.release()
@@ -1,8 +1,9 @@
 import re
+from functools import lru_cache
 from typing import List, Tuple, AsyncIterator, Optional
 import pysbd
 from loguru import logger
-from langdetect import detect
+from langdetect import detect, detect_langs
 from enum import Enum
 from dataclasses import dataclass
 
@@ -72,6 +73,19 @@ SUPPORTED_LANGUAGES = {
     "zh",
 }
 
+# A stream's language is pinned once detection is at least this confident
+# on at least this many characters; until then it is detected per call
+LANGUAGE_PIN_CONFIDENCE = 0.9
+LANGUAGE_PIN_MIN_CHARS = 20
+
+# Matches the shortest text ending with any end punctuation character
+_SENTENCE_END_PATTERN = re.compile(
+    r"(.*?(?:[" + "|".join(re.escape(p) for p in END_PUNCTUATIONS) + r"]))"
+)
+# Any single end punctuation or comma character ("..." and "。。。" contain "." and "。")
+_END_PUNCTUATION_CHAR = re.compile("|".join(re.escape(p) for p in END_PUNCTUATIONS if len(p) == 1))
+_COMMA_CHAR = re.compile("|".join(re.escape(c) for c in set(COMMAS)))
+
 
 def detect_language(text: str) -> str:
     """
@@ -86,6 +100,25 @@ def detect_language(text: str) -> str:
         return None
 
 
+def detect_language_confidence(text: str) -> Tuple[Optional[str], float]:
+    """
+    Detect text language with the probability of the best guess.
+    The language is None if it is not supported by pysbd.
+    """
+    try:
+        best = detect_langs(text)[0]
+        return (best.lang if best.lang in SUPPORTED_LANGUAGES else None), best.prob
+    except Exception as e:
+        logger.debug(f"Language detection failed: {e}")
+        return None, 0.0
+
+
+@lru_cache(maxsize=None)
+def get_segmenter(language: str) -> pysbd.Segmenter:
+    """Shared pysbd segmenter for a language; building one loads its rules."""
+    return pysbd.Segmenter(language=language, clean=False)
+
+
 def is_complete_sentence(text: str) -> bool:
     """
     Check if text ends with sentence-ending punctuation and not abbreviation.
@@ -184,12 +217,8 @@ def segment_text_by_regex(text: str) -> Tuple[List[str], str]:
     complete_sentences = []
     remaining_text = text.strip()
 
-    # Create pattern for matching sentences ending with any end punctuation
-    escaped_punctuations = [re.escape(p) for p in END_PUNCTUATIONS]
-    pattern = r"(.*?(?:[" + "|".join(escaped_punctuations) + r"]))"
-
     while remaining_text:
-        match = re.search(pattern, remaining_text)
+        match = _SENTENCE_END_PATTERN.search(remaining_text)
         if not match:
             break
 
@@ -207,13 +236,17 @@ def segment_text_by_regex(text: str) -> Tuple[List[str], str]:
     return complete_sentences, remaining_text
 
 
-def segment_text_by_pysbd(text: str) -> Tuple[List[str], str]:
+def segment_text_by_pysbd(
+    text: str, language: Optional[str] = None
+) -> Tuple[List[str], str]:
     """
     Segment text into complete sentences and remaining text.
     Uses pysbd for supported languages, falls back to regex for others.
 
     Args:
         text: Text to segment into sentences
+        language: Language of the text if already known, "" if it is known
+            to be unsupported, or None to detect it
 
     Returns:
         Tuple[List[str], str]: (list of complete sentences, remaining incomplete text)
@@ -223,11 +256,11 @@ def segment_text_by_pysbd(text: str) -> Tuple[List[str], str]:
 
     try:
         # Detect language
-        lang = detect_language(text)
+        lang = detect_language(text) if language is None else (language or None)
 
         if lang is not None:
             # Use pysbd for supported languages
-            segmenter = pysbd.Segmenter(language=lang, clean=False)
+            segmenter = get_segmenter(lang)
             sentences = segmenter.segment(text)
 
             if not sentences:
@@ -263,6 +296,51 @@ def segment_text_by_pysbd(text: str) -> Tuple[List[str], str]:
         return segment_text_by_regex(text)
 
 
+class _BufferCursor:
+    """
+    Incremental search for a pattern in a buffer that grows at the end and
+    is consumed from the front.
+
+    No complete match lies before ``clean``, so a search only looks at the
+    text appended since the previous one, plus the ``max_len - 1``
+    characters before it where a match may straddle the old end. The first
+    match is remembered until the text holding it is consumed.
+    """
+
+    def __init__(self, pattern: re.Pattern, max_len: int):
+        self.pattern = pattern
+        self.max_len = max_len
+        self.reset()
+
+    def reset(self):
+        self.clean = 0
+        self.match: Optional[re.Match] = None
+        self.shift = 0  # characters consumed since self.match was found
+
+    def search(self, buffer: str) -> Optional[Tuple[int, int, re.Match]]:
+        """
+        Returns:
+            (start, end, match) of the first match, or None. start and end are
+            positions in the current buffer; the match may be on an older one.
+        """
+        if self.match is None:
+            match = self.pattern.search(buffer, max(0, self.clean - self.max_len + 1))
+            if match is None:
+                self.clean = len(buffer)
+                return None
+            self.match, self.shift, self.clean = match, 0, match.start()
+        return self.match.start() - self.shift, self.match.end() - self.shift, self.match
+
+    def consume(self, n: int):
+        """The first ``n`` characters were removed from the buffer."""
+        self.clean = max(0, self.clean - n)
+        if self.match is not None:
+            if self.match.start() - self.shift < n:
+                self.match = None
+            else:
+                self.shift += n
+
+
 class TagState(Enum):
     """State of a tag in text"""
 
@@ -317,6 +395,36 @@ class SentenceDivider:
         self._buffer = ""
         # Replace active_tags dict with a stack to handle nesting
         self._tag_stack = []
+        # Language of the current stream once detected confidently, "" if unsupported
+        self._language: Optional[str] = None
+
+        # One alternation for every tag form: </tag>, or <tag> / <tag/>
+        names = "|".join(re.escape(tag) for tag in self.valid_tags)
+        self._tag_pattern = re.compile(f"</({names})>|<({names})(/?)>")
+        longest = max(map(len, self.valid_tags), default=0)
+        # The buffer is scanned incrementally as tokens arrive
+        self._tag_cursor = _BufferCursor(self._tag_pattern, longest + 3)
+        self._tag_prefix_cursor = _BufferCursor(re.compile(f"<(?:{names})"), longest + 1)
+        self._end_punctuation_cursor = _BufferCursor(_END_PUNCTUATION_CHAR, 1)
+        self._comma_cursor = _BufferCursor(_COMMA_CHAR, 1)
+        self._cursors = (
+            self._tag_cursor,
+            self._tag_prefix_cursor,
+            self._end_punctuation_cursor,
+            self._comma_cursor,
+        )
+
+    def _set_buffer(self, text: str):
+        """Replace the buffer, keeping the scan state when text was only
+        consumed from the front."""
+        old = self._buffer
+        self._buffer = text
+        if old.endswith(text):
+            for cursor in self._cursors:
+                cursor.consume(len(old) - len(text))
+        else:
+            for cursor in self._cursors:
+                cursor.reset()
 
     def _get_current_tags(self) -> List[TagInfo]:
         """
@@ -336,55 +444,35 @@ class SentenceDivider:
         """
         return self._tag_stack[-1] if self._tag_stack else None
 
-    def _extract_tag(self, text: str) -> Tuple[Optional[TagInfo], str]:
+    def _extract_tag(
+        self, text: str, found: Optional[Tuple[int, int, re.Match]] = None
+    ) -> Tuple[Optional[TagInfo], str]:
         """
         Extract the first tag from text if present.
         Handles nested tags by maintaining a tag stack.
 
         Args:
             text: Text to check for tags
+            found: The first tag in text as returned by _BufferCursor.search,
+                if already known
 
         Returns:
             Tuple of (TagInfo if tag found else None, remaining text)
         """
-        # Find the first occurrence of any tag
-        first_tag = None
-        first_pos = len(text)
-        tag_type = None
-        matched_tag = None
-
-        # Check for self-closing tags
-        for tag in self.valid_tags:
-            pattern = f"<{tag}/>"
-            match = re.search(pattern, text)
-            if match and match.start() < first_pos:
-                first_pos = match.start()
-                first_tag = match
-                tag_type = TagState.SELF_CLOSING
-                matched_tag = tag
-
-        # Check for opening tags
-        for tag in self.valid_tags:
-            pattern = f"<{tag}>"
-            match = re.search(pattern, text)
-            if match and match.start() < first_pos:
-                first_pos = match.start()
-                first_tag = match
-                tag_type = TagState.START
-                matched_tag = tag
-
-        # Check for closing tags
-        for tag in self.valid_tags:
-            pattern = f"</{tag}>"
-            match = re.search(pattern, text)
-            if match and match.start() < first_pos:
-                first_pos = match.start()
-                first_tag = match
-                tag_type = TagState.END
-                matched_tag = tag
-
-        if not first_tag:
-            return None, text
+        if found is None:
+            match = self._tag_pattern.search(text)
+            if not match:
+                return None, text
+            found = match.start(), match.end(), match
+        _, tag_end, match = found
+
+        closing_name, matched_tag, slash = match.groups()
+        if closing_name is not None:
+            matched_tag, tag_type = closing_name, TagState.END
+        elif slash:
+            tag_type = TagState.SELF_CLOSING
+        else:
+            tag_type = TagState.START
 
         # Handle the found tag
         if tag_type == TagState.START:
@@ -397,7 +485,7 @@ class SentenceDivider:
             else:
                 self._tag_stack.pop()
 
-        return (TagInfo(matched_tag, tag_type), text[first_tag.end() :].lstrip())
+        return (TagInfo(matched_tag, tag_type), text[tag_end:].lstrip())
 
     async def _process_buffer(self) -> List[SentenceWithTags]:
         """
@@ -411,17 +499,12 @@ class SentenceDivider:
 
         while self._buffer.strip():
             # Find the next tag position
-            next_tag_pos = len(self._buffer)
-            for tag in self.valid_tags:
-                patterns = [f"<{tag}>", f"</{tag}>", f"<{tag}/>"]
-                for pattern in patterns:
-                    pos = self._buffer.find(pattern)
-                    if pos != -1 and pos < next_tag_pos:
-                        next_tag_pos = pos
+            found = self._tag_cursor.search(self._buffer)
+            next_tag_pos = found[0] if found else len(self._buffer)
 
             if next_tag_pos == 0:
                 # Tag is at the start of buffer
-                tag_info, remaining = self._extract_tag(self._buffer)
+                tag_info, remaining = self._extract_tag(self._buffer, found)
                 if tag_info:
                     result.append(
                         SentenceWithTags(
@@ -431,7 +514,7 @@ class SentenceDivider:
                             tags=[tag_info],  # Tag itself is a single-item list
                         )
                     )
-                    self._buffer = remaining
+                    self._set_buffer(remaining)
                     continue
 
             elif next_tag_pos < len(self._buffer):
@@ -469,8 +552,10 @@ class SentenceDivider:
                     )
 
                 # Process the tag
-                self._buffer = self._buffer[next_tag_pos:]
-                tag_info, remaining = self._extract_tag(self._buffer)
+                self._set_buffer(self._buffer[next_tag_pos:])
+                tag_info, remaining = self._extract_tag(
+                    self._buffer, self._tag_cursor.search(self._buffer)
+                )
                 if tag_info:
                     result.append(
                         SentenceWithTags(
@@ -480,7 +565,7 @@ class SentenceDivider:
                             tags=[tag_info],
                         )
                     )
-                    self._buffer = remaining
+                    self._set_buffer(remaining)
                 continue
 
             # No tags found - process normal text
@@ -490,7 +575,7 @@ class SentenceDivider:
             if (
                 self._is_first_sentence
                 and self.faster_first_response
-                and contains_comma(self._buffer)
+                and self._comma_cursor.search(self._buffer)
             ):
                 sentence, remaining = comma_splitter(self._buffer)
                 if sentence.strip():
@@ -500,14 +585,14 @@ class SentenceDivider:
                             tags=current_tags or [TagInfo("", TagState.NONE)],
                         )
                     )
-                self._buffer = remaining
+                self._set_buffer(remaining)
                 self._is_first_sentence = False
                 continue
 
             # Process normal sentences
-            if contains_end_punctuation(self._buffer):
+            if self._end_punctuation_cursor.search(self._buffer):
                 sentences, remaining = self._segment_text(self._buffer)
-                self._buffer = remaining
+                self._set_buffer(remaining)
                 self._is_first_sentence = False
                 for sentence in sentences:
                     if sentence.strip():
@@ -532,6 +617,7 @@ class SentenceDivider:
             SentenceWithTags: Complete sentences with their tag information
         """
         self._full_response = []
+        self._language = None
         last_token_was_punct = False
         buffer_threshold = 25
 
@@ -548,7 +634,7 @@ class SentenceDivider:
             should_process = (
                 last_token_was_punct
                 or len(self._buffer) >= buffer_threshold
-                or any(f"<{tag}" in self._buffer for tag in self.valid_tags)
+                or self._tag_prefix_cursor.search(self._buffer) is not None
             )
 
             if should_process:
@@ -565,7 +651,7 @@ class SentenceDivider:
                     text=self._buffer[: len(self._buffer) - len(remaining)].strip(),
                     tags=[tag_info],
                 )
-                self._buffer = remaining
+                self._set_buffer(remaining)
 
             if self._buffer.strip():
                 sentences, remaining = self._segment_text(self._buffer)
@@ -592,10 +678,30 @@ class SentenceDivider:
         """Segment text using the configured method"""
         if self.segment_method == "regex":
             return segment_text_by_regex(text)
-        return segment_text_by_pysbd(text)
+        return segment_text_by_pysbd(text, self._stream_language(text))
+
+    def _stream_language(self, text: str) -> Optional[str]:
+        """
+        Language of the current stream, pinned after the first confident
+        detection so later calls skip language detection.
+
+        Returns:
+            The pinned language ("" if unsupported), or None if not pinned yet
+        """
+        if self._language is None and len(text.strip()) >= LANGUAGE_PIN_MIN_CHARS:
+            lang, confidence = detect_language_confidence(text)
+            if confidence >= LANGUAGE_PIN_CONFIDENCE:
+                self._language = lang or ""
+                logger.debug(f"Pinned stream language: {self._language or 'unsupported'}")
+            else:
+                return lang or ""
+        return self._language
 
     def reset(self):
         """Reset the divider state for a new conversation"""
         self._is_first_sentence = True
         self._buffer = ""
         self._tag_stack = []
+        self._language = None
+        for cursor in self._cursors:
+            cursor.reset()
@@ -0,0 +1,96 @@
+"""Measure the throughput of SentenceDivider.process_stream in tokens per second.
+
+Streams LLM-like replies token by token (words, spaces and punctuation as
+separate tokens, the way chat models emit them) through a fresh divider
+and reports tokens/second for each segment method and language.
+
+Usage:
+    python -m src.utils.sentence_divider_benchmark [--replies 20] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from loguru import logger
+
+from .sentence_divider import SentenceDivider
+
+SAMPLE_REPLIES = {
+    "en": (
+        "Sure, I can help with that. The quickest way is to restart the service first. "
+        "If that does not work, check the logs in the data directory! Dr. Smith wrote the "
+        "original guide, e.g. the section on caching. Does that answer your question? "
+        "Let me know if you need anything else."
+    ),
+    "zh": (
+        "好的，我来帮你看看。最快的办法是先重启服务。如果还是不行，请查看数据目录下的日志！"
+        "原来的文档是史密斯博士写的，其中有关于缓存的章节。这样能回答你的问题吗？"
+        "如果还需要别的帮助，请告诉我。"
+    ),
+    # long unpunctuated reasoning inside tags keeps a long buffer around
+    "think": (
+        "<think>the user wants to know how to restart the service so first I should "
+        "recall where the logs are kept and then explain the steps in order without "
+        "assuming they know the data directory layout or the caching section of the "
+        "guide</think> Restart the service first. Then check the logs!"
+    ),
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into word, whitespace, punctuation and single CJK character tokens."""
+    return re.findall(r"[A-Za-z]+|\s+|[一-鿿]|[^\sA-Za-z一-鿿]", text)
+
+
+async def _stream(tokens: list[str]):
+    for token in tokens:
+        yield token
+
+
+async def run_stream(tokens: list[str], segment_method: str) -> int:
+    divider = SentenceDivider(segment_method=segment_method)
+    sentences = 0
+    async for _ in divider.process_stream(_stream(tokens)):
+        sentences += 1
+    return sentences
+
+
+def bench(language: str, segment_method: str, replies: int, repeat: int) -> dict:
+    tokens = tokenize(" ".join([SAMPLE_REPLIES[language]] * replies))
+    sentences = asyncio.run(run_stream(tokens, segment_method))  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(run_stream(tokens, segment_method))
+        best = min(best, time.perf_counter() - start)
+    return {
+        "language": language,
+        "segment_method": segment_method,
+        "tokens": len(tokens),
+        "sentences": sentences,
+        "seconds": round(best, 4),
+        "tokens_per_second": round(len(tokens) / best),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replies", type=int, default=20, help="sample replies per stream")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs, the best is reported")
+    parser.add_argument("--methods", nargs="+", default=["pysbd", "regex"])
+    args = parser.parse_args()
+
+    logger.remove()  # per-sentence debug logging would dominate the timing
+    results = [
+        bench(language, method, args.replies, args.repeat)
+        for method in args.methods
+        for language in SAMPLE_REPLIES
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
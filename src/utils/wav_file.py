@@ -0,0 +1,145 @@
+"""Memory-mapped access to PCM WAV files.
+
+The sample data is mapped instead of read, so a file of any length can be
+processed window by window while only the window being worked on is
+resident: windows() drops the pages it has moved past from the mapping, so
+they stop counting towards the process's resident memory.
+
+Supports RIFF and RF64 files with 8/16/24/32-bit integer or 32/64-bit float
+samples, including WAVE_FORMAT_EXTENSIBLE headers.
+"""
+
+import mmap
+import struct
+from typing import Iterator
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_PCM_DTYPES = {8: np.uint8, 16: np.int16, 32: np.int32}
+_FLOAT_DTYPES = {32: np.float32, 64: np.float64}
+
+
+class WavFile:
+    """A WAV file whose samples are exposed as a read-only memory map."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            header = self._parse(f)
+        self.format_tag, self.channels, self.sample_rate, self.bits_per_sample, offset, size = header
+
+        width = self.bits_per_sample // 8
+        self._frame_bytes = width * self.channels
+        self.num_frames = size // self._frame_bytes
+        # np.memmap maps from the allocation boundary at or before the data
+        self._map_start = offset % mmap.ALLOCATIONGRANULARITY
+        self._released = 0
+        if self.bits_per_sample == 24:
+            # no 24-bit dtype: map the bytes and widen each window on read
+            dtype, shape = np.uint8, (self.num_frames, self.channels * 3)
+        elif self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            dtype, shape = _FLOAT_DTYPES[self.bits_per_sample], (self.num_frames, self.channels)
+        else:
+            dtype, shape = _PCM_DTYPES[self.bits_per_sample], (self.num_frames, self.channels)
+        self._data = (
+            np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+            if self.num_frames
+            else np.zeros(shape, dtype=dtype)
+        )
+
+    @property
+    def duration(self) -> float:
+        return self.num_frames / self.sample_rate
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Frames [start, stop) as ``(frames, channels)`` samples in the file's dtype
+        (int32 for 24-bit files, scaled to the full int32 range)."""
+        frames = self._data[start:stop]
+        if self.bits_per_sample != 24:
+            return frames
+        widened = np.zeros((len(frames), self.channels, 4), dtype=np.uint8)
+        widened[:, :, 1:] = frames.reshape(len(frames), self.channels, 3)
+        return widened.view("<i4").reshape(len(frames), self.channels)
+
+    def windows(self, window_frames: int) -> Iterator[np.ndarray]:
+        """Yield consecutive windows of at most ``window_frames`` frames.
+
+        Pages before each window are released when it is read, so earlier
+        windows should be copied (as any conversion to float does) if they
+        are kept around.
+        """
+        for start in range(0, self.num_frames, window_frames):
+            self.release(start)
+            yield self.read(start, start + window_frames)
+        self.release(self.num_frames)
+
+    def release(self, frame: int) -> None:
+        """Drop the mapped pages before ``frame`` from the resident set. They
+        are read back from the page cache if accessed again."""
+        mapping = getattr(self._data, "_mmap", None)
+        if mapping is None or not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        end = self._map_start + frame * self._frame_bytes
+        end -= end % mmap.PAGESIZE
+        if end > self._released:
+            mapping.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+            self._released = end
+
+    def close(self) -> None:
+        """Drop the mapping; it is unmapped once no window read from it is alive."""
+        self._data = np.zeros((0,) + self._data.shape[1:], dtype=self._data.dtype)
+
+    def __enter__(self) -> "WavFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _parse(self, f) -> tuple[int, int, int, int, int, int]:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff not in (b"RIFF", b"RF64") or wave != b"WAVE":
+            raise ValueError(f"{self.path} is not a WAV file")
+
+        fmt = None
+        data_size_64 = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"{self.path} has no data chunk")
+            chunk_id, size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"ds64":
+                body = f.read(size)
+                data_size_64 = struct.unpack("<Q", body[8:16])[0]
+            elif chunk_id == b"fmt ":
+                body = f.read(size)
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if fmt[0] == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    # the sub-format GUID starts with the actual format tag
+                    fmt = (struct.unpack("<H", body[24:26])[0],) + fmt[1:]
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{self.path} has no fmt chunk before its data")
+                offset = f.tell()
+                f.seek(0, 2)
+                available = f.tell() - offset
+                if data_size_64 is not None and size == 0xFFFFFFFF:
+                    size = data_size_64
+                # writers that stream to disk leave the size at 0 or 0xFFFFFFFF
+                size = available if size in (0, 0xFFFFFFFF) else min(size, available)
+                format_tag, channels, sample_rate, _, _, bits = fmt
+                supported = (
+                    format_tag == WAVE_FORMAT_PCM and bits in (8, 16, 24, 32)
+                ) or (format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in _FLOAT_DTYPES)
+                if not supported or channels < 1:
+                    raise ValueError(
+                        f"Unsupported WAV format {format_tag:#x} with {bits}-bit samples in {self.path}"
+                    )
+                return format_tag, channels, sample_rate, bits, offset, size
+            else:
+                f.seek(size, 1)
+            if size % 2:
+                f.seek(1, 1)  # chunks are word aligned
@@ -0,0 +1,82 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+from loguru import logger
+
+from .. import metrics
+from ..utils.micro_batch import BatchRequest, MicroBatchScheduler
+
+_TICK_SECONDS = metrics.VAD_TICK_SECONDS.labels()
+_TICK_WINDOWS = metrics.VAD_TICK_WINDOWS.labels()
+
+
+@dataclass
+class TickStats:
+    """Counters describing the batched forward passes (ticks) of the scheduler."""
+
+    windows: int = 0
+    ticks: int = 0
+    failed_ticks: int = 0
+    max_batch_size: int = 0
+    compute_total: float = 0.0  # seconds
+    # latency of recent ticks: oldest window's enqueue to results delivered
+    latencies: deque = field(default_factory=lambda: deque(maxlen=10000))
+
+    def record_tick(self, size: int, latency: float, compute: float) -> None:
+        self.windows += size
+        self.ticks += 1
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.compute_total += compute
+        self.latencies.append(latency)
+
+    def as_dict(self) -> dict:
+        latencies = np.asarray(self.latencies) * 1000
+        return {
+            "windows": self.windows,
+            "ticks": self.ticks,
+            "failed_ticks": self.failed_ticks,
+            "mean_batch_size": self.windows / self.ticks if self.ticks else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "mean_compute_ms": 1000 * self.compute_total / self.ticks if self.ticks else 0.0,
+            "p50_tick_latency_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p95_tick_latency_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            "max_tick_latency_ms": float(latencies.max()) if len(latencies) else 0.0,
+        }
+
+
+class VADBatchScheduler(MicroBatchScheduler):
+    """Runs the pending VAD windows of many live sessions as one forward pass.
+
+    Every session waits for the probability of its current window before it
+    submits the next one, so a tick holds at most one window per session.
+    A tick starts once the oldest pending window has waited ``max_wait_ms``
+    or ``max_batch_size`` windows are pending; the engine stacks the
+    sessions' recurrent states, runs the model once in a worker thread and
+    writes each session's new state back.
+    """
+
+    def __init__(self, engine, max_batch_size: int = 256, max_wait_ms: float = 10.0) -> None:
+        # ticks run one at a time; windows submitted meanwhile form the next one
+        super().__init__(max_batch_size, max_wait_ms, max_concurrent_batches=1)
+        self.engine = engine
+        self.stats = TickStats()
+
+    async def speech_prob(self, session, chunk_np: np.ndarray) -> float:
+        """Queue one window of a session and wait for its speech probability."""
+        return await self._submit((session, chunk_np))
+
+    def run_batch(self, items: list) -> list:
+        sessions, chunks = zip(*items)
+        return self.engine.speech_probs_batch(list(sessions), list(chunks)).tolist()
+
+    def on_batch_failed(self, batch: List[BatchRequest], error: Exception) -> None:
+        self.stats.failed_ticks += 1
+        logger.error(f"Batched VAD tick failed: {error}")
+
+    def on_batch_done(self, batch: List[BatchRequest], started: float, finished: float) -> None:
+        latency = finished - batch[0].enqueued_at
+        self.stats.record_tick(len(batch), latency, finished - started)
+        _TICK_SECONDS.observe(latency)
+        _TICK_WINDOWS.inc(len(batch))
@@ -0,0 +1,113 @@
+"""Measure the CPU cost of many concurrent live VAD streams, with and without
+cross-session batching.
+
+Every simulated stream sends one 32 ms frame at a time, paced in real time
+as a client would, and awaits feed_async() the way the WebSocket server
+does. Streams start at staggered offsets into a synthetic recording so
+their speech and pauses do not line up. The report gives the CPU seconds
+spent per second of stream audio and, for the batched run, the size and
+latency of the scheduler's ticks.
+
+Usage:
+    python -m src.vad.batching_benchmark --streams 200 --seconds 20
+    python -m src.vad.batching_benchmark --engine silero_vad --pregate
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+from loguru import logger
+
+from ..utils.reference_audio import synthetic_speech
+from .streaming import SileroVADConfig
+from .vad_factory import VADFactory
+from .vad_interface import SpeechSegment
+
+FRAME_SAMPLES = 512  # 32 ms at 16 kHz
+
+
+async def _stream(engine, audio: np.ndarray, start_delay: float) -> list[tuple[int, int]]:
+    await asyncio.sleep(start_delay)
+    session = engine.open_session()
+    boundaries = []
+    began = time.perf_counter()
+    for i, start in enumerate(range(0, len(audio), FRAME_SAMPLES)):
+        # wait for the frame to have "arrived"
+        delay = began + i * FRAME_SAMPLES / 16000 - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        events = await session.feed_async(audio[start : start + FRAME_SAMPLES])
+        boundaries += [(e.start, e.end) for e in events if isinstance(e, SpeechSegment)]
+    boundaries += [(e.start, e.end) for e in session.flush() if isinstance(e, SpeechSegment)]
+    engine.close_session(session)
+    return boundaries
+
+
+async def _run_streams(engine, recordings: list[np.ndarray]) -> list[list[tuple[int, int]]]:
+    frame_seconds = FRAME_SAMPLES / 16000
+    return await asyncio.gather(
+        *(
+            _stream(engine, audio, frame_seconds * i / len(recordings))
+            for i, audio in enumerate(recordings)
+        )
+    )
+
+
+def bench(engine, recordings: list[np.ndarray]) -> tuple[dict, list]:
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    results = asyncio.run(_run_streams(engine, recordings))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    stream_seconds = sum(len(audio) for audio in recordings) / 16000
+    return {
+        "wall_seconds": round(wall, 2),
+        "cpu_seconds": round(cpu, 2),
+        "cpu_ms_per_stream_second": round(1000 * cpu / stream_seconds, 3),
+        "streams_per_core": round(stream_seconds / cpu, 1) if cpu else None,
+    }, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=200, help="concurrent live streams")
+    parser.add_argument("--seconds", type=float, default=20, help="audio per stream")
+    parser.add_argument("--engine", default="silero_vad_onnx", help="silero_vad or silero_vad_onnx")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--pregate", action="store_true", help="skip the model on silent windows")
+    args = parser.parse_args()
+
+    logger.remove()  # keep per-session logging out of the timing
+    source = synthetic_speech(args.seconds * 4)
+    length = int(args.seconds * 16000)
+    rng = np.random.default_rng(0)
+    recordings = [
+        source[offset : offset + length]
+        for offset in rng.integers(0, len(source) - length, args.streams)
+    ]
+
+    report = {"engine": args.engine, "streams": args.streams, "seconds_per_stream": args.seconds}
+    results = {}
+    for name, batching in (("unbatched", False), ("batched", True)):
+        settings = SileroVADConfig(
+            pregate=args.pregate, session_pool_size=args.streams
+        ).model_dump()
+        engine = VADFactory.get_vad_engine(args.engine, **settings)
+        if batching:
+            engine.enable_batching(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+        report[name], results[name] = bench(engine, recordings)
+        if batching:
+            report[name]["ticks"] = engine.batch_stats()
+        report[name]["pregate"] = engine.pregate_stats()
+
+    report["identical_segments"] = results["unbatched"] == results["batched"]
+    report["cpu_reduction"] = round(
+        report["unbatched"]["cpu_seconds"] / report["batched"]["cpu_seconds"], 2
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
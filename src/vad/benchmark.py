@@ -0,0 +1,92 @@
+"""Compare the per-window and batched Silero VAD paths on the same recording.
+
+With ``--pregate`` the energy/ZCR pre-gate is switched on; the report then
+shows the share of model calls it saved and whether its segments match an
+ungated run on the same audio.
+
+Usage:
+    python -m src.vad.benchmark --minutes 10
+    python -m src.vad.benchmark --file path/to/16k_mono.wav
+    python -m src.vad.benchmark --file path/to/16k_mono.wav --pregate
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+from loguru import logger
+
+from ..utils.reference_audio import load_wav, synthetic_speech
+from .silero import VADEngine
+from .vad_interface import SpeechSegment
+
+
+def _boundaries(results) -> list[tuple[int, int]]:
+    return [(r.start, r.end) for r in results if isinstance(r, SpeechSegment)]
+
+
+def run_streaming(engine: VADEngine, audio: np.ndarray) -> list[tuple[int, int]]:
+    return _boundaries(engine.detect_speech(audio))
+
+
+def run_batched(engine: VADEngine, audio: np.ndarray) -> list[tuple[int, int]]:
+    return _boundaries(engine.detect_speech_offline(audio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10, help="length of synthetic audio")
+    parser.add_argument("--file", help="16 kHz WAV file to use instead of synthetic audio")
+    parser.add_argument("--batch-windows", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--pregate", action="store_true", help="skip the model on silent windows")
+    args = parser.parse_args()
+
+    if args.file:
+        audio, sample_rate = load_wav(args.file)
+        if sample_rate != 16000:
+            raise ValueError("The benchmark expects 16 kHz audio")
+    else:
+        audio = synthetic_speech(args.minutes * 60)
+    seconds = len(audio) / 16000
+
+    engine = VADEngine(offline_batch_windows=args.batch_windows, pregate=args.pregate)
+    # warm up both paths
+    run_streaming(engine, audio[: 16000 * 5])
+    run_batched(engine, audio[: 16000 * 5])
+
+    timings = {}
+    results = {}
+    for name, fn in (("per_window", run_streaming), ("batched", run_batched)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[name] = fn(engine, audio)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    report = {
+        "audio_seconds": round(seconds, 2),
+        "segments": len(results["batched"]),
+        "identical_segments": results["per_window"] == results["batched"],
+        "batch_windows": args.batch_windows,
+    }
+    for name, elapsed in timings.items():
+        report[name] = {
+            "wall_seconds": round(elapsed, 3),
+            "wall_seconds_per_audio_hour": round(elapsed * 3600 / seconds, 2),
+            "rtf": round(elapsed / seconds, 5),
+        }
+    report["speedup"] = round(timings["per_window"] / timings["batched"], 2)
+    if args.pregate:
+        ungated = run_batched(VADEngine(offline_batch_windows=args.batch_windows), audio)
+        report["pregate"] = engine.pregate_stats()
+        report["pregate"]["ungated_segments"] = len(ungated)
+        report["pregate"]["identical_to_ungated"] = results["batched"] == ungated
+
+    logger.info(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
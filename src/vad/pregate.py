@@ -0,0 +1,117 @@
+"""Energy and zero-crossing-rate pre-gate in front of the VAD model.
+
+Long stretches of dead air do not need a neural model to be recognised as
+silence. The pre-gate measures the level and zero-crossing rate of every
+window of a buffer in one vectorised pass and marks the windows that are
+clearly silent, so the engine can skip the model for them. Only windows
+well below the state machine's own db_threshold count as quiet, and a
+quiet window with many zero crossings (which may be a soft fricative
+rather than hum or silence) has to be quieter still.
+
+The model's recurrent state is left as it is over skipped windows; only
+its audio context follows the audio. The first few quiet windows of every
+pause still go to the model (the hangover), so that state has already
+settled into silence when it is frozen, and the model picks up from there
+when sound returns.
+
+The gate is not transparent. A skipped window gets GATED_SPEECH_PROB
+rather than what the model would have said, so a short pause in low-level
+noise can end a segment that the ungated model would have carried across.
+It is therefore off by default; compare its segments with an ungated run
+on representative audio (``python -m src.vad.benchmark --pregate``)
+before enabling it.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .. import metrics
+
+_GATED = metrics.VAD_GATED_WINDOWS.labels()
+
+# probability given to a gated window: about what Silero outputs on silence,
+# and nonzero so the window still reaches the state machine
+GATED_SPEECH_PROB = 0.001
+# windows measured per step, bounds the temporary arrays on long recordings
+BLOCK_WINDOWS = 4096
+
+
+@dataclass
+class PreGateStats:
+    """Counters describing how many model calls the pre-gate has saved."""
+
+    windows: int = 0
+    gated: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "windows": self.windows,
+            "gated": self.gated,
+            "model_calls_saved": self.gated / self.windows if self.windows else 0.0,
+        }
+
+
+class PreGate:
+    """Marks the windows of a buffer that are clearly silent.
+
+    Args:
+        window_size: Samples per VAD window.
+        db_threshold: The state machine's level threshold, in dB on the
+            16-bit PCM scale.
+        db_margin: Windows at least this many dB below db_threshold are quiet.
+        max_zcr: Quiet windows with a higher zero-crossing rate (crossings
+            per sample) only count as quiet if they are another db_margin quieter.
+        hangover: Quiet windows at the start of a pause that still go to the model.
+    """
+
+    def __init__(
+        self, window_size: int, db_threshold: float, db_margin: float, max_zcr: float, hangover: int
+    ):
+        self.window_size = window_size
+        self.quiet_db = db_threshold - db_margin
+        self.noisy_quiet_db = db_threshold - 2 * db_margin
+        self.max_zcr = max_zcr
+        self.hangover = hangover
+        self.stats = PreGateStats()
+
+    def silent_windows(self, audio_np: np.ndarray, quiet_before: int = 0) -> tuple[np.ndarray, int]:
+        """Find the windows the model can be skipped for.
+
+        Args:
+            audio_np: Audio at the model rate; only full windows are measured.
+            quiet_before: Consecutive quiet windows just before ``audio_np``,
+                as returned by the previous call on the same stream.
+
+        Returns:
+            A bool per full window, True where the model can be skipped, and
+            the number of consecutive quiet windows at the end of the audio.
+        """
+        w = self.window_size
+        num_windows = len(audio_np) // w
+        quiet = np.empty(num_windows, dtype=bool)
+        for start in range(0, num_windows, BLOCK_WINDOWS):
+            stop = min(num_windows, start + BLOCK_WINDOWS)
+            frames = audio_np[start * w : stop * w].reshape(-1, w)
+            # same scale as StateMachine.chunk_db
+            rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / w) * 32767
+            db = 20 * np.log10(rms + 1e-7)
+            signs = np.signbit(frames)
+            zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (w - 1)
+            quiet[start:stop] = (db < self.noisy_quiet_db) | (
+                (db < self.quiet_db) & (zcr <= self.max_zcr)
+            )
+        if num_windows == 0:
+            return quiet, quiet_before
+
+        # length of the quiet run each window ends, counting the run carried in
+        index = np.arange(num_windows)
+        last_loud = np.maximum.accumulate(np.where(quiet, -1 - quiet_before, index))
+        run = index - last_loud
+        silent = run > self.hangover
+
+        gated = int(np.count_nonzero(silent))
+        self.stats.windows += num_windows
+        self.stats.gated += gated
+        _GATED.inc(gated)
+        return silent, int(run[-1])
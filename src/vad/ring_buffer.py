@@ -0,0 +1,59 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated float32 ring buffer addressed by absolute sample offsets.
+
+    Every sample is stored twice, at ``i % capacity`` and ``i % capacity +
+    capacity``, so any span of at most ``capacity`` samples can be returned
+    as one contiguous view without copying. The buffer grows (keeping the
+    retained samples) when a write would overwrite samples the caller still
+    needs.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._data = np.zeros(2 * self.capacity, dtype=np.float32)
+        self.end = 0  # absolute offset one past the last written sample
+
+    def clear(self) -> None:
+        self.end = 0
+
+    def write(self, audio: np.ndarray, keep_from: int | None = None) -> None:
+        """Append samples. Samples at offsets >= keep_from are preserved."""
+        n = len(audio)
+        if n == 0:
+            return
+        if keep_from is None:
+            keep_from = self.end
+        needed = self.end + n - min(keep_from, self.end)
+        if needed > self.capacity:
+            self._grow(needed, min(keep_from, self.end))
+
+        start = self.end % self.capacity
+        first = min(n, self.capacity - start)
+        for base in (0, self.capacity):
+            self._data[base + start : base + start + first] = audio[:first]
+            self._data[base : base + n - first] = audio[first:]
+        self.end += n
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Return a contiguous view of the samples at offsets [start, end)."""
+        if end - start > self.capacity or start < self.end - self.capacity or end > self.end:
+            raise IndexError(
+                f"Samples [{start}, {end}) are not held in the buffer "
+                f"(holding [{max(0, self.end - self.capacity)}, {self.end}))"
+            )
+        index = start % self.capacity
+        return self._data[index : index + end - start]
+
+    def _grow(self, needed: int, keep_from: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        retained = self.view(keep_from, self.end).copy()
+
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self.end = keep_from
+        self.write(retained)
@@ -1,27 +1,25 @@
-import asyncio
-from collections import deque
-from enum import Enum
-
 import numpy as np
 import torch
 from loguru import logger
-from pydantic import BaseModel
 from silero_vad import load_silero_vad
 
-from .vad_interface import VADInterface
+from .. import metrics
+from .pregate import GATED_SPEECH_PROB
+from .streaming import (  # noqa: F401 - re-exported for existing imports
+    SileroVADConfig,
+    State,
+    StateMachine,
+    StreamingVADEngine,
+    VADSession,
+)
 
 
-class SileroVADConfig(BaseModel):
-    orig_sr: int = 16000
-    target_sr: int = 16000
-    prob_threshold: float = 0.4
-    db_threshold: int = 60
-    required_hits: int = 3  # 3 * (0.032) = 0.1s
-    required_misses: int = 24  # 24 * (0.032) = 0.8s
-    smoothing_window: int = 5
+_WINDOW_PROB_CALLS = metrics.VAD_PROB_CALLS.labels("window")
+_BATCHED_PROB_CALLS = metrics.VAD_PROB_CALLS.labels("batched")
+_SESSION_BATCH_PROB_CALLS = metrics.VAD_PROB_CALLS.labels("session_batch")
 
 
-class VADEngine(VADInterface):
+class VADEngine(StreamingVADEngine):
     def __init__(
         self,
         orig_sr: int = 16000,
@@ -31,8 +29,15 @@ class VADEngine(VADInterface):
         required_hits: int = 3,
         required_misses: int = 24,
         smoothing_window: int = 5,
+        offline_batch_windows: int = 1024,
+        session_pool_size: int = 64,
+        ring_buffer_seconds: float = 10.0,
+        pregate: bool = False,
+        pregate_db_margin: float = 10.0,
+        pregate_max_zcr: float = 0.25,
+        pregate_hangover: int = 8,
     ):
-        self.config = SileroVADConfig(
+        super().__init__(SileroVADConfig(
             orig_sr=orig_sr,
             target_sr=target_sr,
             prob_threshold=prob_threshold,
@@ -40,188 +45,154 @@ class VADEngine(VADInterface):
             required_hits=required_hits,
             required_misses=required_misses,
             smoothing_window=smoothing_window,
-        )
+            offline_batch_windows=offline_batch_windows,
+            session_pool_size=session_pool_size,
+            ring_buffer_seconds=ring_buffer_seconds,
+            pregate=pregate,
+            pregate_db_margin=pregate_db_margin,
+            pregate_max_zcr=pregate_max_zcr,
+            pregate_hangover=pregate_hangover,
+        ))
         self.model = self.load_vad_model()
-        self.state = StateMachine(self.config)
-        self.window_size_samples = 512 if self.config.target_sr == 16000 else 256
-        # 512 / 16000 = 0.032s
+
+        # The wrapper returned by load_silero_vad keeps its recurrent state on
+        # the module itself, so sessions call the underlying network directly
+        # and carry their own state instead.
+        self.net = self.model._model if self.config.target_sr == 16000 else self.model._model_8k
+        self.context_size = self.net.context_size_samples
+        self._batched_model: BatchedSileroModel | None = None
 
     def load_vad_model(self):
         logger.info("Loading Silero-VAD model...")
         return load_silero_vad()
 
-    def detect_speech(self, audio_data: list[float]):
-        audio_np = np.array(audio_data, dtype=np.float32)
-        for i in range(0, len(audio_np), self.window_size_samples):
-            chunk_np = audio_np[i : i + self.window_size_samples]
-            if len(chunk_np) < self.window_size_samples:
-                break
-            chunk = torch.Tensor(chunk_np)
-
-            with torch.no_grad():
-                speech_prob = self.model(chunk, self.config.target_sr).item()
-
-            if speech_prob:
-                # print(speech_prob)
-                iter = self.state.get_result(speech_prob, chunk_np)
-
-                for probs, dbs, chunk in iter:  # detected a sequence of voice bytes
-                    # rounded_probs = [round(x, 2) for x in probs]
-                    # rounded_dbs = [round(y, 2) for y in dbs]
-
-                    audio_chunk = bytes(chunk)
-                    yield audio_chunk
-
-        del audio_np
-
-
-# Define state enumeration
-class State(Enum):
-    IDLE = 1  # Idle state, waiting for speech
-    ACTIVE = 2  # Speech detection state
-    INACTIVE = 3  # Speech end state (silence state)
-
-
-class StateMachine:
-    def __init__(self, config: SileroVADConfig):
-        self.state = State.IDLE
-        self.prob_threshold = config.prob_threshold
-        self.db_threshold = config.db_threshold
-        self.required_hits = config.required_hits
-        self.required_misses = config.required_misses
-        self.smoothing_window = config.smoothing_window
-
-        self.probs = []
-        self.dbs = []
-        self.bytes = bytearray()
-        self.miss_count = 0
-        self.hit_count = 0
-
-        self.prob_window = deque(maxlen=self.smoothing_window)
-        self.db_window = deque(maxlen=self.smoothing_window)
-
-        self.pre_buffer = deque(maxlen=20)
-
-    @classmethod
-    def calculate_db(cls, audio_data: np.ndarray) -> float:
-        rms = np.sqrt(np.mean(np.square(audio_data)))
-        return 20 * np.log10(rms + 1e-7) if rms > 0 else -np.inf
-
-    def update(self, chunk_bytes, prob, db):
-        self.probs.append(prob)
-        self.dbs.append(db)
-        self.bytes.extend(chunk_bytes)
-
-    def reset_buffers(self):
-        self.probs.clear()
-        self.dbs.clear()
-        self.bytes.clear()
-
-    def get_smoothed_values(self, prob, db):
-        self.prob_window.append(prob)
-        self.db_window.append(db)
-        smoothed_prob = np.mean(self.prob_window)
-        smoothed_db = np.mean(self.db_window)
-        return smoothed_prob, smoothed_db
-
-    def process(self, prob, float_chunk_np: np.ndarray):
-        int_chunk_np = float_chunk_np * 32767
-        chunk_bytes = int_chunk_np.astype(np.int16).tobytes()
-        db = self.calculate_db(int_chunk_np)
-
-        # 获取平滑后的 prob 和 db
-        smoothed_prob, smoothed_db = self.get_smoothed_values(prob, db)
-
-        if self.state == State.IDLE:
-            self.pre_buffer.append(chunk_bytes)
-            if (
-                smoothed_prob >= self.prob_threshold
-                and smoothed_db >= self.db_threshold
-            ):
-                self.hit_count += 1
-                if self.hit_count >= self.required_hits:
-                    self.state = State.ACTIVE
-                    self.update(chunk_bytes, smoothed_prob, smoothed_db)
-                    self.hit_count = 0
-                    yield [], [], b"<|PAUSE|>"
-            else:
-                self.hit_count = 0
-
-        elif self.state == State.ACTIVE:
-            self.update(chunk_bytes, smoothed_prob, smoothed_db)
-            if (
-                smoothed_prob >= self.prob_threshold
-                and smoothed_db >= self.db_threshold
-            ):
-                self.miss_count = 0
-            else:
-                self.miss_count += 1
-                if self.miss_count >= self.required_misses:
-                    self.state = State.INACTIVE
-                    self.miss_count = 0
-
-        elif self.state == State.INACTIVE:
-            self.update(chunk_bytes, smoothed_prob, smoothed_db)
-            if (
-                smoothed_prob >= self.prob_threshold
-                and smoothed_db >= self.db_threshold
-            ):
-                self.hit_count += 1
-                if self.hit_count >= self.required_hits:
-                    self.state = State.ACTIVE
-                    self.hit_count = 0
-                    self.miss_count = 0
-            else:
-                self.hit_count = 0
-                self.miss_count += 1
-                if self.miss_count >= self.required_misses:
-                    self.state = State.IDLE
-                    self.miss_count = 0
-                    yield [], [], b"<|RESUME|>"
-                    if len(self.probs) > 30:
-                        pre_bytes = b"".join(self.pre_buffer)
-                        yield self.probs, self.dbs, pre_bytes + self.bytes
-                        self.reset_buffers()
-                    self.pre_buffer.clear()
-
-    def get_result(self, input_num, chunk_np):
-        yield from self.process(input_num, chunk_np)
-
-
-async def vad_main():
-    global vad, audio_queue
-    vad = VADEngine(config=SileroVADConfig())
-    audio_queue = asyncio.Queue()
-    from tqdm.asyncio import tqdm
-
-    async def data_wrapper(websocket):
-        async for chunk in websocket:
-            yield chunk
-
-    async def audio_handler(websocket):
-        async for chunk in tqdm(data_wrapper(websocket), desc="Audio chunk"):
-            # print(len(chunk))
-            for _bytes in vad.detect_speech(chunk):
-                print(_bytes[:44])
-                # await audio_queue.put(_bytes)
-                pass
-
-    async def empty_run():
-        while True:
-            await asyncio.sleep(0.1)
-
-    async def start_websocket_server():
-        import websockets
-
-        host = "localhost"
-        port = 8765
-        start_server = websockets.serve(audio_handler, host, port)
-        logger.info(f"WebSocket server started at ws://{host}:{port}")
-        await start_server  # run forever until the task is cancelled
-
-    await asyncio.gather(start_websocket_server(), empty_run())
-    # await start_playback(audio_queue, sr=vad.config.target_sr)
-
-
-if __name__ == "__main__":
-    asyncio.run(vad_main())
+    def initial_model_state(self):
+        """Audio context and LSTM state of a fresh session."""
+        return torch.zeros(1, self.context_size), torch.zeros(0)
+
+    def speech_prob(self, session: "VADSession", chunk_np: np.ndarray) -> float:
+        """Run the model on one window, advancing the session's recurrent state."""
+        context, rnn_state = session.model_state
+        x = torch.cat([context, torch.from_numpy(chunk_np).unsqueeze(0)], dim=1)
+        with torch.no_grad():
+            out, rnn_state = self.net(x, rnn_state)
+        session.model_state = (x[:, -self.context_size :], rnn_state)
+        _WINDOW_PROB_CALLS.inc()
+        return out.item()
+
+    def speech_probs_batch(self, sessions: list["VADSession"], chunks: list[np.ndarray]) -> np.ndarray:
+        """One model call for a window of every session, with their states stacked."""
+        contexts, rnn_states = zip(*(session.model_state for session in sessions))
+        # a fresh session has no LSTM state yet
+        rnn_states = [
+            state if len(state) else torch.zeros(2, 1, self.net.decoder.rnn.hidden_size)
+            for state in rnn_states
+        ]
+        x = torch.cat([torch.cat(contexts), torch.from_numpy(np.stack(chunks))], dim=1)
+        with torch.no_grad():
+            out, rnn_state = self.net(x, torch.cat(rnn_states, dim=1))
+        for i, session in enumerate(sessions):
+            session.model_state = (x[i : i + 1, -self.context_size :], rnn_state[:, i : i + 1])
+        _SESSION_BATCH_PROB_CALLS.inc()
+        return out[:, 0].numpy()
+
+    def skip_window(self, session: "VADSession", chunk_np: np.ndarray) -> None:
+        """Keep the window's tail as audio context; the LSTM state carries over."""
+        context = torch.from_numpy(chunk_np[-self.context_size :].copy()).unsqueeze(0)
+        session.model_state = (context, session.model_state[1])
+
+    def session_speech_probs(self, session: "VADSession", audio_np: np.ndarray) -> np.ndarray:
+        """Batched model calls when the model allows it, window by window otherwise."""
+        if self._batched_model is None:
+            try:
+                self._batched_model = BatchedSileroModel(self.model, self.config.target_sr)
+            except AttributeError as e:
+                logger.warning(
+                    f"Batched Silero inference unavailable for this model ({e}); "
+                    "falling back to per-window inference."
+                )
+                self._batched_model = False
+
+        if self._batched_model:
+            probs, session.model_state = self._batched_model.speech_probs(
+                audio_np, self.config.offline_batch_windows, skip=session.gate(audio_np),
+                state=session.model_state,
+            )
+            return probs
+        return super().session_speech_probs(session, audio_np)
+
+
+class BatchedSileroModel:
+    """Runs the Silero network over many consecutive windows per call.
+
+    The Silero JIT model is stateless apart from its LSTM cell and a short
+    audio context taken from the previous window. The STFT and the
+    convolutional encoder therefore run on a whole block of windows at once
+    (each window framed with its own context), and the LSTM cell weights are
+    loaded into a torch.nn.LSTM so the recurrent state is carried across the
+    block in a single call. Probabilities match the per-window path up to
+    float rounding.
+
+    Windows marked in ``skip`` are left out of the sequence the LSTM sees,
+    which is what skipping them in the per-window path amounts to: each
+    remaining window is still framed with the audio just before it.
+
+    The model state is passed in and returned in the form VADEngine
+    sessions hold it, the audio context and the stacked LSTM ``(h, c)``, so
+    a recording can be processed in consecutive blocks.
+    """
+
+    def __init__(self, model, sample_rate: int = 16000):
+        self.net = model._model if sample_rate == 16000 else model._model_8k
+        self.window_size = 512 if sample_rate == 16000 else 256
+        self.context_size = self.net.context_size_samples
+
+        cell = self.net.decoder.rnn
+        self.lstm = torch.nn.LSTM(cell.weight_ih.shape[1], cell.weight_hh.shape[1])
+        with torch.no_grad():
+            self.lstm.weight_ih_l0.copy_(cell.weight_ih)
+            self.lstm.weight_hh_l0.copy_(cell.weight_hh)
+            self.lstm.bias_ih_l0.copy_(cell.bias_ih)
+            self.lstm.bias_hh_l0.copy_(cell.bias_hh)
+        self.lstm.eval()
+
+    def speech_probs(
+        self,
+        audio_np: np.ndarray,
+        batch_windows: int = 1024,
+        skip: np.ndarray | None = None,
+        state: tuple | None = None,
+    ) -> tuple[np.ndarray, tuple]:
+        """Speech probability of every full window of ``audio_np``, starting
+        from ``state`` (a fresh state if None), and the state after them."""
+        num_windows = len(audio_np) // self.window_size
+        probs = np.full(num_windows, GATED_SPEECH_PROB, dtype=np.float32)
+        if state is None:
+            state = (torch.zeros(1, self.context_size), torch.zeros(0))
+        context, rnn_state = state
+        if num_windows == 0:
+            return probs, (context, rnn_state)
+
+        # Every window is framed with the preceding context, zeros for the first one
+        padded = torch.cat(
+            [
+                context[0],
+                torch.from_numpy(np.ascontiguousarray(audio_np[: num_windows * self.window_size])),
+            ]
+        )
+        frames = padded.unfold(0, self.window_size + self.context_size, self.window_size)
+        kept = np.arange(num_windows) if skip is None else np.flatnonzero(~skip)
+
+        hidden = (rnn_state[0:1], rnn_state[1:2]) if len(rnn_state) else None
+        with torch.no_grad():
+            for start in range(0, len(kept), batch_windows):
+                index = kept[start : start + batch_windows]
+                block = frames[torch.from_numpy(index)]
+                features = self.net.encoder(self.net.stft(block)).squeeze(-1)
+                outputs, hidden = self.lstm(features.unsqueeze(1), hidden)
+                out = self.net.decoder.decoder(outputs.squeeze(1).unsqueeze(-1))
+                probs[index] = out.squeeze(1).mean(1).numpy()
+                _BATCHED_PROB_CALLS.inc()
+        if hidden is not None:
+            rnn_state = torch.cat(hidden)
+        return probs, (padded[None, -self.context_size :].clone(), rnn_state)
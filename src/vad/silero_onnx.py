@@ -0,0 +1,124 @@
+"""Silero VAD on ONNX Runtime.
+
+Runs the ONNX export of the Silero model that ships with the silero-vad
+package, feeding it numpy arrays, so neither torch nor the silero_vad
+package itself (whose __init__ imports torch) is imported. Sessions, the
+hysteresis and the detection entry points are the ones shared with the
+torch engine in streaming.py, so both engines yield the same segments up
+to float rounding of the probabilities.
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+from loguru import logger
+
+from .. import metrics
+from .streaming import SileroVADConfig, StreamingVADEngine, VADSession
+
+_WINDOW_PROB_CALLS = metrics.VAD_PROB_CALLS.labels("window")
+_SESSION_BATCH_PROB_CALLS = metrics.VAD_PROB_CALLS.labels("session_batch")
+
+# size of the LSTM state the model carries between windows
+STATE_SIZE = 128
+
+
+def default_model_path() -> str:
+    """Path of silero_vad.onnx inside the installed silero-vad package."""
+    spec = importlib.util.find_spec("silero_vad")
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError(
+            "silero-vad is not installed; install it or set model_path to a silero_vad.onnx file"
+        )
+    return os.path.join(next(iter(spec.submodule_search_locations)), "data", "silero_vad.onnx")
+
+
+class SileroVADOnnxConfig(SileroVADConfig):
+    model_path: str | None = None  # silero_vad.onnx of the silero-vad package if None
+
+
+class VADEngine(StreamingVADEngine):
+    def __init__(
+        self,
+        orig_sr: int = 16000,
+        target_sr: int = 16000,
+        prob_threshold: float = 0.4,
+        db_threshold: int = 60,
+        required_hits: int = 3,
+        required_misses: int = 24,
+        smoothing_window: int = 5,
+        offline_batch_windows: int = 1024,
+        session_pool_size: int = 64,
+        ring_buffer_seconds: float = 10.0,
+        pregate: bool = False,
+        pregate_db_margin: float = 10.0,
+        pregate_max_zcr: float = 0.25,
+        pregate_hangover: int = 8,
+        model_path: str | None = None,
+    ):
+        super().__init__(SileroVADOnnxConfig(
+            orig_sr=orig_sr,
+            target_sr=target_sr,
+            prob_threshold=prob_threshold,
+            db_threshold=db_threshold,
+            required_hits=required_hits,
+            required_misses=required_misses,
+            smoothing_window=smoothing_window,
+            offline_batch_windows=offline_batch_windows,
+            session_pool_size=session_pool_size,
+            ring_buffer_seconds=ring_buffer_seconds,
+            pregate=pregate,
+            pregate_db_margin=pregate_db_margin,
+            pregate_max_zcr=pregate_max_zcr,
+            pregate_hangover=pregate_hangover,
+            model_path=model_path,
+        ))
+        self.model = self.load_vad_model()
+        self.context_size = 64 if self.config.target_sr == 16000 else 32
+        self._sr = np.array(self.config.target_sr, dtype=np.int64)
+
+    def load_vad_model(self):
+        import onnxruntime
+
+        path = self.config.model_path or default_model_path()
+        logger.info(f"Loading Silero-VAD ONNX model from {path}...")
+        options = onnxruntime.SessionOptions()
+        # one window per call is far too small to gain from more threads
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        return onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    def initial_model_state(self):
+        """Audio context and LSTM state of a fresh session."""
+        return (
+            np.zeros((1, self.context_size), dtype=np.float32),
+            np.zeros((2, 1, STATE_SIZE), dtype=np.float32),
+        )
+
+    def speech_prob(self, session: VADSession, chunk_np: np.ndarray) -> float:
+        """Run the model on one window, advancing the session's recurrent state."""
+        context, state = session.model_state
+        x = np.concatenate([context, chunk_np[None, :]], axis=1)
+        out, state = self.model.run(None, {"input": x, "state": state, "sr": self._sr})
+        session.model_state = (x[:, -self.context_size :], state)
+        _WINDOW_PROB_CALLS.inc()
+        return float(out[0, 0])
+
+    def speech_probs_batch(self, sessions: list[VADSession], chunks: list[np.ndarray]) -> np.ndarray:
+        """One model call for a window of every session, with their states stacked."""
+        contexts, states = zip(*(session.model_state for session in sessions))
+        x = np.concatenate([np.concatenate(contexts), np.stack(chunks)], axis=1)
+        out, state = self.model.run(
+            None, {"input": x, "state": np.concatenate(states, axis=1), "sr": self._sr}
+        )
+        for i, session in enumerate(sessions):
+            session.model_state = (x[i : i + 1, -self.context_size :], state[:, i : i + 1])
+        _SESSION_BATCH_PROB_CALLS.inc()
+        return out[:, 0]
+
+    def skip_window(self, session: VADSession, chunk_np: np.ndarray) -> None:
+        """Keep the window's tail as audio context; the LSTM state carries over."""
+        session.model_state = (chunk_np[None, -self.context_size :].copy(), session.model_state[1])
@@ -0,0 +1,700 @@
+"""Engine-independent parts of streaming VAD.
+
+The hysteresis state machine, per-stream sessions and whole-recording
+detection only need numpy, so engines that do not use torch (such as the
+ONNX Runtime one) can share them without importing it.
+"""
+
+import asyncio
+from collections import deque
+from enum import Enum
+
+import numpy as np
+from pydantic import BaseModel
+
+from .. import metrics
+from ..utils.audio_frontend import Resampler, resample
+from .batch_scheduler import VADBatchScheduler
+from .pregate import GATED_SPEECH_PROB, PreGate
+from .ring_buffer import AudioRingBuffer
+from .vad_interface import PAUSE_SIGNAL, RESUME_SIGNAL, SpeechSegment, VADInterface
+
+
+_WINDOWS = metrics.VAD_WINDOWS.labels()
+_SEGMENTS = metrics.VAD_SEGMENTS.labels()
+
+
+class SileroVADConfig(BaseModel):
+    orig_sr: int = 16000
+    target_sr: int = 16000
+    prob_threshold: float = 0.4
+    db_threshold: int = 60
+    required_hits: int = 3  # 3 * (0.032) = 0.1s
+    required_misses: int = 24  # 24 * (0.032) = 0.8s
+    smoothing_window: int = 5
+    offline_batch_windows: int = 1024  # windows per batched model call for whole-file input
+    session_pool_size: int = 64  # idle sessions kept for reuse
+    ring_buffer_seconds: float = 10.0  # initial audio history kept per session, grows as needed
+    pregate: bool = False  # skip the model on clearly silent windows; can change segmentation
+    pregate_db_margin: float = 10.0  # dB below db_threshold a window must be to be skipped
+    pregate_max_zcr: float = 0.25  # quiet windows above this zero-crossing rate need twice the margin
+    pregate_hangover: int = 8  # 8 * (0.032) = 0.25s of each pause still goes to the model
+
+
+class StreamingVADEngine(VADInterface):
+    """Shared part of the engines running a Silero model window by window.
+
+    Handles the session pool, the energy/ZCR pre-gate, the hysteresis over
+    per-window probabilities and whole-recording detection. Subclasses load
+    the model and implement initial_model_state(), speech_prob() and
+    skip_window(); they may override session_speech_probs() with a faster
+    path for long stretches of audio, and speech_probs_batch() with one
+    model call for the windows of many sessions.
+    """
+
+    def __init__(self, config: SileroVADConfig):
+        self.config = config
+        self.window_size_samples = 512 if self.config.target_sr == 16000 else 256
+        # 512 / 16000 = 0.032s
+        self._session_pool: deque[VADSession] = deque()
+        self.pregate = (
+            PreGate(
+                self.window_size_samples,
+                self.config.db_threshold,
+                self.config.pregate_db_margin,
+                self.config.pregate_max_zcr,
+                self.config.pregate_hangover,
+            )
+            if self.config.pregate
+            else None
+        )
+        self.batch_scheduler: VADBatchScheduler | None = None
+
+    def initial_model_state(self):
+        """Model state of a fresh session."""
+        raise NotImplementedError
+
+    def speech_prob(self, session: "VADSession", chunk_np: np.ndarray) -> float:
+        """Run the model on one window, advancing the session's model state."""
+        raise NotImplementedError
+
+    def speech_probs_batch(self, sessions: list["VADSession"], chunks: list[np.ndarray]) -> np.ndarray:
+        """Run the model on one window from each of several sessions,
+        advancing each session's model state."""
+        return np.array(
+            [self.speech_prob(session, chunk) for session, chunk in zip(sessions, chunks)],
+            dtype=np.float32,
+        )
+
+    def enable_batching(self, max_batch_size: int = 256, max_wait_ms: float = 10.0) -> VADBatchScheduler:
+        """Batch the model calls of sessions fed through VADSession.feed_async()
+        across sessions.
+
+        Args:
+            max_batch_size: Upper bound on windows per batched model call.
+            max_wait_ms: How long the oldest pending window may wait for others to join.
+
+        Returns:
+            VADBatchScheduler: The scheduler.
+        """
+        self.batch_scheduler = VADBatchScheduler(self, max_batch_size, max_wait_ms)
+        return self.batch_scheduler
+
+    def batch_stats(self) -> dict | None:
+        """Return tick counters and latencies, or None if batching is off."""
+        if self.batch_scheduler is None:
+            return None
+        return self.batch_scheduler.stats.as_dict()
+
+    def skip_window(self, session: "VADSession", chunk_np: np.ndarray) -> None:
+        """Carry the session's model state past a window the model does not
+        see: the audio context moves on, the recurrent state stays."""
+        raise NotImplementedError
+
+    def silent_windows(self, audio_np: np.ndarray, quiet_before: int = 0) -> tuple[np.ndarray, int]:
+        """PreGate.silent_windows(), or no silent windows without a pre-gate."""
+        if self.pregate is None:
+            return np.zeros(len(audio_np) // self.window_size_samples, dtype=bool), 0
+        return self.pregate.silent_windows(audio_np, quiet_before)
+
+    def window_prob(self, session: "VADSession", chunk_np: np.ndarray, silent: bool) -> float:
+        """Speech probability of one window, without the model if it is silent."""
+        if silent:
+            self.skip_window(session, chunk_np)
+            return GATED_SPEECH_PROB
+        return self.speech_prob(session, chunk_np)
+
+    def pregate_stats(self) -> dict | None:
+        """Return how many model calls the pre-gate saved, or None if it is off."""
+        if self.pregate is None:
+            return None
+        return self.pregate.stats.as_dict()
+
+    def open_session(self) -> "VADSession":
+        """Get a VAD session with fresh state, reusing a pooled one if available."""
+        try:
+            return self._session_pool.pop()
+        except IndexError:
+            return VADSession(self)
+
+    def close_session(self, session: "VADSession") -> None:
+        """Reset a session and return it to the pool."""
+        session.reset()
+        if len(self._session_pool) < self.config.session_pool_size:
+            self._session_pool.append(session)
+
+    def to_model_rate(self, audio_data) -> np.ndarray:
+        """Resample complete audio at orig_sr to the model rate target_sr."""
+        return resample(np.asarray(audio_data, dtype=np.float32), self.config.orig_sr, self.config.target_sr)
+
+    def detect_speech(self, audio_data: list[float]):
+        """Detect speech in one complete piece of audio using a pooled session.
+        Segment audio is a view into the input (after resampling to
+        target_sr, if orig_sr differs). For audio that arrives in chunks, use
+        open_session() and feed()."""
+        audio_np = self.to_model_rate(audio_data)
+        w = self.window_size_samples
+        silent, _ = self.silent_windows(audio_np)
+        session = self.open_session()
+        try:
+            for i, offset in enumerate(range(0, len(silent) * w, w)):
+                chunk_np = audio_np[offset : offset + w]
+                speech_prob = self.window_prob(session, chunk_np, silent[i])
+                yield from session.process_window(speech_prob, chunk_np, offset, audio_np)
+        finally:
+            self.close_session(session)
+
+    def detect_speech_offline(self, audio_data: list[float]):
+        """Detect speech in a complete recording.
+
+        Yields the same segments as detect_speech, but computes the speech
+        probability of every window up front in large batched model calls
+        instead of one model call per 512-sample window, and replays the
+        state machine over the whole probability track at once.
+        """
+        audio_np = self.to_model_rate(audio_data)
+        probs = self.compute_speech_probs(audio_np)
+        _WINDOWS.inc(len(probs))
+        state_machine = StateMachine(self.config)
+        for event in state_machine.replay(probs, audio_np, self.window_size_samples):
+            if isinstance(event, bytes):
+                yield event
+                continue
+            start, end = event
+            _SEGMENTS.inc()
+            yield SpeechSegment(start, end, self.config.target_sr, audio_np[start:end])
+
+    def detect_speech_offline_blocks(self, audio_data: list[float], block_seconds: float):
+        """detect_speech_offline() over a recording taken a block at a time.
+
+        The speech probabilities of each block of ``block_seconds`` are
+        computed in the same batched model calls, carrying the model state
+        from one block to the next, and the state machine is replayed from
+        the last point it was idle. Yields one list of events per block:
+        those that the block completes. Together they are the events of
+        detect_speech_offline(), so a caller can act on the first segments
+        before the model has seen the rest of the recording.
+        """
+        audio_np = self.to_model_rate(audio_data)
+        w = self.window_size_samples
+        block = max(1, int(block_seconds * self.config.target_sr) // w)
+        num_windows = len(audio_np) // w
+        probs = np.empty(num_windows, dtype=np.float32)
+        state_machine = StateMachine(self.config)
+        resume = emitted = 0
+        session = self.open_session()
+        try:
+            for begin in range(0, num_windows, block):
+                end = min(begin + block, num_windows)
+                probs[begin:end] = self.session_speech_probs(session, audio_np[begin * w : end * w])
+                _WINDOWS.inc(end - begin)
+
+                # enough earlier windows to fill the smoothing windows at the resume point
+                first, seen = resume, 0
+                while first > 0 and seen < self.config.smoothing_window - 1:
+                    first -= 1
+                    seen += bool(probs[first])
+                events, restart = state_machine.replay_from(
+                    probs[first:end], audio_np[first * w : end * w], w, resume - first
+                )
+                new_events = events[emitted:]
+                if first + restart == resume:
+                    emitted = len(events)
+                else:
+                    # a segment still open at the end is replayed from its
+                    # start again, PAUSE_SIGNAL included
+                    resume = first + restart
+                    emitted = int(bool(events) and events[-1] == PAUSE_SIGNAL)
+
+                block_events = []
+                for event in new_events:
+                    if isinstance(event, bytes):
+                        block_events.append(event)
+                        continue
+                    start, stop = event[0] + first * w, event[1] + first * w
+                    _SEGMENTS.inc()
+                    block_events.append(
+                        SpeechSegment(start, stop, self.config.target_sr, audio_np[start:stop])
+                    )
+                yield block_events
+        finally:
+            self.close_session(session)
+
+    def compute_speech_probs(self, audio_np: np.ndarray) -> np.ndarray:
+        """Return the speech probability of every full window of a recording,
+        starting from a fresh model state."""
+        session = self.open_session()
+        try:
+            return self.session_speech_probs(session, audio_np)
+        finally:
+            self.close_session(session)
+
+    def session_speech_probs(self, session: "VADSession", audio_np: np.ndarray) -> np.ndarray:
+        """Return the speech probability of every full window of ``audio_np``,
+        continuing from the session's model state and advancing it, so that
+        consecutive blocks of whole windows give the probabilities of the
+        recording they were cut from."""
+        w = self.window_size_samples
+        silent = session.gate(audio_np)
+        probs = [
+            self.window_prob(session, audio_np[i * w : (i + 1) * w], silent[i])
+            for i in range(len(silent))
+        ]
+        return np.array(probs, dtype=np.float32)
+
+
+class VADSession:
+    """Streaming VAD state for one audio source.
+
+    Holds the hysteresis state machine, the model state (recurrent state and
+    audio context, in whatever form the engine uses), and a ring buffer with
+    the recent audio. The model weights stay on the shared engine. Audio is
+    fed at orig_sr and resampled to target_sr on the way in; offsets are
+    counted in target_sr samples from the start of the session.
+    """
+
+    def __init__(self, engine: "StreamingVADEngine"):
+        self.engine = engine
+        self.state_machine = StateMachine(engine.config)
+        self.resampler = (
+            Resampler(engine.config.orig_sr, engine.config.target_sr)
+            if engine.config.orig_sr != engine.config.target_sr
+            else None
+        )
+        self._ring_capacity = int(engine.config.ring_buffer_seconds * engine.config.target_sr)
+        self.ring = AudioRingBuffer(self._ring_capacity)
+        self.reset()
+
+    def reset(self) -> None:
+        self.state_machine.reset()
+        self.model_state = self.engine.initial_model_state()
+        if self.ring.capacity > self._ring_capacity:
+            # don't keep a buffer grown for one long utterance in the pool
+            self.ring = AudioRingBuffer(self._ring_capacity)
+        self.ring.clear()
+        self._processed = 0
+        self._quiet_run = 0
+        if self.resampler is not None:
+            self.resampler.reset()
+
+    def feed(self, audio_data):
+        """Feed the next chunk of audio and yield anything the VAD emits.
+
+        Segment audio is a view into the session's ring buffer; it stays valid
+        until roughly ring_buffer_seconds of further audio has been fed, so
+        copy it if it has to be kept longer.
+        """
+        audio_np = np.asarray(audio_data, dtype=np.float32)
+        if self.resampler is not None:
+            audio_np = self.resampler.process(audio_np)
+        yield from self._feed_resampled(audio_np)
+
+    async def feed_async(self, audio_data) -> list:
+        """feed() for the event loop, returning the events as a list.
+
+        With the engine's batch scheduler enabled, each model call waits for
+        the next batched tick shared with the other sessions; otherwise the
+        whole chunk is processed in a worker thread. Feed a session from one
+        task at a time.
+        """
+        scheduler = self.engine.batch_scheduler
+        if scheduler is None:
+            return await asyncio.to_thread(lambda: list(self.feed(audio_data)))
+
+        audio_np = np.asarray(audio_data, dtype=np.float32)
+        if self.resampler is not None:
+            audio_np = self.resampler.process(audio_np)
+        events = []
+        for offset, chunk_np, silent in self._windows(audio_np):
+            if silent:
+                speech_prob = self.engine.window_prob(self, chunk_np, True)
+            else:
+                speech_prob = await scheduler.speech_prob(self, chunk_np)
+            events.extend(self.process_window(speech_prob, chunk_np, offset))
+        return events
+
+    def _feed_resampled(self, audio_np: np.ndarray):
+        for offset, chunk_np, silent in self._windows(audio_np):
+            speech_prob = self.engine.window_prob(self, chunk_np, silent)
+            yield from self.process_window(speech_prob, chunk_np, offset)
+
+    def _windows(self, audio_np: np.ndarray):
+        """Append resampled audio to the ring buffer and yield ``(offset,
+        chunk, silent)`` for every window that is now complete."""
+        self.ring.write(audio_np, keep_from=self.state_machine.retained_from(self._processed))
+
+        w = self.engine.window_size_samples
+        count = (self.ring.end - self._processed) // w
+        if count == 0:
+            return
+        # gate every complete window of the chunk in one pass
+        silent = self.gate(self.ring.view(self._processed, self._processed + count * w))
+        for i in range(count):
+            offset = self._processed
+            self._processed += w
+            yield offset, self.ring.view(offset, offset + w), silent[i]
+
+    def gate(self, audio_np: np.ndarray) -> np.ndarray:
+        """Pre-gate flags of the full windows of the next audio of the stream,
+        continuing the quiet run of the audio before it."""
+        silent, self._quiet_run = self.engine.silent_windows(audio_np, self._quiet_run)
+        return silent
+
+    def flush(self):
+        """Finish the stream, yielding the segment still open at its end, if any.
+        The session can then be reused for a new stream."""
+        if self.resampler is not None:
+            yield from self._feed_resampled(self.resampler.flush())
+        for event in self.state_machine.flush():
+            if isinstance(event, bytes):
+                yield event
+                continue
+            start, end = event
+            _SEGMENTS.inc()
+            yield SpeechSegment(start, end, self.engine.config.target_sr, self.ring.view(start, end))
+        self.reset()
+
+    def process_window(self, speech_prob: float, chunk_np: np.ndarray, offset: int, source=None):
+        """Advance the state machine by one window.
+
+        Segment audio is sliced from ``source`` (an array holding the whole
+        recording from offset 0) if given, otherwise from the ring buffer.
+        """
+        _WINDOWS.inc()
+        if not speech_prob:
+            return
+        for event in self.state_machine.get_result(speech_prob, chunk_np, offset):
+            if isinstance(event, bytes):
+                yield event
+                continue
+            start, end = event
+            audio = source[start:end] if source is not None else self.ring.view(start, end)
+            _SEGMENTS.inc()
+            yield SpeechSegment(start, end, self.engine.config.target_sr, audio)
+
+    def close(self) -> None:
+        """Return the session to the engine's pool."""
+        self.engine.close_session(self)
+
+    def __enter__(self) -> "VADSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _running_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last ``window`` values (fewer at the start) at every
+    position, computed the way np.mean over the smoothing deques does."""
+    means = np.empty(len(values), dtype=values.dtype)
+    for k in range(min(window - 1, len(values))):
+        means[k] = np.mean(values[: k + 1])
+    if len(values) >= window:
+        means[window - 1 :] = np.lib.stride_tricks.sliding_window_view(values, window).mean(axis=1)
+    return means
+
+
+def _first_at_or_after(candidates: np.ndarray, k: int, default: int) -> int:
+    """First value of sorted ``candidates`` that is >= k, or ``default``."""
+    i = np.searchsorted(candidates, k)
+    return int(candidates[i]) if i < len(candidates) else default
+
+
+# Define state enumeration
+class State(Enum):
+    IDLE = 1  # Idle state, waiting for speech
+    ACTIVE = 2  # Speech detection state
+    INACTIVE = 3  # Speech end state (silence state)
+
+
+class StateMachine:
+    """Speech/silence hysteresis over per-window speech probabilities.
+
+    Works on sample offsets only: a finished segment is reported as the
+    (start, end) offsets of the audio it covers, starting with the windows
+    held in the pre-buffer when speech was confirmed.
+    """
+
+    def __init__(self, config: SileroVADConfig):
+        self.state = State.IDLE
+        self.prob_threshold = config.prob_threshold
+        self.db_threshold = config.db_threshold
+        self.required_hits = config.required_hits
+        self.required_misses = config.required_misses
+        self.smoothing_window = config.smoothing_window
+
+        self.probs = []
+        self.dbs = []
+        self.segment_start = 0
+        self.segment_end = 0
+        self.miss_count = 0
+        self.hit_count = 0
+
+        self.prob_window = deque(maxlen=self.smoothing_window)
+        self.db_window = deque(maxlen=self.smoothing_window)
+
+        # start offsets of the most recent windows seen while idle
+        self.pre_buffer = deque(maxlen=20)
+
+    def reset(self):
+        """Return to the initial state so the instance can serve a new stream."""
+        self.state = State.IDLE
+        self.reset_buffers()
+        self.miss_count = 0
+        self.hit_count = 0
+        self.prob_window.clear()
+        self.db_window.clear()
+        self.pre_buffer.clear()
+
+    @classmethod
+    def calculate_db(cls, audio_data: np.ndarray) -> float:
+        rms = np.sqrt(np.mean(np.square(audio_data)))
+        return 20 * np.log10(rms + 1e-7) if rms > 0 else -np.inf
+
+    @classmethod
+    def chunk_db(cls, float_chunk_np: np.ndarray) -> float:
+        """Level of a float chunk in dB on the 16-bit PCM scale, without
+        materialising the scaled chunk."""
+        return cls.window_dbs(float_chunk_np[None, :])[0]
+
+    @classmethod
+    def window_dbs(cls, frames: np.ndarray) -> np.ndarray:
+        """chunk_db() of every row of a ``(windows, samples)`` float array."""
+        rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1]) * 32767
+        return np.where(rms > 0, 20 * np.log10(rms + 1e-7), -np.inf)
+
+    def retained_from(self, next_offset: int) -> int:
+        """Earliest sample offset a future segment may still start at."""
+        if self.state != State.IDLE:
+            return self.segment_start
+        return self.pre_buffer[0] if self.pre_buffer else next_offset
+
+    def update(self, chunk_end, prob, db):
+        self.probs.append(prob)
+        self.dbs.append(db)
+        self.segment_end = chunk_end
+
+    def reset_buffers(self):
+        self.probs.clear()
+        self.dbs.clear()
+
+    def get_smoothed_values(self, prob, db):
+        self.prob_window.append(prob)
+        self.db_window.append(db)
+        smoothed_prob = np.mean(self.prob_window)
+        smoothed_db = np.mean(self.db_window)
+        return smoothed_prob, smoothed_db
+
+    def process(self, prob, float_chunk_np: np.ndarray, offset: int):
+        chunk_end = offset + len(float_chunk_np)
+        db = self.chunk_db(float_chunk_np)
+
+        # 获取平滑后的 prob 和 db
+        smoothed_prob, smoothed_db = self.get_smoothed_values(prob, db)
+
+        if self.state == State.IDLE:
+            self.pre_buffer.append(offset)
+            if (
+                smoothed_prob >= self.prob_threshold
+                and smoothed_db >= self.db_threshold
+            ):
+                self.hit_count += 1
+                if self.hit_count >= self.required_hits:
+                    self.state = State.ACTIVE
+                    self.segment_start = self.pre_buffer[0]
+                    self.update(chunk_end, smoothed_prob, smoothed_db)
+                    self.hit_count = 0
+                    yield PAUSE_SIGNAL
+            else:
+                self.hit_count = 0
+
+        elif self.state == State.ACTIVE:
+            self.update(chunk_end, smoothed_prob, smoothed_db)
+            if (
+                smoothed_prob >= self.prob_threshold
+                and smoothed_db >= self.db_threshold
+            ):
+                self.miss_count = 0
+            else:
+                self.miss_count += 1
+                if self.miss_count >= self.required_misses:
+                    self.state = State.INACTIVE
+                    self.miss_count = 0
+
+        elif self.state == State.INACTIVE:
+            self.update(chunk_end, smoothed_prob, smoothed_db)
+            if (
+                smoothed_prob >= self.prob_threshold
+                and smoothed_db >= self.db_threshold
+            ):
+                self.hit_count += 1
+                if self.hit_count >= self.required_hits:
+                    self.state = State.ACTIVE
+                    self.hit_count = 0
+                    self.miss_count = 0
+            else:
+                self.hit_count = 0
+                self.miss_count += 1
+                if self.miss_count >= self.required_misses:
+                    self.state = State.IDLE
+                    self.miss_count = 0
+                    yield RESUME_SIGNAL
+                    # too few windows to be speech; drop them
+                    if len(self.probs) > 30:
+                        yield self.segment_start, self.segment_end
+                    self.reset_buffers()
+                    self.pre_buffer.clear()
+
+    def get_result(self, input_num, chunk_np, offset):
+        yield from self.process(input_num, chunk_np, offset)
+
+    def replay(
+        self, probs: np.ndarray, audio_np: np.ndarray, window_size: int, flush: bool = False
+    ) -> list:
+        """Run the state machine over a whole recording at once.
+
+        Gives the events that feeding window ``i`` (``audio_np[i * w : (i +
+        1) * w]`` with probability ``probs[i]``) through process() from the
+        reset state would, windows with a probability of exactly 0 being
+        skipped as VADSession.process_window() skips them. The smoothed
+        tracks are computed for all windows in one pass; the hysteresis then
+        jumps from one state change to the next with searches over run
+        lengths, so the Python work grows with the number of segments rather
+        than the number of windows. This instance is left unchanged.
+
+        Args:
+            probs: Speech probability of every full window.
+            audio_np: The recording the windows are taken from.
+            window_size: Samples per window.
+            flush: Also give the events flush() would at the end.
+
+        Returns:
+            The signals and ``(start, end)`` segment offsets, in order.
+        """
+        return self.replay_from(probs, audio_np, window_size, flush=flush)[0]
+
+    def replay_from(
+        self,
+        probs: np.ndarray,
+        audio_np: np.ndarray,
+        window_size: int,
+        start: int = 0,
+        flush: bool = False,
+    ) -> tuple[list, int]:
+        """replay() starting at window ``start``, for a track that grows.
+
+        The machine is taken to be idle at ``start``, with nothing counted
+        and an empty pre-buffer, as it is right after a segment has closed;
+        the windows before it only fill the smoothing windows. Along with the
+        events, returns the window to restart from when the track has grown:
+        at or before the start of anything still in progress at its end, so
+        replay_from() over the longer track, starting there, gives the
+        events that follow these. The smoothing windows need at least
+        ``smoothing_window - 1`` nonzero windows before that point, or the
+        track from the beginning.
+
+        Args:
+            probs: Speech probability of every full window.
+            audio_np: The audio the windows are taken from.
+            window_size: Samples per window.
+            start: First window the machine runs over.
+            flush: Also give the events flush() would at the end.
+
+        Returns:
+            The signals and ``(start, end)`` segment offsets from ``start`` on,
+            in order, and the window to restart from.
+        """
+        w = window_size
+        visible = np.flatnonzero(probs)
+        dbs = self.window_dbs(audio_np[: len(probs) * w].reshape(-1, w))[visible]
+        offsets = visible * w
+        m = len(visible)
+
+        smoothed_prob = _running_mean(np.asarray(probs, dtype=np.float64)[visible], self.smoothing_window)
+        smoothed_db = _running_mean(dbs, self.smoothing_window)
+        hit = (smoothed_prob >= self.prob_threshold) & (smoothed_db >= self.db_threshold)
+
+        # length of the run of hits (misses) ending at each window
+        index = np.arange(m)
+        hit_run = index - np.maximum.accumulate(np.where(hit, -1, index))
+        miss_run = index - np.maximum.accumulate(np.where(hit, index, -1))
+        # counters are only checked on the branch that increments them
+        required_hits = max(1, self.required_hits)
+        required_misses = max(1, self.required_misses)
+        hits_done = np.flatnonzero(hit_run >= required_hits)
+        misses_done = np.flatnonzero(miss_run >= required_misses)
+        # misses among the windows before each index
+        misses_before = np.concatenate([[0], np.cumsum(~hit)])
+
+        def restart(k: int) -> int:
+            return int(visible[k]) if k < m else len(probs)
+
+        events = []
+        idle_from = int(np.searchsorted(visible, start))
+        while True:
+            # IDLE: hits are counted from the first idle window
+            entry = _first_at_or_after(hits_done, idle_from + required_hits - 1, m)
+            if entry >= m:
+                # a later entry's pre-buffer reaches back at most to the hits
+                # running at the end, less its length
+                run_from = max(idle_from, m - int(hit_run[-1])) if m and hit[-1] else m
+                return events, restart(max(idle_from, run_from - self.pre_buffer.maxlen + 1))
+            events.append(PAUSE_SIGNAL)
+            segment_start = offsets[max(idle_from, entry - self.pre_buffer.maxlen + 1)]
+
+            active_from = entry
+            while True:
+                # ACTIVE: misses are counted from the window after the (re)entry
+                inactive = _first_at_or_after(misses_done, active_from + required_misses, m)
+                if inactive < m:
+                    # INACTIVE: back to ACTIVE on enough hits in a row, or to
+                    # IDLE once enough misses have added up
+                    back = _first_at_or_after(hits_done, inactive + required_hits, m)
+                    target = misses_before[inactive + 1] + required_misses
+                    idle = int(np.searchsorted(misses_before, target)) - 1
+                    if idle >= m:
+                        idle = m
+                if inactive >= m or (back >= m and idle >= m):
+                    # still open at the end of the recording
+                    if flush:
+                        events.append(RESUME_SIGNAL)
+                        if m - entry > 30:
+                            events.append((int(segment_start), int(offsets[-1] + w)))
+                    return events, restart(idle_from)
+                if back < idle:
+                    active_from = back
+                    continue
+                events.append(RESUME_SIGNAL)
+                # too few windows to be speech; drop them
+                if idle - entry + 1 > 30:
+                    events.append((int(segment_start), int(offsets[idle] + w)))
+                idle_from = idle + 1
+                break
+
+    def flush(self):
+        """End the stream: close a segment that is still open, then reset."""
+        if self.state != State.IDLE:
+            yield RESUME_SIGNAL
+            if len(self.probs) > 30:
+                yield self.segment_start, self.segment_end
+        self.reset()
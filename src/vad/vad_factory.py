@@ -20,4 +20,31 @@ class VADFactory:
                 kwargs.get("required_hits"),
                 kwargs.get("required_misses"),
                 kwargs.get("smoothing_window"),
+                kwargs.get("offline_batch_windows", 1024),
+                kwargs.get("session_pool_size", 64),
+                kwargs.get("ring_buffer_seconds", 10.0),
+                kwargs.get("pregate", False),
+                kwargs.get("pregate_db_margin", 10.0),
+                kwargs.get("pregate_max_zcr", 0.25),
+                kwargs.get("pregate_hangover", 8),
+            )
+        elif engine_type == "silero_vad_onnx":
+            from .silero_onnx import VADEngine as SileroOnnxVADEngine
+
+            return SileroOnnxVADEngine(
+                kwargs.get("orig_sr"),
+                kwargs.get("target_sr"),
+                kwargs.get("prob_threshold"),
+                kwargs.get("db_threshold"),
+                kwargs.get("required_hits"),
+                kwargs.get("required_misses"),
+                kwargs.get("smoothing_window"),
+                kwargs.get("offline_batch_windows", 1024),
+                kwargs.get("session_pool_size", 64),
+                kwargs.get("ring_buffer_seconds", 10.0),
+                kwargs.get("pregate", False),
+                kwargs.get("pregate_db_margin", 10.0),
+                kwargs.get("pregate_max_zcr", 0.25),
+                kwargs.get("pregate_hangover", 8),
+                kwargs.get("model_path"),
             )
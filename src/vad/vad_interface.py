@@ -1,4 +1,33 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Emitted when speech starts (so playback can be interrupted) and when it ends
+PAUSE_SIGNAL = b"<|PAUSE|>"
+RESUME_SIGNAL = b"<|RESUME|>"
+
+
+@dataclass(eq=False)
+class SpeechSegment:
+    """A detected speech segment with sample-accurate boundaries."""
+
+    start: int  # first sample, counted from the start of the stream
+    end: int  # one past the last sample
+    sample_rate: int
+    audio: np.ndarray = field(repr=False)  # float32 view of samples [start, end)
+
+    @property
+    def start_time(self) -> float:
+        return self.start / self.sample_rate
+
+    @property
+    def end_time(self) -> float:
+        return self.end / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start) / self.sample_rate
 
 
 class VADInterface(ABC):
@@ -7,6 +36,37 @@ class VADInterface(ABC):
         """
         Detect if there is voice activity in the audio data.
         :param audio_data: Input audio data
-        :return: Returns a sequence of audio bytes containing human voice if voice activity is detected
+        :return: Yields SpeechSegment objects for detected speech, with PAUSE_SIGNAL / RESUME_SIGNAL
+            when speech starts and ends
         """
         pass
+
+    def detect_speech_offline(self, audio_data):
+        """
+        Detect voice activity in a complete recording rather than a live stream.
+        Engines that can process a whole file more efficiently override this.
+        :param audio_data: Input audio data
+        :return: Returns the same sequence as detect_speech
+        """
+        return self.detect_speech(audio_data)
+
+    def detect_speech_offline_blocks(self, audio_data, block_seconds: float):
+        """
+        detect_speech_offline over a complete recording taken block by block, so
+        the first segments are available before the rest has been processed.
+        Engines that can carry their state across blocks override this; by
+        default the whole recording is one block.
+        :param audio_data: Input audio data
+        :param block_seconds: Audio processed per block
+        :return: Yields one list of events per block, together the sequence
+            detect_speech_offline returns
+        """
+        yield list(self.detect_speech_offline(audio_data))
+
+    def open_session(self):
+        """
+        Open a streaming session with its own detection state, so several audio
+        sources can share one engine. Close it when the stream ends.
+        :return: A session object with feed(audio_data) and close()
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support sessions")
@@ -0,0 +1,46 @@
+"""SentenceDivider.process_stream() with the incremental buffer scan must
+produce the sentences the previous full-rescan implementation produced.
+
+fixtures/sentence_divider_streams.json holds recorded token streams (mixed
+languages; nested, self-closing, split and unknown tags; commas and
+abbreviations; random token boundaries) together with the output of the
+full-rescan implementation for each one.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from langdetect import DetectorFactory
+
+from src.utils.sentence_divider import SentenceDivider
+
+CASES = json.loads(
+    (Path(__file__).parent / "fixtures" / "sentence_divider_streams.json").read_text(encoding="utf-8")
+)
+
+
+async def _stream(tokens):
+    for token in tokens:
+        yield token
+
+
+async def _divide(case) -> list:
+    divider = SentenceDivider(
+        faster_first_response=case["faster_first_response"],
+        segment_method=case["segment_method"],
+        valid_tags=case["valid_tags"],
+    )
+    return [
+        [sentence.text, [str(tag) for tag in sentence.tags]]
+        async for sentence in divider.process_stream(_stream(case["tokens"]))
+    ]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[f"stream{i}" for i in range(len(CASES))])
+def test_matches_full_rescan_output(case):
+    DetectorFactory.seed = 0  # the fixture was recorded with deterministic language detection
+    assert asyncio.run(_divide(case)) == case["expected"]
@@ -0,0 +1,121 @@
+"""StateMachine.replay() must emit exactly what the per-window state machine
+emits, on randomly generated probability tracks and audio.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+
+import numpy as np
+import pytest
+
+from src.vad.streaming import SileroVADConfig, StateMachine, StreamingVADEngine
+from src.vad.vad_interface import SpeechSegment
+
+CASES_PER_SEED = 50
+
+
+def _normalise(events) -> list:
+    return [e if isinstance(e, bytes) else (int(e[0]), int(e[1])) for e in events]
+
+
+def per_window(config, probs, audio, window_size, flush) -> list:
+    """The reference: feed the windows one at a time, skipping zero probabilities
+    the way detect_speech_offline() does."""
+    machine = StateMachine(config)
+    events = []
+    for i, prob in enumerate(probs.tolist()):
+        if not prob:
+            continue
+        events += machine.get_result(prob, audio[i * window_size : (i + 1) * window_size], i * window_size)
+    if flush:
+        events += machine.flush()
+    return _normalise(events)
+
+
+def random_case(rng: np.random.Generator, coarse: bool = False):
+    """Speech-like runs of high and low probability and level, with skipped
+    windows, digital silence and a partial trailing window."""
+    n = int(rng.integers(0, 2000))
+    window_size = int(rng.choice([16, 64, 512]))
+    probs = np.empty(n, dtype=np.float32)
+    level = np.empty(n, dtype=np.float32)
+    i = 0
+    while i < n:
+        length = min(int(rng.geometric(1 / rng.choice([3, 10, 40, 120]))), n - i)
+        speech = rng.random() < 0.5
+        spread = rng.choice([0.05, 0.3])
+        probs[i : i + length] = np.clip(rng.normal(0.8 if speech else 0.1, spread, length), 0, 1)
+        level[i : i + length] = 10 ** (rng.normal(75 if speech else 45, 10) / 20) / 32767
+        i += length
+    if coarse:
+        # a coarse grid makes smoothed probabilities land exactly on the threshold
+        probs = (np.round(probs * 5) / 5).astype(np.float32)
+    probs[rng.random(n) < rng.choice([0, 0.02, 0.3])] = 0.0
+
+    audio = rng.standard_normal(n * window_size + int(rng.integers(0, window_size))).astype(np.float32)
+    audio[: n * window_size] *= np.repeat(level, window_size)
+    for k in np.flatnonzero(rng.random(n) < rng.choice([0, 0.05])):
+        audio[k * window_size : (k + 1) * window_size] = 0
+
+    config = SileroVADConfig(
+        prob_threshold=float(rng.choice([0.3, 0.4, 0.5])),
+        db_threshold=int(rng.choice([50, 60, 70])),
+        required_hits=int(rng.integers(0, 6)),
+        required_misses=int(rng.integers(0, 40)),
+        smoothing_window=int(rng.integers(1, 12)),
+    )
+    return config, probs, audio, window_size
+
+
+@pytest.mark.parametrize("coarse", [False, True], ids=["continuous", "threshold_ties"])
+@pytest.mark.parametrize("seed", range(6))
+def test_replay_matches_per_window(seed, coarse):
+    rng = np.random.default_rng(seed)
+    for _ in range(CASES_PER_SEED):
+        config, probs, audio, window_size = random_case(rng, coarse)
+        for flush in (False, True):
+            expected = per_window(config, probs, audio, window_size, flush)
+            replayed = _normalise(StateMachine(config).replay(probs, audio, window_size, flush))
+            assert replayed == expected, (config, len(probs), window_size, flush)
+
+
+def test_replay_empty_track():
+    config = SileroVADConfig()
+    audio = np.zeros(100, dtype=np.float32)
+    assert StateMachine(config).replay(np.zeros(0, dtype=np.float32), audio, 512, flush=True) == []
+
+
+class TrackEngine(StreamingVADEngine):
+    """An engine whose "model" reads the next window's probability from a
+    fixed track; the model state is the index of that window."""
+
+    def __init__(self, config, probs, window_size):
+        super().__init__(config)
+        self.window_size_samples = window_size
+        self.track = probs.tolist()
+
+    def initial_model_state(self):
+        return 0
+
+    def speech_prob(self, session, chunk_np):
+        session.model_state += 1
+        return self.track[session.model_state - 1]
+
+
+def _events(events) -> list:
+    return [e if isinstance(e, bytes) else (e.start, e.end) for e in events]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_blocks_match_offline(seed):
+    rng = np.random.default_rng(100 + seed)
+    for _ in range(CASES_PER_SEED):
+        config, probs, audio, window_size = random_case(rng, coarse=bool(rng.integers(2)))
+        engine = TrackEngine(config, probs, window_size)
+        expected = _events(engine.detect_speech_offline(audio))
+        block_seconds = int(rng.integers(1, 60)) * window_size / config.target_sr
+        blocks = [_events(b) for b in engine.detect_speech_offline_blocks(audio, block_seconds)]
+        assert [e for b in blocks for e in b] == expected, (config, len(probs), window_size, block_seconds)
+        for segment in engine.detect_speech_offline_blocks(audio, block_seconds):
+            for e in segment:
+                if isinstance(e, SpeechSegment):
+                    assert np.array_equal(e.audio, audio[e.start : e.end])